@@ -0,0 +1,66 @@
+"""
+Benchmark: analyze_dependencies, inverted index vs per-row scan
+---------------------------------------------------------------
+Writes a synthetic NVD 2.0 feed, turns it into nvd_processed.csv with
+parse_nvd, and matches a requirements list of --deps packages drawn from
+the feed's CPEs. The index method runs on all of them; the scan is slow,
+so it runs on --scan-deps packages and is extrapolated.
+
+Run from the cve_risk_analyzer directory:
+    python -m benchmarks.bench_analyzer --cves 20000 --deps 200
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src import analyzer, cpe_mapper
+from src.parse_nvd import parse_nvd_feed
+from src.synthetic_feed import write_feed
+
+
+def sample_deps(df, n_deps, seed=0):
+    """(package, version) pairs whose exact CPE occurs in the data, registered in CPE_MAPPING."""
+    rng = random.Random(seed)
+    uris = [u for cpes in df["affected_cpes"].dropna() for u in cpes.split("; ") if u]
+    deps = []
+    for uri in rng.sample(uris, min(n_deps, len(uris))):
+        vendor, product, version = uri.split(":")[3:6]
+        pkg = f"{product.replace('_', '-')}-{vendor}"
+        cpe_mapper.CPE_MAPPING[pkg] = (vendor, product)
+        deps.append((pkg, None if version == "*" else version))
+    return deps
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cves", type=int, default=20000, help="number of CVE items in the feed")
+    parser.add_argument("--deps", type=int, default=200, help="dependencies to analyze")
+    parser.add_argument("--scan-deps", type=int, default=2, help="dependencies to time the scan on")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        feed_path = write_feed(Path(tmp) / "nvdcve-2.0-bench.json", args.cves)
+        nvd_csv = Path(tmp) / "nvd_processed.csv"
+        df = parse_nvd_feed(str(feed_path), output=str(nvd_csv))
+        deps = sample_deps(df, args.deps)
+
+        start = time.perf_counter()
+        found = analyzer.analyze_dependencies(deps, nvd_csv, method="index")
+        index_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        analyzer.analyze_dependencies(deps[:args.scan_deps], nvd_csv, method="scan")
+        scan_s = (time.perf_counter() - start) / max(args.scan_deps, 1) * len(deps)
+
+        print(f"{'method':<8}{'deps':>8}{'seconds':>12}")
+        print(f"{'index':<8}{len(deps):>8}{index_s:>12.3f}   ({len(found):,} matches, incl. CSV load)")
+        print(f"{'scan':<8}{len(deps):>8}{scan_s:>12.1f}   (extrapolated from {args.scan_deps})")
+        print(f"⚡ {scan_s / index_s:,.0f}x faster")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Benchmark: one scan per project vs the de-duplicated batch scan
+---------------------------------------------------------------
+Writes a synthetic monorepo of --projects services, each pinning --deps
+packages drawn from a shared pool of --pool (package, version) pairs (half
+of them named after products in the CPE index), then times:
+
+    per-project  map_dependencies() and a CSV report once per manifest, as
+                 running dependency_mapper on each service would (timed on
+                 --sample-projects, extrapolated)
+    batch        src.batch_scan.batch_scan() with --workers processes:
+                 discovery, de-duplication, resolution and all reports
+
+Needs the CPE index: run `python -m src.nvd_ingest` first.
+
+Run from the cve_risk_analyzer directory:
+    python -m benchmarks.bench_batch_scan --projects 3000 --workers 4
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.bench_product_match import synthetic_products
+from src.batch_scan import batch_scan, discover_manifests
+from src.cpe_index import open_cpe_index
+from src.dependency_mapper import REPORT_COLUMNS, load_requirements, map_dependencies
+
+PROCESSED_DIR = Path(__file__).resolve().parents[1] / "data" / "processed"
+
+
+def write_monorepo(root, n_projects, n_deps, pool_size, products, seed=0):
+    rng = random.Random(seed)
+    names = [rng.choice(products) if i % 2 else name
+             for i, name in enumerate(synthetic_products(pool_size, seed))]
+    pool = [(name, f"{rng.randint(0, 5)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}") for name in names]
+    for i in range(n_projects):
+        project = Path(root) / f"team{i % 20:02d}" / f"service{i:05d}"
+        project.mkdir(parents=True)
+        pins = dict(rng.sample(pool, min(n_deps, len(pool))))
+        (project / "requirements.txt").write_text("".join(f"{p}=={v}\n" for p, v in pins.items()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--projects", type=int, default=3000, help="services in the synthetic monorepo")
+    parser.add_argument("--deps", type=int, default=30, help="pinned packages per service")
+    parser.add_argument("--pool", type=int, default=600, help="distinct (package, version) pairs shared by all services")
+    parser.add_argument("--sample-projects", type=int, default=20, help="services to time the per-project scan on")
+    parser.add_argument("--workers", type=int, default=1, help="processes for the batch scan")
+    args = parser.parse_args(argv)
+
+    cpe_index = open_cpe_index(PROCESSED_DIR)
+    if cpe_index is None:
+        print("❌ No CPE index; run `python -m src.nvd_ingest` first")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root, out_dir = Path(tmp) / "monorepo", Path(tmp) / "reports"
+        write_monorepo(root, args.projects, args.deps, args.pool, cpe_index.products())
+        print(f"📄 {args.projects:,} services x {args.deps} pins from a pool of {args.pool:,}")
+
+        sample = discover_manifests(root)[:args.sample_projects]
+        start = time.perf_counter()
+        for manifest in sample:
+            report = map_dependencies(load_requirements(manifest), cpe_index=cpe_index)
+            report[[c for c in REPORT_COLUMNS if c in report.columns]].to_csv(Path(tmp) / "report.csv", index=False)
+        per_project_s = (time.perf_counter() - start) / len(sample) * args.projects
+
+        start = time.perf_counter()
+        batch_scan(root, out_dir, PROCESSED_DIR, workers=args.workers)
+        batch_s = time.perf_counter() - start
+
+    print(f"\n{'method':<14}{'seconds':>10}")
+    print(f"{'per-project':<14}{per_project_s:>10.2f}   (extrapolated from {len(sample)})")
+    print(f"{'batch':<14}{batch_s:>10.2f}   ({args.workers} worker(s))")
+    print(f"⚡ batch: {per_project_s / batch_s:,.1f}x faster")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Benchmark: per-row label encoding vs CategoryEncoder
+----------------------------------------------------
+Encodes --rows synthetic vendor names (--classes known vendors, plus
+--unseen-share never-seen ones) the ways the predictors did and do:
+
+    per-row    `x in encoder.classes_` then encoder.transform([x]) for each
+               row (the old safe_encode / apply lambdas)
+    set        SafeLabelEncoder.transform_safe: a set of the classes built
+               per call, then transform([x]) for each known row
+    vector     CategoryEncoder.transform on the whole column
+
+With scikit-learn installed the baselines use a real LabelEncoder. Without
+it they replay what LabelEncoder.transform does for string labels (a label
+-> code dict of every class built on each call). Also checks all three give
+the same codes.
+
+Run from the cve_risk_analyzer directory:
+    python -m benchmarks.bench_category_encoder --rows 2000 --classes 20000
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.category_encoder import CategoryEncoder
+
+try:
+    from sklearn.preprocessing import LabelEncoder
+except ImportError:
+    LabelEncoder = None
+
+
+class ReplayedLabelEncoder:
+    """LabelEncoder.transform's work for object labels, without scikit-learn."""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes, dtype=object)
+
+    def transform(self, values):
+        table = {label: code for code, label in enumerate(self.classes_)}
+        return np.array([table[v] for v in values])
+
+
+def per_row(encoder, values):
+    return np.array([encoder.transform([v])[0] if v in encoder.classes_ else -1 for v in values])
+
+
+def with_set(encoder, values):
+    known = set(encoder.classes_)
+    return np.array([encoder.transform([v])[0] if v in known else -1 for v in values])
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2_000, help="values to encode")
+    parser.add_argument("--classes", type=int, default=20_000, help="known vendors")
+    parser.add_argument("--unseen-share", type=float, default=0.1, help="share of rows with an unseen vendor")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    known = np.array([f"vendor-{i:06d}" for i in range(args.classes)], dtype=object)
+    values = rng.choice(known, args.rows)
+    unseen = rng.random(args.rows) < args.unseen_share
+    values[unseen] = [f"unseen-{i}" for i in range(int(unseen.sum()))]
+    values = pd.Series(values)
+
+    if LabelEncoder is not None:
+        baseline = LabelEncoder().fit(known)
+        source = "sklearn LabelEncoder"
+    else:
+        baseline = ReplayedLabelEncoder(np.sort(known))
+        source = "replayed LabelEncoder (scikit-learn not installed)"
+    encoder = CategoryEncoder.fit(known)
+
+    print(f"🔤 {args.rows:,} rows, {args.classes:,} classes, {unseen.mean():.0%} unseen; baseline: {source}")
+    vector_s, vector_codes = timed(encoder.transform, values)
+    results = {"vector": (vector_s, vector_codes)}
+    for name, func in [("set", with_set), ("per-row", per_row)]:
+        results[name] = timed(func, baseline, values)
+    for name, (seconds, codes) in results.items():
+        print(f"{name:<9}{seconds:>10.3f} s{seconds / vector_s:>10.0f}x")
+    same = all(np.array_equal(codes, vector_codes) for _, codes in results.values())
+    print(f"{'✅' if same else '❌'} codes {'identical' if same else 'differ'}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
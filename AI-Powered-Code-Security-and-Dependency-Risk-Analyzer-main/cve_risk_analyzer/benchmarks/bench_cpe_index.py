@@ -0,0 +1,98 @@
+"""
+Benchmark: loading the CVE-CPE dataset vs opening the memory-mapped CPE index
+-----------------------------------------------------------------------------
+Ingests a synthetic NVD 2.0 feed into a temporary processed directory
+(cve_cpe.parquet plus cpe_index/), then, each in a fresh process, looks up
+--deps products the way dependency_mapper does: once from the full dataset
+(load_flat + substring match) and once from the mmap index. Reports startup
+time, lookup time and peak RSS.
+
+Run from the cve_risk_analyzer directory:
+    python -m benchmarks.bench_cpe_index --cves 100000 --deps 20
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.synthetic_feed import write_feed
+
+
+# ---------------- Child process runner ----------------
+def _peak_rss_mb():
+    # ru_maxrss survives exec, so a spawned child would report the parent's peak
+    try:
+        with open("/proc/self/status") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("VmHWM")) / 1024
+    except (OSError, StopIteration):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run(mode, processed_dir, products, queue):
+    os.environ["TQDM_DISABLE"] = "1"
+    from src import dependency_mapper
+    from src.cpe_index import open_cpe_index
+    from src.product_match import match_products
+
+    start = time.perf_counter()
+    if mode == "index":
+        cpe_index = open_cpe_index(processed_dir)
+    else:
+        cve_df = dependency_mapper.load_cve_data(Path(processed_dir).parents[1])
+    opened = time.perf_counter()
+    matched = 0
+    if mode == "index":
+        found = match_products(products, cpe_index.products())
+    for product in products:
+        if mode == "index":
+            matched += len(dependency_mapper.index_matches(cpe_index, found[product]))
+        else:
+            matched += int(cve_df["cpe_product"].str.contains(product, case=False, na=False).sum())
+    done = time.perf_counter()
+    queue.put((opened - start, done - opened, matched, _peak_rss_mb()))
+
+
+def measure(mode, processed_dir, products):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run, args=(mode, str(processed_dir), products, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cves", type=int, default=100000, help="number of CVE items in the feed")
+    parser.add_argument("--deps", type=int, default=20, help="products to look up")
+    args = parser.parse_args(argv)
+
+    os.environ["TQDM_DISABLE"] = "1"
+    from src import nvd_ingest
+    from src.cpe_index import open_cpe_index
+
+    with tempfile.TemporaryDirectory() as tmp:
+        processed_dir = Path(tmp) / "data" / "processed"
+        processed_dir.mkdir(parents=True)
+        feed_path = write_feed(Path(tmp) / "nvdcve-2.0-bench.json", args.cves)
+        with nvd_ingest.open_dataset_writer(processed_dir) as writer:
+            writer.write_rows(nvd_ingest.normalize_feed(feed_path))
+        index_mb = sum(p.stat().st_size for p in (processed_dir / "cpe_index").iterdir()) / 1e6
+        print(f"📄 Synthetic feed: {args.cves:,} CVEs, {writer.total:,} CVE x CPE rows, index {index_mb:.1f} MB")
+
+        products = random.Random(0).sample(open_cpe_index(processed_dir).products(), args.deps)
+        print(f"{'source':<10}{'startup (s)':>12}{'lookup (s)':>12}{'matches':>10}{'peak RSS (MB)':>16}")
+        for mode in ("dataset", "index"):
+            startup, lookup, matched, peak_mb = measure(mode, processed_dir, products)
+            print(f"{mode:<10}{startup:>12.3f}{lookup:>12.3f}{matched:>10,}{peak_mb:>16.0f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
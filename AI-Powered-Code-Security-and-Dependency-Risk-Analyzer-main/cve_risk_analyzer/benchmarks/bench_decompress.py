@@ -0,0 +1,68 @@
+"""
+Benchmark: inline vs reader-thread decompression of compressed feeds
+--------------------------------------------------------------------
+Writes the same synthetic NVD 2.0 feed as .gz, .bz2, .xz (and .zst when
+zstandard is installed), then normalizes each one in a fresh process with
+decompression on the parsing thread and in a reader thread. Reports
+items/sec and cores used (CPU time / wall time).
+
+Run from the cve_risk_analyzer directory:
+    python -m benchmarks.bench_decompress --cves 20000
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src import compressed_io
+from src.synthetic_feed import write_feed
+
+
+def _run(feed_path, threaded, queue):
+    os.environ["TQDM_DISABLE"] = "1"
+    from src import nvd_ingest
+
+    compressed_io.THREADED = threaded
+    start, usage = time.perf_counter(), resource.getrusage(resource.RUSAGE_SELF)
+    count = sum(1 for _ in nvd_ingest.normalize_feed(Path(feed_path)))
+    elapsed = time.perf_counter() - start
+    end = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = (end.ru_utime - usage.ru_utime) + (end.ru_stime - usage.ru_stime)
+    queue.put((count, elapsed, cpu))
+
+
+def measure(feed_path, threaded):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run, args=(str(feed_path), threaded, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cves", type=int, default=20000, help="number of CVE items in the feed")
+    args = parser.parse_args(argv)
+
+    suffixes = [".gz", ".bz2", ".xz"] + ([".zst"] if compressed_io.zstandard is not None else [])
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"📄 Synthetic feed: {args.cves:,} CVEs")
+        print(f"{'codec':<8}{'mode':<10}{'size (MB)':>10}{'rows':>10}{'rows/sec':>12}{'cores':>8}")
+        for suffix in suffixes:
+            feed_path = write_feed(Path(tmp) / f"nvdcve-2.0-bench.json{suffix}", args.cves)
+            size_mb = feed_path.stat().st_size / 1e6
+            for threaded in (False, True):
+                count, elapsed, cpu = measure(feed_path, threaded)
+                mode = "thread" if threaded else "inline"
+                print(f"{suffix:<8}{mode:<10}{size_mb:>10.1f}{count:>10,}{count / elapsed:>12,.0f}{cpu / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Benchmark: difflib.get_close_matches vs the trigram fuzzy index
+---------------------------------------------------------------
+Builds --products synthetic product names and --queries misspelled package
+names (one character dropped, inserted or replaced), then reports build,
+save and mmap-load time of the TrigramIndex, milliseconds per lookup for
+both methods (difflib timed on --difflib-queries and extrapolated), and how
+often the two pick the same best match.
+
+Run from the cve_risk_analyzer directory:
+    python -m benchmarks.bench_fuzzy_index --products 100000 --queries 1000
+"""
+
+import argparse
+import difflib
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_product_match import synthetic_products
+from src.fuzzy_index import TrigramIndex
+from src.product_match import normalize_name
+
+
+def misspell(name, rng):
+    chars = list(name)
+    i = rng.randrange(len(chars))
+    edit = rng.random()
+    if edit < 0.3 and len(chars) > 1:
+        del chars[i]
+    elif edit < 0.6:
+        chars.insert(i, rng.choice("abcxyz"))
+    else:
+        chars[i] = rng.choice("abcxyz")
+    return "".join(chars)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=100000, help="distinct product names")
+    parser.add_argument("--queries", type=int, default=1000, help="fuzzy lookups to time")
+    parser.add_argument("--difflib-queries", type=int, default=50, help="lookups to time difflib on")
+    parser.add_argument("--cutoff", type=float, default=0.6, help="minimum similarity (enhanced_mapper uses 0.6)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(3)
+    products = synthetic_products(args.products)
+    queries = [misspell(rng.choice(products), rng) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    index = TrigramIndex.build(products)
+    build_s = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        index.save(tmp)
+        save_s = time.perf_counter() - start
+        start = time.perf_counter()
+        index = TrigramIndex.load(tmp)
+        load_ms = (time.perf_counter() - start) * 1e3
+        print(f"📄 {len(products):,} products: build {build_s:.2f} s, save {save_s:.2f} s, mmap load {load_ms:.1f} ms")
+
+        start = time.perf_counter()
+        found = [index.best_match(q, args.cutoff) for q in queries]
+        index_ms = (time.perf_counter() - start) / len(queries) * 1e3
+
+    # Same normalized names on both sides, so only the search differs
+    normalized = {normalize_name(p): p for p in products}
+    names = list(normalized)
+    sample = queries[:args.difflib_queries]
+    start = time.perf_counter()
+    expected = []
+    for q in sample:
+        match = difflib.get_close_matches(normalize_name(q), names, n=1, cutoff=args.cutoff)
+        expected.append(normalized[match[0]] if match else None)
+    difflib_ms = (time.perf_counter() - start) / len(sample) * 1e3
+    agree = sum(a == b for a, b in zip(found, expected))
+
+    print(f"{'method':<10}{'ms/lookup':>12}")
+    print(f"{'difflib':<10}{difflib_ms:>12.2f}   (timed on {len(sample)})")
+    print(f"{'trigram':<10}{index_ms:>12.3f}")
+    print(f"🎯 same best match on {agree}/{len(sample)} lookups; ⚡ {difflib_ms / index_ms:,.0f}x faster")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
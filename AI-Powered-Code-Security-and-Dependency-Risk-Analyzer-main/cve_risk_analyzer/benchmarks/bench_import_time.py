@@ -0,0 +1,137 @@
+"""
+Benchmark: import time of the CLI's scan paths
+----------------------------------------------
+Runs each command below under `python -X importtime` and sums the
+cumulative time of its top-level imports (the importtime lines with no
+indentation), --runs times, keeping the fastest run:
+
+    baseline     python -c pass (the interpreter's own startup imports)
+    cli          import src.cli
+    scan --url   python -m src.cli scan <manifest> --url <closed port>
+                 (the command CI runs against a scan service; the service
+                 being down only changes the exit status, after every
+                 import is done)
+    scan         python -m src.cli scan <manifest> --no-cache --out <tmp>
+                 (the local lookup CI runs without a service; with no
+                 ingested dataset it stops right after its imports)
+    mapper       import src.dependency_mapper
+
+Budgets, in ms of imports on top of the baseline:
+
+    scan --url   SCAN_URL_BUDGET_MS, and none of DATASET_MODULES or
+                 MODEL_MODULES may load
+    scan         LOCAL_SCAN_BUDGET_MS; it needs DATASET_MODULES (pandas,
+                 NumPy, pyarrow) but none of MODEL_MODULES may load
+
+Exits 1 when a budget is broken. The millisecond budgets are only checked
+here, where --runs smooths out a noisy machine; tests/test_import_time.py
+checks just the module sets, which do not depend on timing.
+
+Run from the cve_risk_analyzer directory:
+    python -m benchmarks.bench_import_time --runs 5
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATASET_MODULES = ["pandas", "numpy", "pyarrow"]
+MODEL_MODULES = ["sklearn", "scipy", "joblib", "matplotlib", "seaborn"]
+SCAN_URL_BUDGET_MS = 150.0
+LOCAL_SCAN_BUDGET_MS = 800.0
+CLOSED_URL = "http://127.0.0.1:9"
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_profile(args):
+    """(top-level import ms, set of imported module names) of one `python -X importtime` run."""
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=BASE_DIR,
+                            capture_output=True, text=True)
+    total_us, modules = 0, set()
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match is None:
+            continue
+        modules.add(match.group(4))
+        if not match.group(3):      # nested imports are already in their parent's cumulative time
+            total_us += int(match.group(2))
+    return total_us / 1e3, modules
+
+
+def fastest(args, runs):
+    profiles = [import_profile(args) for _ in range(runs)]
+    return min(profiles, key=lambda profile: profile[0])
+
+
+def profile_commands(runs=3, names=None):
+    """{command name: (import ms, modules)} for the commands above (all, or just `names` plus baseline)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = Path(tmp) / "requirements.txt"
+        manifest.write_text("requests==2.31.0\nflask>=2.0\n", encoding="utf-8")
+        commands = {
+            "baseline": ["-c", "pass"],
+            "cli": ["-c", "import src.cli"],
+            "scan --url": ["-m", "src.cli", "scan", str(manifest), "--url", CLOSED_URL],
+            "scan": ["-m", "src.cli", "scan", str(manifest), "--no-cache", "--out", str(Path(tmp) / "report.csv")],
+            "mapper": ["-c", "import src.dependency_mapper"],
+        }
+        if names is not None:
+            commands = {name: args for name, args in commands.items() if name == "baseline" or name in names}
+        return {name: fastest(args, runs) for name, args in commands.items()}
+
+
+def forbidden_loaded(profiles, name, forbidden):
+    """The forbidden modules one profiled command imports."""
+    return [m for m in forbidden if m in profiles[name][1]]
+
+
+def check_budget(profiles, name, budget_ms, forbidden):
+    """Problems of one profiled command: over budget (above the baseline), or loading a forbidden module."""
+    ms = profiles[name][0]
+    over = ms - profiles["baseline"][0]
+    problems = []
+    if over > budget_ms:
+        problems.append(f"{name}: {over:.1f} ms of imports over the baseline (budget {budget_ms:.0f} ms)")
+    loaded = forbidden_loaded(profiles, name, forbidden)
+    if loaded:
+        problems.append(f"{name}: loads {', '.join(loaded)}")
+    return problems
+
+
+def check_all(profiles, url_budget_ms=SCAN_URL_BUDGET_MS, local_budget_ms=LOCAL_SCAN_BUDGET_MS):
+    return (check_budget(profiles, "scan --url", url_budget_ms, DATASET_MODULES + MODEL_MODULES)
+            + check_budget(profiles, "scan", local_budget_ms, MODEL_MODULES))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="runs per command (the fastest counts)")
+    parser.add_argument("--url-budget-ms", type=float, default=SCAN_URL_BUDGET_MS,
+                        help="allowed import time of `scan --url` above the interpreter baseline")
+    parser.add_argument("--local-budget-ms", type=float, default=LOCAL_SCAN_BUDGET_MS,
+                        help="allowed import time of the local `scan` above the interpreter baseline")
+    args = parser.parse_args(argv)
+
+    profiles = profile_commands(args.runs)
+    base_ms = profiles["baseline"][0]
+    print(f"{'command':<12}{'imports ms':>12}{'over base':>11}{'modules':>9}  heavy modules")
+    for name, (ms, modules) in profiles.items():
+        heavy = [m for m in DATASET_MODULES + MODEL_MODULES if m in modules]
+        print(f"{name:<12}{ms:>12.1f}{ms - base_ms:>11.1f}{len(modules):>9}  {', '.join(heavy) or '-'}")
+
+    problems = check_all(profiles, args.url_budget_ms, args.local_budget_ms)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        return 1
+    print(f"✅ scan --url within {args.url_budget_ms:.0f} ms, scan within {args.local_budget_ms:.0f} ms; "
+          f"no model / plotting modules")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
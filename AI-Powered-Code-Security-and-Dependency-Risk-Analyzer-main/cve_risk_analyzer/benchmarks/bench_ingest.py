@@ -0,0 +1,182 @@
+"""
+Benchmark: ingestion pipeline stages on a synthetic NVD feed
+------------------------------------------------------------
+Generates a deterministic feed with src/synthetic_feed.py and runs each
+ingestion stage on it in a fresh process:
+
+    generate          write the synthetic feed itself
+    decode            iterate_items(): JSON decoding only
+    normalize         normalize_feed(): decode + CVE x CPE row dicts
+    write_flat        normalize + ChunkedRowWriter, flat layout
+    write_normalized  normalize + ChunkedRowWriter, normalized layout
+    parse_nvd         parse_nvd.parse_nvd_feed() (2.0 feeds only)
+
+For each stage it reports CVEs/sec, input MB/sec, peak RSS and the size of
+what the stage wrote. Results can be saved as JSON and compared against a
+saved baseline; the run fails when a stage got slower than --tolerance.
+
+Run from the cve_risk_analyzer directory:
+    python -m benchmarks.bench_ingest --scale 100k
+    python -m benchmarks.bench_ingest --scale 10k --save baseline.json
+    python -m benchmarks.bench_ingest --scale 10k --baseline baseline.json
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.synthetic_feed import FORMATS, SCALES, parse_scale, write_feed
+
+STAGES = ["generate", "decode", "normalize", "write_flat", "write_normalized", "parse_nvd"]
+
+
+def _dir_size(path):
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+# ---------------- Stages (run inside the child process) ----------------
+def _stage_generate(feed_path, out_dir, opts):
+    write_feed(feed_path, opts["n_cves"], opts["format"], opts["seed"])
+    return opts["n_cves"], _dir_size(feed_path)
+
+
+def _stage_decode(feed_path, out_dir, opts):
+    from src import nvd_ingest
+    return sum(1 for _ in nvd_ingest.iterate_items(feed_path, backend=opts["backend"])), 0
+
+
+def _stage_normalize(feed_path, out_dir, opts):
+    from src import nvd_ingest
+    manifest = {}
+    for _ in nvd_ingest.normalize_feed(feed_path, manifest, backend=opts["backend"]):
+        pass
+    return len(manifest), 0
+
+
+def _write(feed_path, out_dir, opts, layout):
+    from src import nvd_ingest
+    manifest = {}
+    with nvd_ingest.open_dataset_writer(out_dir, layout, row_group_size=opts["row_group_size"]) as writer:
+        writer.write_rows(nvd_ingest.normalize_feed(feed_path, manifest, backend=opts["backend"]))
+    return len(manifest), _dir_size(out_dir)
+
+
+def _stage_write_flat(feed_path, out_dir, opts):
+    return _write(feed_path, out_dir, opts, "flat")
+
+
+def _stage_write_normalized(feed_path, out_dir, opts):
+    return _write(feed_path, out_dir, opts, "normalized")
+
+
+def _stage_parse_nvd(feed_path, out_dir, opts):
+    from src.parse_nvd import parse_nvd_feed
+    output = Path(out_dir) / "nvd_processed.csv"
+    df = parse_nvd_feed(str(feed_path), output=str(output), backend=opts["backend"])
+    return len(df), _dir_size(output)
+
+
+def _run_stage(stage, feed_path, out_dir, opts, queue):
+    os.environ["TQDM_DISABLE"] = "1"
+    run = globals()[f"_stage_{stage}"]
+    start = time.perf_counter()
+    count, output_bytes = run(Path(feed_path), Path(out_dir), opts)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((count, elapsed, peak_kb, output_bytes))
+
+
+def measure(stage, feed_path, out_dir, opts):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_stage, args=(stage, str(feed_path), str(out_dir), opts, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+# ---------------- Baseline comparison ----------------
+def compare(results, baseline, tolerance):
+    """Print throughput changes against a saved run; return the stages that regressed."""
+    regressed = []
+    if (baseline.get("scale"), baseline.get("format")) != (results["scale"], results["format"]):
+        print(f"⚠️ Baseline was run on {baseline.get('scale'):,} CVEs ({baseline.get('format')}); "
+              "throughput may not be comparable")
+    print(f"\n{'stage':<18}{'baseline/sec':>14}{'now/sec':>12}{'change':>10}")
+    for stage, now in results["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if not before:
+            continue
+        change = now["items_per_sec"] / before["items_per_sec"] - 1
+        flag = "  ⚠️" if change < -tolerance else ""
+        print(f"{stage:<18}{before['items_per_sec']:>14,.0f}{now['items_per_sec']:>12,.0f}{change:>+10.1%}{flag}")
+        if flag:
+            regressed.append(stage)
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", default="10k", help=f"number of CVEs: {', '.join(SCALES)} or an integer")
+    parser.add_argument("--format", default="2.0", choices=FORMATS, help="NVD feed format")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--json-backend", default="auto", help="JSON backend for the decode stages")
+    parser.add_argument("--row-group-size", type=int, default=100_000)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed throughput drop vs the baseline before failing (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    opts = {"n_cves": parse_scale(args.scale), "format": args.format, "seed": args.seed,
+            "backend": args.json_backend, "row_group_size": args.row_group_size}
+    stages = [s for s in STAGES if s in args.stages]
+    if args.format != "2.0" and "parse_nvd" in stages:
+        stages.remove("parse_nvd")   # parse_nvd only understands 2.0 feeds
+
+    results = {"scale": opts["n_cves"], "format": args.format, "seed": args.seed, "stages": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        feed_path = Path(tmp) / f"nvdcve-{args.format}-bench.json"
+        if "generate" not in stages:
+            write_feed(feed_path, opts["n_cves"], args.format, args.seed)
+
+        print(f"📄 Synthetic {args.format} feed: {opts['n_cves']:,} CVEs (seed {args.seed})")
+        print(f"{'stage':<18}{'CVEs':>10}{'CVEs/sec':>12}{'MB/sec':>10}{'peak RSS (MB)':>16}{'output (MB)':>14}")
+        for stage in stages:
+            out_dir = Path(tmp) / stage
+            out_dir.mkdir()
+            count, elapsed, peak_kb, output_bytes = measure(stage, feed_path, out_dir, opts)
+            input_mb = feed_path.stat().st_size / 1e6
+            results["stages"][stage] = {
+                "items": count, "seconds": round(elapsed, 3), "items_per_sec": count / elapsed,
+                "input_mb_per_sec": input_mb / elapsed, "peak_rss_mb": peak_kb / 1024,
+                "output_mb": output_bytes / 1e6,
+            }
+            print(f"{stage:<18}{count:>10,}{count / elapsed:>12,.0f}{input_mb / elapsed:>10.1f}"
+                  f"{peak_kb / 1024:>16.1f}{output_bytes / 1e6:>14.1f}")
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+        print(f"\n💾 Saved results to {args.save}")
+    if args.baseline:
+        regressed = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressed:
+            print(f"\n❌ Slower than baseline: {', '.join(regressed)}")
+            return 1
+        print("\n✅ No stage slower than the baseline tolerance")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Benchmark: JSON decode backends for NVD feeds
+---------------------------------------------
+Writes a synthetic NVD 2.0 feed and decodes it with every installed backend
+from src/json_backend.py, both as a whole-document load and as item
+iteration (what ingestion does), and reports items/sec and the speedup over
+the stdlib json module.
+
+Run from the cve_risk_analyzer directory:
+    python -m benchmarks.bench_json_backends --cves 50000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src import json_backend
+from src.synthetic_feed import write_feed
+
+ITEM_PREFIX = "vulnerabilities.item"
+
+
+def time_load(feed_path, backend):
+    start = time.perf_counter()
+    with open(feed_path, "rb") as fh:
+        count = len(json_backend.load(fh, backend)["vulnerabilities"])
+    return count, time.perf_counter() - start
+
+
+def time_iter(feed_path, backend):
+    start = time.perf_counter()
+    with open(feed_path, "rb") as fh:
+        count = sum(1 for _ in json_backend.iter_items(fh, ITEM_PREFIX, backend))
+    return count, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cves", type=int, default=50000, help="number of CVE items in the feed")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        feed_path = Path(tmp) / "nvdcve-2.0-bench.json"
+        write_feed(feed_path, args.cves)
+        size_mb = feed_path.stat().st_size / 1e6
+        print(f"📄 Synthetic feed: {args.cves:,} CVEs, {size_mb:.1f} MB")
+        print(f"🔧 auto -> streaming: {json_backend.describe('auto')}, "
+              f"whole document: {json_backend.describe('auto', streaming=False)}")
+
+        print(f"{'mode':<8}{'backend':<20}{'items':>10}{'items/sec':>14}{'MB/sec':>10}{'vs json':>10}")
+        for mode, timer in (("load", time_load), ("iter", time_iter)):
+            baseline = None
+            for backend in json_backend.available_backends():
+                count, elapsed = timer(feed_path, backend)
+                baseline = baseline or elapsed
+                print(f"{mode:<8}{json_backend.describe(backend):<20}{count:>10,}"
+                      f"{count / elapsed:>14,.0f}{size_mb / elapsed:>10.1f}{baseline / elapsed:>9.2f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Benchmark: streaming report writers vs building the report in memory
+--------------------------------------------------------------------
+Feeds a synthetic scan (--deps dependencies with --per-dep matches each, the
+frames dependency_mapper.iter_mapped_frames yields) to:
+
+    collect   pd.concat of every frame, then DataFrame.to_csv (what the
+              scanners did before they streamed)
+    csv       CsvReportWriter
+    jsonl     JsonlReportWriter
+    parquet   ParquetReportWriter
+
+Reports total seconds, seconds until the first match row is on disk, and
+peak traced Python memory (tracemalloc, in a separate untimed pass) for each.
+Also checks the streamed CSV is byte-identical to the collected one.
+
+Run from the cve_risk_analyzer directory:
+    python -m benchmarks.bench_report_writers --deps 2000 --per-dep 100
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.dependency_mapper import REPORT_COLUMNS
+from src.report_writers import open_report_writer
+
+
+def synthetic_scan(deps, per_dep, seed=0):
+    """Yield one report frame per dependency, as a scan would."""
+    rng = np.random.default_rng(seed)
+    scores = np.round(rng.uniform(0, 10, per_dep), 1)
+    for d in range(deps):
+        yield pd.DataFrame({
+            "req_package": f"package-{d}", "req_version": f"{d % 7}.{d % 13}.0",
+            "cve_id": [f"CVE-2025-{d * per_dep + i:07d}" for i in range(per_dep)],
+            "cpe_vendor": f"vendor{d % 97}", "cpe_product": f"package_{d}", "cpe_version": "*",
+            "cvss_base_score": scores, "severity": np.where(scores >= 7.0, "HIGH", "MEDIUM"),
+            "description": "Synthetic vulnerability in a dependency",
+            "published": "2025-01-01T00:00:00", "last_modified": "2025-02-01T00:00:00",
+        })
+
+
+def collect(frames, path, first):
+    pd.concat(list(frames), ignore_index=True).to_csv(path, index=False)
+    first.append(time.perf_counter())
+
+
+def stream(frames, path, first):
+    with open_report_writer(path, REPORT_COLUMNS) as writer:
+        for frame in frames:
+            writer.write_frame(frame)
+            if not first and writer.rows_written:
+                first.append(time.perf_counter())
+
+
+def run(name, args, path):
+    target = collect if name == "collect" else stream
+    first = []
+    start = time.perf_counter()
+    target(synthetic_scan(args.deps, args.per_dep), path, first)
+    seconds = time.perf_counter() - start
+    # Separate pass: tracing every allocation slows the run down
+    tracemalloc.start()
+    target(synthetic_scan(args.deps, args.per_dep), path, [])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, (first[0] - start) if first else seconds, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--deps", type=int, default=2000, help="dependencies in the scan")
+    parser.add_argument("--per-dep", type=int, default=100, help="matches per dependency")
+    args = parser.parse_args(argv)
+
+    rows = args.deps * args.per_dep
+    print(f"📄 {rows:,} match rows ({args.deps:,} dependencies x {args.per_dep})")
+    print(f"{'writer':<9}{'seconds':>9}{'first row s':>13}{'peak MB':>9}{'file MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"collect": Path(tmp) / "collect.csv", "csv": Path(tmp) / "report.csv",
+                 "jsonl": Path(tmp) / "report.jsonl", "parquet": Path(tmp) / "report.parquet"}
+        for name, path in paths.items():
+            seconds, first_s, peak = run(name, args, path)
+            print(f"{name:<9}{seconds:>9.2f}{first_s:>13.3f}{peak / 1e6:>9.1f}{path.stat().st_size / 1e6:>9.1f}")
+        same = paths["collect"].read_bytes() == paths["csv"].read_bytes()
+        print(f"{'✅' if same else '❌'} streamed CSV {'identical to' if same else 'differs from'} the collected one")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Benchmark: dependency manifest parsing
+--------------------------------------
+Writes a --packages entry frozen environment in three formats and times
+src/requirements_parser.py on each:
+
+    freeze    pip freeze --require-hashes style: name==version plus two
+              "\\"-continued --hash lines, with some extras, markers and ranges
+    poetry    poetry.lock with a [package.dependencies] table per package
+    pipfile   Pipfile.lock ("default" and "develop")
+
+Also reports the peak Python memory while streaming each file (tracemalloc),
+against the file size, and how often the requirement lines agree with
+packaging.requirements.Requirement (if packaging is installed), whose
+per-line parse is timed too.
+
+Run from the cve_risk_analyzer directory:
+    python -m benchmarks.bench_requirements_parser --packages 20000
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.requirements_parser import canonicalize_name, iter_dependencies, logical_lines, parse_requirement
+
+try:
+    from packaging.requirements import Requirement
+except ImportError:  # optional reference parser
+    Requirement = None
+
+
+def synthetic_environment(n, seed=0):
+    rng = random.Random(seed)
+    names = {f"{rng.choice(['py', 'django', 'flask', 'zope', 'aws'])}{rng.choice(['-', '_', '.'])}pkg{i}"
+             for i in range(n)}
+    return [(name, f"{rng.randint(0, 9)}.{rng.randint(0, 30)}.{rng.randint(0, 9)}") for name in sorted(names)]
+
+
+def write_freeze(path, env, rng):
+    with open(path, "w", encoding="utf-8") as f:
+        for name, version in env:
+            roll = rng.random()
+            if roll < 0.1:
+                f.write(f"{name}[extra]=={version} ; python_version >= \"3.8\" \\\n")
+            elif roll < 0.2:
+                f.write(f"{name}>={version},<99 \\\n")
+            else:
+                f.write(f"{name}=={version} \\\n")
+            f.write(f"    --hash=sha256:{rng.getrandbits(256):064x} \\\n")
+            f.write(f"    --hash=sha256:{rng.getrandbits(256):064x}\n")
+
+
+def write_poetry(path, env):
+    with open(path, "w", encoding="utf-8") as f:
+        for name, version in env:
+            f.write(f'[[package]]\nname = "{name}"\nversion = "{version}"\ndescription = ""\n'
+                    f'optional = false\npython-versions = ">=3.8"\n\n'
+                    f'[package.dependencies]\nsix = ">=1.0"\n\n')
+        f.write('[metadata]\nlock-version = "2.0"\n')
+
+
+def write_pipfile(path, env):
+    half = len(env) // 2
+    sections = {name: {pkg: {"hashes": ["sha256:00"], "version": f"=={ver}"} for pkg, ver in part}
+                for name, part in [("default", env[:half]), ("develop", env[half:])]}
+    Path(path).write_text(json.dumps({"_meta": {"hash": {"sha256": "0"}}, **sections}, indent=4))
+
+
+def time_parse(path):
+    start = time.perf_counter()
+    count = sum(1 for _ in iter_dependencies(path))
+    seconds = time.perf_counter() - start
+    # Separate pass: tracing every allocation slows parsing down several times
+    tracemalloc.start()
+    sum(1 for _ in iter_dependencies(path))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, seconds, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--packages", type=int, default=20000, help="packages in the frozen environment")
+    args = parser.parse_args(argv)
+
+    env = synthetic_environment(args.packages)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"freeze": Path(tmp) / "requirements.txt", "poetry": Path(tmp) / "poetry.lock",
+                 "pipfile": Path(tmp) / "Pipfile.lock"}
+        write_freeze(paths["freeze"], env, random.Random(1))
+        write_poetry(paths["poetry"], env)
+        write_pipfile(paths["pipfile"], env)
+
+        print(f"{'format':<9}{'MB':>8}{'packages':>10}{'seconds':>9}{'µs/pkg':>8}{'peak MB':>9}")
+        for name, path in paths.items():
+            count, seconds, peak = time_parse(path)
+            size = path.stat().st_size
+            print(f"{name:<9}{size / 1e6:>8.1f}{count:>10,}{seconds:>9.3f}{seconds / count * 1e6:>8.1f}{peak / 1e6:>9.2f}")
+
+        if Requirement is not None:
+            with open(paths["freeze"], encoding="utf-8") as f:
+                lines = [line.split(" --", 1)[0] for line in logical_lines(f)]
+            start = time.perf_counter()
+            reference = [Requirement(line) for line in lines]
+            packaging_s = time.perf_counter() - start
+            ours = [parse_requirement(line) for line in lines]
+            agree = sum(d.name == canonicalize_name(r.name)
+                        and set(d.specifier.split(",")) == set(str(r.specifier).split(","))
+                        and d.extras == ",".join(sorted(r.extras)) and d.marker == str(r.marker or "")
+                        for d, r in zip(ours, reference))
+            print(f"📐 packaging.Requirement: {packaging_s / len(lines) * 1e6:.1f} µs/line; "
+                  f"same name, specifier, extras and marker on {agree:,}/{len(lines):,} lines")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
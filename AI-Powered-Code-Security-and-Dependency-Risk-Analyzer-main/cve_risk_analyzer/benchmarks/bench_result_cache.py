@@ -0,0 +1,78 @@
+"""
+Benchmark: dependency lookups with and without the result cache
+---------------------------------------------------------------
+Maps --deps (package, version) pins (named after products in the CPE index)
+with dependency_mapper.map_dependencies() four ways:
+
+    uncached  no cache
+    cold      empty cache: every pin misses and is stored
+    disk      a new ResultCache on the same file (a later run): SQLite hits
+    memory    the same ResultCache again: LRU hits
+
+Needs the CPE index: run `python -m src.nvd_ingest` first.
+
+Run from the cve_risk_analyzer directory:
+    python -m benchmarks.bench_result_cache --deps 500
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.cpe_index import open_cpe_index
+from src.dependency_mapper import map_dependencies
+from src.result_cache import CACHE_FILE, ResultCache
+
+PROCESSED_DIR = Path(__file__).resolve().parents[1] / "data" / "processed"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--deps", type=int, default=500, help="distinct pinned packages to map")
+    args = parser.parse_args(argv)
+
+    cpe_index = open_cpe_index(PROCESSED_DIR)
+    if cpe_index is None:
+        print("❌ No CPE index; run `python -m src.nvd_ingest` first")
+        return 1
+    rng = random.Random(0)
+    products = cpe_index.products()
+    req_df = pd.DataFrame([(rng.choice(products), f"{rng.randint(0, 5)}.{rng.randint(0, 9)}")
+                           for _ in range(args.deps)], columns=["package", "version"]).drop_duplicates()
+    print(f"📄 {len(req_df):,} pins")
+
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        fingerprint = cpe_index.meta["fingerprint"]
+        start = time.perf_counter()
+        expected = map_dependencies(req_df, cpe_index=cpe_index)
+        timings["uncached"] = time.perf_counter() - start
+
+        for name, cache in [("cold", ResultCache(Path(tmp) / CACHE_FILE, fingerprint)),
+                            ("disk", ResultCache(Path(tmp) / CACHE_FILE, fingerprint))]:
+            start = time.perf_counter()
+            found = map_dependencies(req_df, cpe_index=cpe_index, cache=cache)
+            timings[name] = time.perf_counter() - start
+        start = time.perf_counter()
+        found = map_dependencies(req_df, cpe_index=cpe_index, cache=cache)
+        timings["memory"] = time.perf_counter() - start
+        same = found.to_csv(index=False) == expected.to_csv(index=False)
+        stats = cache.stats()
+        cache.close()
+
+    print(f"{'run':<10}{'seconds':>10}")
+    for name, seconds in timings.items():
+        print(f"{name:<10}{seconds:>10.3f}")
+    print(f"🎯 cached result identical: {same}; last cache: {stats['memory_hits']} memory / "
+          f"{stats['disk_hits']} disk hits, {stats['misses']} misses")
+    print(f"⚡ warm (disk): {timings['uncached'] / timings['disk']:,.1f}x, "
+          f"warm (memory): {timings['uncached'] / timings['memory']:,.1f}x faster than uncached")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
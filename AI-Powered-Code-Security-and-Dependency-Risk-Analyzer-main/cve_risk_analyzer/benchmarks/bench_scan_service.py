@@ -0,0 +1,112 @@
+"""
+Benchmark: warm scan service vs a fresh process per check
+---------------------------------------------------------
+Needs the ingested CPE index (python -m src.nvd_ingest). Reports:
+
+    cold      wall time of a new Python process that imports the mapper,
+              opens the index and maps one package (what every hook run
+              paid before the service)
+    warm      per-request latency (p50 / p95) of single-package checks
+              against src.scan_service over HTTP, summary only, packages
+              already in the lookup cache
+    burst     --clients concurrent clients sending --requests checks:
+              throughput, and how many model batches served them
+
+The service predicts with trained_model_v2.pkl when it is installed;
+--simulated-model-ms swaps in a predictor that just sleeps that long per
+call, to show how micro-batching amortizes inference.
+
+Run from the cve_risk_analyzer directory:
+    python -m benchmarks.bench_scan_service --clients 16 --requests 400
+"""
+
+import argparse
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.scan_client import request_scan
+from src.scan_service import BASE_DIR, ScanService, make_server
+
+COLD_SCRIPT = """
+import pandas as pd
+from src.cpe_index import open_cpe_index
+from src.dependency_mapper import map_dependencies
+index = open_cpe_index("data/processed")
+map_dependencies(pd.DataFrame([("{package}", "")], columns=["package", "version"]), cpe_index=index)
+"""
+
+
+class SleepingModel:
+    """Stand-in predictor: a fixed cost per call, whatever the batch size."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def predict(self, features):
+        time.sleep(self.seconds)
+        return ["UNKNOWN"] * len(features)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=16, help="concurrent clients in the burst")
+    parser.add_argument("--requests", type=int, default=400, help="single-package checks in the burst")
+    parser.add_argument("--packages", type=int, default=200, help="distinct packages the checks draw from")
+    parser.add_argument("--simulated-model-ms", type=float, default=None,
+                        help="predict with a stand-in that sleeps this long per call")
+    args = parser.parse_args(argv)
+
+    try:
+        service = ScanService(BASE_DIR / "data" / "processed")
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+    if args.simulated_model_ms is not None:
+        service.state.model = SleepingModel(args.simulated_model_ms / 1e3)
+    server = make_server(service, port=0)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    products = service.state.cpe_index.products()
+    rng = np.random.default_rng(0)
+    names = [str(p) for p in rng.choice(products, min(args.packages, len(products)), replace=False)]
+    payloads = [{"dependencies": [{"package": name, "version": ""}], "matches": False} for name in names]
+    for payload in payloads:      # fill the lookup cache
+        request_scan(url, payload)
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", COLD_SCRIPT.format(package=names[0])], cwd=BASE_DIR, check=True)
+    cold_ms = (time.perf_counter() - start) * 1e3
+
+    latencies = []
+    for payload in payloads[:100]:
+        start = time.perf_counter()
+        request_scan(url, payload)
+        latencies.append((time.perf_counter() - start) * 1e3)
+    p50, p95 = np.percentile(latencies, [50, 95])
+
+    batches, calls = service.batcher.batches, service.batcher.calls
+    burst = [payloads[i % len(payloads)] for i in range(args.requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.clients) as pool:
+        list(pool.map(lambda payload: request_scan(url, payload), burst))
+    burst_s = time.perf_counter() - start
+    server.shutdown()
+
+    print(f"🧊 cold process per check : {cold_ms:8.1f} ms")
+    print(f"🔥 warm service p50 / p95 : {p50:8.1f} / {p95:.1f} ms   ({cold_ms / p50:,.0f}x faster)")
+    print(f"🚦 burst {args.requests} checks x {args.clients} clients: {burst_s:.2f} s, "
+          f"{args.requests / burst_s:,.0f} checks/s")
+    if service.state.model is None:
+        print("🤖 no model loaded (trained_model_v2.pkl / joblib missing); pass --simulated-model-ms to see batching")
+    else:
+        print(f"🤖 {service.batcher.calls - calls} predictions in {service.batcher.batches - batches} model calls")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Benchmark: whole-document json.load vs streaming ijson feed reading
+--------------------------------------------------------------------
+Writes a synthetic NVD 2.0 feed (src/synthetic_feed.py), then iterates
+it with the legacy json.load reader and the streaming reader, each in a
+fresh process, and reports items/sec and peak RSS.
+
+Run from the cve_risk_analyzer directory:
+    python -m benchmarks.bench_streaming --cves 50000
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from src.synthetic_feed import write_feed
+
+
+# ---------------- Child process runner ----------------
+def _run_reader(reader_name, feed_path, queue):
+    os.environ["TQDM_DISABLE"] = "1"
+    from src import nvd_ingest
+
+    reader = getattr(nvd_ingest, reader_name)
+    start = time.perf_counter()
+    count = sum(1 for _ in reader(Path(feed_path), nvd_ingest.detect_feed_type(feed_path)))
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((count, elapsed, peak_kb))
+
+
+def measure(reader_name, feed_path):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_reader, args=(reader_name, str(feed_path), queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cves", type=int, default=50000, help="number of CVE items in the feed")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        feed_path = Path(tmp) / "nvdcve-2.0-bench.json"
+        write_feed(feed_path, args.cves)
+        size_mb = feed_path.stat().st_size / 1e6
+        print(f"📄 Synthetic feed: {args.cves:,} CVEs, {size_mb:.1f} MB")
+
+        print(f"{'reader':<26}{'items':>10}{'items/sec':>14}{'peak RSS (MB)':>16}")
+        for reader_name in ("iterate_items_json_load", "iterate_items"):
+            count, elapsed, peak_kb = measure(reader_name, feed_path)
+            print(f"{reader_name:<26}{count:>10,}{count / elapsed:>14,.0f}{peak_kb / 1024:>16.1f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
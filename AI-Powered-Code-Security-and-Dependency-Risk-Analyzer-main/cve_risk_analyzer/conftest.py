@@ -0,0 +1,2 @@
+# conftest.py
+# Puts the cve_risk_analyzer directory on sys.path, so tests import src.* under a bare `pytest` too
@@ -1,8 +1,25 @@
+import argparse
+
 from src.parse_nvd import parse_nvd_feed
 from src.normalize_deps import load_dependencies
-from src.analyzer import analyze_dependencies
+from src.analyzer import ANALYSIS_COLUMNS, iter_matches
+from src.cpe_index import open_cpe_index
+from src.report_writers import open_report_writer
+from src.result_cache import ResultCache, file_fingerprint
+
+PREVIEW_ROWS = 20
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Match data/dependencies/requirements.txt against nvd_processed.csv.")
+    parser.add_argument("--method", default="index", choices=["index", "scan"],
+                        help="index: (vendor, product) lookup; scan: the original per-row substring scan")
+    parser.add_argument("--csv", action="store_true",
+                        help="match against nvd_processed.csv even when the ingested CPE index exists")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="look every dependency up again instead of reusing data/processed/lookup_cache.sqlite")
+    parser.add_argument("--out", default="data/processed/dependency_analysis.csv",
+                        help="report path; .csv, .jsonl / .ndjson or .parquet")
+    args = parser.parse_args()
 
 
     # Step 2: Parse feed into structured CSV
@@ -11,11 +28,27 @@ if __name__ == "__main__":
     # Step 3: Load dependencies
     deps = load_dependencies("data/dependencies/requirements.txt")
 
-    # # Step 4: Run analyzer
-    results = analyze_dependencies(deps)
+    # # Step 4: Run analyzer (memory-mapped index from src.nvd_ingest when available)
+    cpe_index = None if args.csv else open_cpe_index("data/processed")
+    cache = None
+    if not args.no_cache:
+        # Fingerprint of whichever data answers the lookups
+        cache = (ResultCache.for_dataset("data/processed") if cpe_index is not None else
+                 ResultCache("data/processed/lookup_cache.sqlite", file_fingerprint("data/processed/nvd_processed.csv")))
 
+    # Matches are printed and written as they are found
     print("\n🔎 Vulnerability Report:")
-    print(results)
+    matched = 0
+    with open_report_writer(args.out, ANALYSIS_COLUMNS) as writer:
+        for match in iter_matches(deps, method=args.method, cpe_index=cpe_index, cache=cache):
+            writer.write(match)
+            matched += 1
+            if matched <= PREVIEW_ROWS:
+                print(f"{match['dependency']:<30} {match['cve_id']:<18} {match['severity']}")
+    if matched > PREVIEW_ROWS:
+        print(f"... {matched - PREVIEW_ROWS} more")
+    print(f"{matched} vulnerable matches")
 
-    results.to_csv("data/processed/dependency_analysis.csv", index=False)
-    print("\nReport saved to data/processed/dependency_analysis.csv")
+    print(f"\nReport saved to {args.out}")
+    if cache is not None:
+        print(f"Lookup cache: {cache.hits} hits, {cache.misses} misses")
@@ -0,0 +1,4 @@
+#!/usr/bin/env bash
+set -e
+# Sync CVEs from the NVD API 2.0 (pass --since-last-sync for a delta)
+python -m src.nvd_fetch "$@"
\ No newline at end of file
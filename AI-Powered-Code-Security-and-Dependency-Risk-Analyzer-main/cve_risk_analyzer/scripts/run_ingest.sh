@@ -1,3 +1,4 @@
 #!/usr/bin/env bash
 set -e
-python src/nvd_ingest.py
\ No newline at end of file
+# Run as a module so src.* imports resolve
+python -m src.nvd_ingest "$@"
\ No newline at end of file
@@ -11,7 +11,9 @@ This script:
 import pandas as pd
 import joblib
 from pathlib import Path
-from sklearn.preprocessing import LabelEncoder
+
+from src.category_encoder import CategoryEncoder
+from src.requirements_parser import iter_dependencies
 
 # -------------------------------------------------------
 # 1️⃣ Paths & Model Loading
@@ -28,50 +30,29 @@ if not req_path.exists():
     raise FileNotFoundError("❌ requirements.txt missing. Add dependencies first.")
 
 model = joblib.load(model_path)
-base_df = pd.read_csv(data_path)
+base_df = pd.read_csv(data_path, usecols=["cpe_vendor", "cpe_product"])
 print("✅ Loaded trained model and base dataset.")
 
 # -------------------------------------------------------
 # 2️⃣ Prepare encoders (fit from existing dataset)
 # -------------------------------------------------------
-vendor_enc = LabelEncoder()
-product_enc = LabelEncoder()
-
-vendor_enc.fit(base_df["cpe_vendor"].astype(str))
-product_enc.fit(base_df["cpe_product"].astype(str))
+vendor_enc = CategoryEncoder.fit(base_df["cpe_vendor"].astype(str))
+product_enc = CategoryEncoder.fit(base_df["cpe_product"].astype(str))
 
 # -------------------------------------------------------
 # 3️⃣ Parse requirements.txt
 # -------------------------------------------------------
-deps = []
-with open(req_path, "r", encoding="utf-8") as f:
-    for line in f:
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        # Split package and version (if available)
-        if "==" in line:
-            pkg, ver = line.split("==")
-        elif ">" in line:
-            pkg, ver = line.split(">")
-        elif ">=" in line:
-            pkg, ver = line.split(">=")
-        else:
-            pkg, ver = line, "unknown"
-        deps.append({"cpe_vendor": "unknown_vendor", "cpe_product": pkg.lower(), "cvss_base_score": 0.0})
+deps = [{"cpe_vendor": "unknown_vendor", "cpe_product": dep.name, "cvss_base_score": 0.0}
+        for dep in iter_dependencies(req_path)]
 
 req_df = pd.DataFrame(deps)
 print(f"📦 Loaded {len(req_df)} dependencies from requirements.txt")
 
 # -------------------------------------------------------
-# 4️⃣ Encode using known encoders
+# 4️⃣ Encode using known encoders (whole columns; unseen -> -1)
 # -------------------------------------------------------
-req_df["vendor_encoded"] = req_df["cpe_vendor"].apply(
-    lambda x: vendor_enc.transform([x])[0] if x in vendor_enc.classes_ else -1
-)
-req_df["product_encoded"] = req_df["cpe_product"].apply(
-    lambda x: product_enc.transform([x])[0] if x in product_enc.classes_ else -1
-)
+req_df["vendor_encoded"] = vendor_enc.transform(req_df["cpe_vendor"])
+req_df["product_encoded"] = product_enc.transform(req_df["cpe_product"])
 
 # -------------------------------------------------------
 # 5️⃣ Predict severity
@@ -1,12 +1,141 @@
 import pandas as pd
-from src.cpe_mapper import to_cpe_format
+from src.cpe_index import CpeInvertedIndex
+from src.cpe_mapper import alias_table, to_cpe_format, to_vendor_product
+from src.result_cache import cached_lookup
+from src.version_index import version_index_from_rows
 
-def analyze_dependencies(deps, nvd_csv="data/processed/nvd_processed.csv"):
-    df = pd.read_csv(nvd_csv)
+RESULT_COLUMNS = ["cve_id", "severity", "cvss_score", "description"]
+ANALYSIS_COLUMNS = ["dependency", "cve_id", "severity", "score", "description"]
 
-    results = []
+
+def analyze_dependencies(deps, nvd_csv="data/processed/nvd_processed.csv", method="index", cpe_index=None,
+                         cache=None):
+    """
+    Match (package, version) pairs against nvd_processed.csv.
+
+    method="index" (default) builds a (vendor, product) -> rows index once and
+    answers each dependency by lookup: a row matches when it lists the
+    dependency's exact CPE (to_cpe_format), or any CPE of the product when
+    no version is pinned.
+    With cpe_index (the memory-mapped index ingestion writes, see
+    src/cpe_index.py) the CSV is not read at all, and a pinned version also
+    matches the CPE version ranges that include it (src/version_index.py);
+    nvd_processed.csv keeps no range bounds, so there only exact CPEs match.
+    method="scan" is the original per-row substring scan, kept for comparison.
+    With cache (a src.result_cache.ResultCache fingerprinted for the same
+    data), dependencies answered before are not looked up again, and the
+    CSV is only read when some dependency misses.
+
+    Collects iter_dependency_frames() into one DataFrame; stream large scans
+    with iter_matches() instead.
+    """
+    frames = list(iter_dependency_frames(deps, nvd_csv, method, cpe_index, cache))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def iter_matches(deps, nvd_csv="data/processed/nvd_processed.csv", method="index", cpe_index=None,
+                 cache=None, chunk_size=256):
+    """Yield one dict (ANALYSIS_COLUMNS keys) per matched CVE, as soon as its dependency is looked up."""
+    for frame in iter_dependency_frames(deps, nvd_csv, method, cpe_index, cache, chunk_size):
+        yield from frame.to_dict("records")
+
+
+def iter_dependency_frames(deps, nvd_csv="data/processed/nvd_processed.csv", method="index", cpe_index=None,
+                           cache=None, chunk_size=256):
+    """
+    Yield the matches of analyze_dependencies() as DataFrames in dependency
+    order: one per matched dependency, or one per chunk_size dependencies
+    when answering through the cache. Only the data one step needs is held.
+    """
+    if method not in ("index", "scan"):
+        raise ValueError(f"Unknown method '{method}' (expected 'index' or 'scan')")
+
+    def open_matcher():
+        # The CSV is only read (and indexed) once something has to be looked up
+        if cpe_index is not None and method == "index":
+            return lambda todo: _lookup_frames(todo, cpe_index)
+        return _csv_matcher(pd.read_csv(nvd_csv), method)
+
+    if cache is None:
+        yield from open_matcher()(deps)
+        return
+
+    # Names resolve through the alias table, so its data and overrides are part of the answer
+    # (versions=ranges: answers from before range CPEs were matched are not reused)
+    source = "index|versions=ranges" if cpe_index is not None else "csv"
+    mode = f"{method}|{source}|aliases={alias_table().fingerprint}"
+    matcher = []    # built on the first miss, then shared by every chunk
+
+    def resolve(missing):
+        if not matcher:
+            matcher.append(open_matcher())
+        frames = list(matcher[0](missing))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    deps = list(deps)
+    for start in range(0, len(deps), chunk_size):
+        frame = cached_lookup(cache, "analyzer", mode, deps[start:start + chunk_size], resolve, ["dependency"])
+        if len(frame):
+            yield frame
+
+
+def _csv_matcher(df, method):
+    """Generator function over dependencies for nvd_processed.csv rows (index built once)."""
+    if method == "scan":
+        return lambda todo: _scan_frames(todo, df)
+    index = CpeInvertedIndex.from_affected_cpes(df["affected_cpes"])
+    return lambda todo: _index_frames(todo, df, index)
+
+
+def _index_frames(deps, df, index):
+    for pkg, ver in deps:
+        vendor, product = to_vendor_product(pkg)
+        if ver:
+            rows = index.rows_with_uri(vendor, product, to_cpe_format(pkg, ver))
+        else:
+            rows = index.rows(vendor, product)
+        if len(rows) == 0:
+            continue
+        matched = df.iloc[rows][RESULT_COLUMNS]
+        yield pd.DataFrame({
+            "dependency": f"{pkg}=={ver}" if ver else pkg,
+            "cve_id": matched["cve_id"].to_numpy(),
+            "severity": matched["severity"].to_numpy(),
+            "score": matched["cvss_score"].to_numpy(),
+            "description": matched["description"].to_numpy(),
+        })
+
+
+def _lookup_frames(deps, cpe_index):
+    # A pinned dependency matches the application CPEs whose version, or version range
+    # ("*" with versionStart*/versionEnd* bounds), includes it: the VersionIntervalIndex
+    # rules dependency_mapper --match-versions uses
+    for pkg, ver in deps:
+        vendor, product = to_vendor_product(pkg)
+        positions = cpe_index.postings(cpe_index.key_id(vendor, product))
+        if ver and len(positions):
+            rows = cpe_index.frame(positions, record_columns=["cve_id"])
+            application = (rows["cpe_part"] == "a").to_numpy()
+            affected = version_index_from_rows(rows[application]).affected(vendor, product, ver)
+            positions = positions[application & rows["cve_id"].isin(affected).to_numpy()]
+        if len(positions) == 0:
+            continue
+        matched = cpe_index.record_frame(cpe_index.records(positions), ["cve_id", "description"])
+        yield pd.DataFrame({
+            "dependency": f"{pkg}=={ver}" if ver else pkg,
+            "cve_id": matched["cve_id"],
+            "severity": matched["severity"],
+            "score": matched["cvss_base_score"],
+            "description": matched["description"],
+        })
+
+
+def _scan_frames(deps, df):
     for pkg, ver in deps:
         dep_cpe = to_cpe_format(pkg, ver)
+        results = []
 
         for _, row in df.iterrows():
             cpes = row["affected_cpes"]
@@ -36,4 +165,5 @@ def analyze_dependencies(deps, nvd_csv="data/processed/nvd_processed.csv"):
                     "description": row["description"]
                 })
 
-    return pd.DataFrame(results)
+        if results:
+            yield pd.DataFrame(results)
@@ -0,0 +1,199 @@
+# src/batch_scan.py
+"""
+Monorepo batch scan
+-------------------
+Scans every dependency manifest under a directory tree in one run:
+
+1. discover_manifests() walks the tree with os.scandir, skipping VCS,
+   virtualenv and cache directories, and collects requirements*.txt,
+   poetry.lock and Pipfile.lock files (see src/requirements_parser.py).
+2. The (package, version) pairs of all manifests are de-duplicated, so a
+   pin shared by thousands of services is resolved once.
+3. The unique pairs are resolved in chunks by
+   dependency_mapper.map_dependencies() in a process pool. Each worker
+   opens the memory-mapped CPE index once; all of them share its pages.
+4. The results fan back out into one report per manifest
+   (<out>/<manifest path>.report.csv) plus batch_summary.csv.
+
+Run from the cve_risk_analyzer directory:
+    python -m src.batch_scan path/to/monorepo --workers 8
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src import json_backend
+from src.cpe_index import open_cpe_index
+from src.dependency_mapper import REPORT_COLUMNS, load_requirements, map_dependencies
+from src.product_match import MATCH_MODES
+
+SKIP_DIRS = {".git", ".hg", ".svn", ".tox", ".nox", ".venv", "venv", "env", "node_modules",
+             "site-packages", "__pycache__", ".mypy_cache", ".pytest_cache", "build", "dist"}
+LOCKFILES = {"poetry.lock", "Pipfile.lock"}
+SUMMARY_COLUMNS = ["manifest", "dependencies", "vulnerable_dependencies", "cves", "critical", "high"]
+
+
+# ---------------- Discovery ----------------
+def is_manifest(name):
+    return (name.startswith("requirements") and name.endswith(".txt")) or name in LOCKFILES
+
+
+def discover_manifests(root):
+    """Sorted paths of every manifest below root (symlinked directories are not followed)."""
+    found, stack = [], [os.fspath(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append(entry.path)
+                elif is_manifest(entry.name) and entry.is_file():
+                    found.append(Path(entry.path))
+    return sorted(found)
+
+
+def load_manifests(paths):
+    """manifest path -> its (package, version) frame; unreadable manifests are reported and skipped."""
+    manifests = {}
+    for path in paths:
+        try:
+            req_df = load_requirements(path)
+        except (OSError, UnicodeDecodeError) + json_backend.DECODE_ERRORS as e:
+            print(f"⚠️ Skipping {path}: {e}")
+            continue
+        manifests[path] = req_df.reindex(columns=["package", "version"])
+    return manifests
+
+
+def unique_pairs(manifests):
+    frames = [df for df in manifests.values() if len(df)]
+    if not frames:
+        return pd.DataFrame(columns=["package", "version"])
+    return pd.concat(frames, ignore_index=True).drop_duplicates(ignore_index=True)
+
+
+# ---------------- Resolution (process pool) ----------------
+_worker = {}
+
+
+def _init_worker(processed_dir, options):
+    _worker["cpe_index"] = open_cpe_index(processed_dir)
+    _worker["options"] = options
+
+
+def _resolve_chunk(req_df):
+    return map_dependencies(req_df, cpe_index=_worker["cpe_index"], **_worker["options"])
+
+
+def resolve_pairs(pairs, processed_dir, workers=1, chunks_per_worker=4, **options):
+    """map_dependencies() over the unique pairs, split into chunks across worker processes."""
+    if open_cpe_index(processed_dir) is None:
+        raise FileNotFoundError(f"No CPE index in {processed_dir}; run `python -m src.nvd_ingest` first")
+    if pairs.empty:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    n_chunks = min(len(pairs), max(1, workers) * chunks_per_worker)
+    chunks = [pairs.iloc[idx] for idx in np.array_split(np.arange(len(pairs)), n_chunks)]
+    if workers <= 1:
+        _init_worker(processed_dir, options)
+        results = [_resolve_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(processed_dir, options)) as pool:
+            results = list(pool.map(_resolve_chunk, chunks))
+    results = pd.concat(results, ignore_index=True)
+    return results[[c for c in REPORT_COLUMNS if c in results.columns]]
+
+
+# ---------------- Fan-out ----------------
+def report_path(manifest, root, out_dir):
+    return Path(out_dir) / Path(manifest).relative_to(root).with_suffix(".report.csv")
+
+
+def render_groups(results):
+    """(package, version) -> its report rows as CSV text, plus the counts the summary needs."""
+    rendered = {}
+    for pair, rows in results.groupby(["req_package", "req_version"], sort=False):
+        found = rows[rows["cve_id"].notna()]
+        rendered[pair] = (rows.to_csv(header=False, index=False), set(found["cve_id"]),
+                          int((found["severity"] == "CRITICAL").sum()), int((found["severity"] == "HIGH").sum()))
+    return rendered
+
+
+def write_reports(results, manifests, root, out_dir):
+    """One report per manifest with the rows of its dependencies; returns the summary frame.
+
+    Each (package, version) is rendered once and its text reused by every
+    manifest that pins it, so the reports cost no more CSV formatting than
+    the unique pairs do.
+    """
+    rendered = render_groups(results)
+    header = results.iloc[:0].to_csv(index=False)
+    summary = []
+    for manifest, req_df in manifests.items():
+        groups = [rendered[pair] for pair in dict.fromkeys(req_df.itertuples(index=False, name=None))
+                  if pair in rendered]
+        out_path = report_path(manifest, root, out_dir)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(out_path, "w", encoding="utf-8", newline="") as f:
+            f.write(header)
+            f.writelines(text for text, *_ in groups)
+
+        cves = set().union(*(g[1] for g in groups))
+        summary.append({
+            "manifest": str(Path(manifest).relative_to(root)),
+            "dependencies": len(req_df),
+            "vulnerable_dependencies": sum(1 for g in groups if g[1]),
+            "cves": len(cves),
+            "critical": sum(g[2] for g in groups),
+            "high": sum(g[3] for g in groups),
+        })
+    summary = pd.DataFrame(summary, columns=SUMMARY_COLUMNS)
+    summary.to_csv(Path(out_dir) / "batch_summary.csv", index=False)
+    return summary
+
+
+# ---------------- Main ----------------
+def batch_scan(root, out_dir, processed_dir, workers=1, **options):
+    root = Path(root).resolve()
+    start = time.perf_counter()
+    paths = discover_manifests(root)
+    print(f"🔎 Found {len(paths):,} manifests under {root} ({time.perf_counter() - start:.2f} s)")
+
+    manifests = load_manifests(paths)
+    pairs = unique_pairs(manifests)
+    total = sum(len(df) for df in manifests.values())
+    print(f"📦 {total:,} dependencies, {len(pairs):,} unique (package, version) pairs")
+
+    start = time.perf_counter()
+    results = resolve_pairs(pairs, processed_dir, workers, **options)
+    print(f"🧠 Resolved with {workers} worker(s) in {time.perf_counter() - start:.2f} s")
+
+    summary = write_reports(results, manifests, root, out_dir)
+    print(f"\n✅ {len(summary):,} reports saved under:\n{out_dir}")
+    print(f"Manifests with known CVEs: {(summary['cves'] > 0).sum():,}")
+    return summary
+
+
+if __name__ == "__main__":
+    base_dir = Path(__file__).resolve().parents[1]
+    parser = argparse.ArgumentParser(description="Scan every dependency manifest under a directory tree.")
+    parser.add_argument("root", help="directory to search for requirements*.txt, poetry.lock and Pipfile.lock")
+    parser.add_argument("--out", default=str(base_dir / "data" / "processed" / "batch_reports"),
+                        help="directory for the per-manifest reports and batch_summary.csv")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="processes resolving the unique (package, version) pairs")
+    parser.add_argument("--match", default="contains", choices=MATCH_MODES,
+                        help="how package names are matched to CPE products (see src/product_match.py)")
+    parser.add_argument("--match-versions", action="store_true",
+                        help="only report CVEs whose CPE version ranges include the pinned version")
+    parser.add_argument("--python-only", action="store_true",
+                        help="ignore OS/hardware CPEs and applications targeting other ecosystems")
+    args = parser.parse_args()
+    batch_scan(args.root, args.out, base_dir / "data" / "processed", workers=args.workers,
+               match=args.match, match_versions=args.match_versions, python_only=args.python_only)
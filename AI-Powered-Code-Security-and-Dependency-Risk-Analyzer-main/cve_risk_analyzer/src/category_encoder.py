@@ -0,0 +1,73 @@
+# src/category_encoder.py
+"""
+Categorical encoder for the severity models
+-------------------------------------------
+CategoryEncoder maps vendor / product / severity labels to the integer codes
+the models were trained on. A whole column is encoded at once: pd.factorize
+finds its distinct values, and one hash lookup per distinct value (a
+pandas Index of the classes) gives their codes. Labels that were never seen
+get the unknown bucket id (-1 by default) instead of raising.
+
+Codes are the positions of the labels in sorted order, the same as
+sklearn's LabelEncoder. Models trained with LabelEncoder codes work
+unchanged, and load_encoder() accepts both kinds of pickles.
+
+    vendor_enc = CategoryEncoder.fit(df["cpe_vendor"].astype(str))
+    codes = vendor_enc.transform(new_df["cpe_vendor"])     # int64, -1 = unseen
+"""
+
+import numpy as np
+import pandas as pd
+
+UNKNOWN = -1
+
+
+class CategoryEncoder:
+    """Sorted classes with a hash index of them; unseen labels encode to `unknown`."""
+
+    def __init__(self, classes, unknown=UNKNOWN):
+        self.classes_ = np.asarray(classes, dtype=object)
+        self.index = pd.Index(self.classes_)
+        self.unknown = unknown
+        if not self.index.is_unique:
+            raise ValueError("CategoryEncoder classes must be unique")
+
+    @classmethod
+    def fit(cls, values, unknown=UNKNOWN):
+        """Encoder of the distinct values of a column (sorted, like LabelEncoder)."""
+        distinct = pd.unique(pd.Series(values, dtype=object).dropna())
+        return cls(np.sort(distinct.astype(object)), unknown)
+
+    def __len__(self):
+        return len(self.classes_)
+
+    def transform(self, values):
+        """Code of every value (int64 array); missing and unseen values get the unknown id."""
+        row_codes, distinct = pd.factorize(pd.Series(values, dtype=object))
+        codes = self.index.get_indexer(distinct)
+        codes[codes < 0] = self.unknown
+        per_row = codes[row_codes] if len(codes) else np.full(len(row_codes), self.unknown, dtype=np.int64)
+        per_row[row_codes < 0] = self.unknown
+        return per_row.astype(np.int64)
+
+    def inverse_transform(self, codes, unknown_label="UNKNOWN"):
+        """Label of every code (object array); codes outside the classes give unknown_label."""
+        codes = np.asarray(codes, dtype=np.int64)
+        valid = (codes >= 0) & (codes < len(self.classes_))
+        labels = np.full(codes.shape, unknown_label, dtype=object)
+        labels[valid] = self.classes_[codes[valid]]
+        return labels
+
+
+def as_encoder(encoder, unknown=UNKNOWN):
+    """CategoryEncoder for a loaded CategoryEncoder or sklearn LabelEncoder."""
+    if isinstance(encoder, CategoryEncoder) and encoder.unknown == unknown:
+        return encoder
+    return CategoryEncoder(encoder.classes_, unknown)
+
+
+def load_encoder(path, unknown=UNKNOWN):
+    """CategoryEncoder saved by ml_train_v2, or one wrapped around an older LabelEncoder pickle."""
+    import joblib
+
+    return as_encoder(joblib.load(path), unknown)
@@ -0,0 +1,143 @@
+# src/cli.py
+"""
+Command line entry point
+------------------------
+One command for the whole pipeline:
+
+    ingest    normalize the feeds in data/raw into the CVE x CPE dataset
+              and CPE index (options of src.nvd_ingest)
+    scan      CVEs of a manifest: through a running scan service (--url),
+              or locally from the CPE index
+    train     build ml_ready_dataset.csv and train the severity model
+    predict   run a severity predictor
+    serve     run the warm scan service (options of src.scan_service serve)
+
+Only argparse is imported up front. Each subcommand imports what it needs
+when it runs, so `scan --url` (what hooks and CI call on every commit)
+never loads pandas, NumPy, pyarrow or scikit-learn, and a local `scan`
+never loads scikit-learn, SciPy or matplotlib. tests/test_import_time.py
+checks both module sets with -X importtime; benchmarks/bench_import_time.py
+prints the timings and checks their budgets.
+
+Run from the cve_risk_analyzer directory:
+    python -m src.cli ingest --workers 4
+    python -m src.cli scan requirements.txt --url http://127.0.0.1:8765 --fail-on HIGH
+    python -m src.cli train --no-plot
+"""
+
+import argparse
+import sys
+
+FAIL_LEVELS = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]   # src.scan_client.FAIL_LEVELS, without importing it
+PREDICTORS = {"cves": "src.ml_predict_v2", "dependencies": "src.ai_dependency_analyzer",
+              "catalog": "src.enhanced_mapper"}
+PASSTHROUGH = {"ingest", "serve"}
+
+
+# ---------------- Subcommands ----------------
+def run_script(module, argv=()):
+    """Run one of the script-style modules (they do their work on import) as __main__."""
+    import runpy
+
+    saved = sys.argv
+    sys.argv = [module, *argv]
+    try:
+        runpy.run_module(module, run_name="__main__", alter_sys=True)
+    finally:
+        sys.argv = saved
+    return 0
+
+
+def cmd_ingest(args, extra):
+    from src.nvd_ingest import main
+
+    main(extra)
+    return 0
+
+
+def cmd_scan(args, extra):
+    if args.url:
+        from src.scan_client import scan_manifests
+
+        return scan_manifests(args.manifests, args.url, args.fail_on, args.timeout)
+    if len(args.manifests) != 1:
+        print("❌ Without --url, scan one manifest at a time (python -m src.batch_scan scans a whole tree)")
+        return 2
+    from src.dependency_mapper import main
+    from src.scan_client import reaches
+
+    try:
+        worst = main(match_versions=args.match_versions, python_only=args.python_only, match=args.match,
+                     use_cache=not args.no_cache, out_path=args.out, req_path=args.manifests[0])
+    except FileNotFoundError as e:   # no ingested dataset (or no manifest)
+        print(f"❌ {e}")
+        return 2
+    return 1 if worst is not None and reaches(worst, args.fail_on) else 0
+
+
+def cmd_train(args, extra):
+    if not args.skip_preprocess:
+        run_script("src.ml_preprocess")
+    return run_script("src.ml_train" if args.v1 else "src.ml_train_v2", ["--no-plot"] if args.no_plot else [])
+
+
+def cmd_predict(args, extra):
+    return run_script(PREDICTORS[args.target])
+
+
+def cmd_serve(args, extra):
+    from src.scan_service import main
+
+    return main(["serve", *extra])
+
+
+# ---------------- Main ----------------
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="AI-powered dependency risk analyzer.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="normalize data/raw feeds (options of python -m src.nvd_ingest)")
+    ingest.set_defaults(run=cmd_ingest)
+
+    scan = commands.add_parser("scan", help="CVEs of a manifest, via the scan service or the local index")
+    scan.add_argument("manifests", nargs="+", help="requirements.txt, pip freeze output, poetry.lock or Pipfile.lock")
+    scan.add_argument("--url", help="scan service to ask (python -m src.cli serve); default: look up locally")
+    scan.add_argument("--fail-on", choices=FAIL_LEVELS, help="exit 1 if a dependency has a CVE this severe")
+    scan.add_argument("--timeout", type=float, default=30.0, help="seconds to wait for the service")
+    scan.add_argument("--out", help="local scans: report path (.csv, .jsonl or .parquet)")
+    scan.add_argument("--match", default="contains", choices=["contains", "exact", "regex"],
+                      help="local scans: how package names match CPE products")
+    scan.add_argument("--match-versions", action="store_true",
+                      help="local scans: only CVEs whose version ranges include the pinned version")
+    scan.add_argument("--python-only", action="store_true",
+                      help="local scans: ignore OS/hardware CPEs and other ecosystems")
+    scan.add_argument("--no-cache", action="store_true", help="local scans: do not use the lookup cache")
+    scan.set_defaults(run=cmd_scan)
+
+    train = commands.add_parser("train", help="preprocess the dataset and train the severity model")
+    train.add_argument("--v1", action="store_true", help="train the structured-only model (ml_train.py)")
+    train.add_argument("--skip-preprocess", action="store_true", help="reuse the existing ml_ready_dataset.csv")
+    train.add_argument("--no-plot", action="store_true", help="do not show the confusion matrix")
+    train.set_defaults(run=cmd_train)
+
+    predict = commands.add_parser("predict", help="predict severities with the trained model")
+    predict.add_argument("target", nargs="?", default="cves", choices=list(PREDICTORS),
+                         help="cves: sample CVE descriptions (v2 model); dependencies: requirements.txt; "
+                              "catalog: requirements_test.txt through the CPE catalog")
+    predict.set_defaults(run=cmd_predict)
+
+    serve = commands.add_parser("serve", help="run the scan service (options of python -m src.scan_service serve)")
+    serve.set_defaults(run=cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if extra and args.command not in PASSTHROUGH:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    return args.run(args, extra)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+# src/compressed_io.py
+"""
+Compressed feed I/O
+-------------------
+NVD feeds can stay compressed on disk: .gz, .bz2, .xz and .zst (the last one
+needs the optional `zstandard` package).
+
+open_feed() decompresses in a background reader thread that fills a
+bounded queue of chunks, while the caller parses from the other end. zlib,
+bz2, lzma and zstandard all release the GIL while they work, so
+decompression and JSON parsing overlap and a feed uses close to two cores
+instead of one. The queue bound caps the read-ahead at
+max_chunks x chunk_size bytes.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import queue
+import threading
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for .zst feeds
+    zstandard = None
+
+DEFAULT_CHUNK_SIZE = 1 << 20    # 1 MiB of decompressed data per queue entry
+DEFAULT_MAX_CHUNKS = 8
+# Module default for open_feed(threaded=None); benchmarks switch it off for comparison
+THREADED = True
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz", ".zst")
+
+
+def _open_zst(path, mode="rb"):
+    if zstandard is None:
+        raise ImportError(f"Reading {path} needs the 'zstandard' package (pip install zstandard)")
+    fh = open(path, mode)
+    if "r" in mode:
+        # read_across_frames: files written by multi-threaded `zstd -T` contain several frames
+        return zstandard.ZstdDecompressor().stream_reader(fh, read_across_frames=True)
+    return zstandard.ZstdCompressor(level=10).stream_writer(fh)
+
+
+_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open, ".zst": _open_zst}
+
+
+def _opener(path):
+    for suffix, opener in _OPENERS.items():
+        if str(path).endswith(suffix):
+            return opener
+    return None
+
+
+def is_compressed(path):
+    return _opener(path) is not None
+
+
+class ThreadedReader(io.RawIOBase):
+    """Read-ahead wrapper: a daemon thread reads `raw` into a bounded queue of chunks."""
+
+    def __init__(self, raw, chunk_size=DEFAULT_CHUNK_SIZE, max_chunks=DEFAULT_MAX_CHUNKS):
+        super().__init__()
+        self._raw = raw
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._stop = threading.Event()
+        self._pending = memoryview(b"")
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill, args=(chunk_size,), daemon=True,
+                                        name="feed-decompress")
+        self._thread.start()
+
+    def _fill(self, chunk_size):
+        try:
+            while not self._stop.is_set():
+                chunk = self._raw.read(chunk_size)
+                self._put(chunk)
+                if not chunk:
+                    return
+        except Exception as e:
+            # Re-raised on the reading side
+            self._put(e)
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        if not self._pending:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if isinstance(item, Exception):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._pending = memoryview(item)
+        n = min(len(buf), len(self._pending))
+        buf[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def close(self):
+        if not self.closed:
+            # The filler may be blocked on a full queue; _put() checks the stop flag
+            self._stop.set()
+            self._thread.join()
+            self._raw.close()
+        super().close()
+
+
+def open_feed(path, mode="rb", threaded=None, chunk_size=DEFAULT_CHUNK_SIZE, max_chunks=DEFAULT_MAX_CHUNKS):
+    """Open a plain or compressed feed for reading ("rb" or "rt").
+
+    Compressed feeds are decompressed in a reader thread unless threaded=False.
+    """
+    encoding = None if "b" in mode else "utf-8"
+    opener = _opener(path)
+    if opener is None:
+        return open(path, mode, encoding=encoding)
+
+    stream = opener(path, "rb")
+    if THREADED if threaded is None else threaded:
+        stream = io.BufferedReader(ThreadedReader(stream, chunk_size, max_chunks), buffer_size=chunk_size)
+    return stream if "b" in mode else io.TextIOWrapper(stream, encoding="utf-8")
+
+
+def open_for_write(path):
+    """Text-mode writer that compresses according to the file suffix (plain when none matches)."""
+    opener = _opener(path)
+    if opener is None:
+        return open(path, "w", encoding="utf-8")
+    if opener is _open_zst:
+        return io.TextIOWrapper(_open_zst(path, "wb"), encoding="utf-8")
+    return opener(path, "wt", encoding="utf-8")
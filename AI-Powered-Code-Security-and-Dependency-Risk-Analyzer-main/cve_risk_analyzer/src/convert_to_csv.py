@@ -17,6 +17,8 @@ except Exception as e:
 # --- Clean & reorder columns for readability ---
 columns_order = [
     "cve_id", "description", "cpe_vendor", "cpe_product", "cpe_version",
+    "version_start_including", "version_start_excluding",
+    "version_end_including", "version_end_excluding", "vulnerable",
     "cvss_version", "cvss_base_score", "cvss_vector",
     "published", "last_modified"
 ]
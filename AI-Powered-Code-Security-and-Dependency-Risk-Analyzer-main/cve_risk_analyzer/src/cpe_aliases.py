@@ -0,0 +1,162 @@
+# src/cpe_aliases.py
+"""
+PyPI name -> CPE (vendor, product) alias table
+----------------------------------------------
+Generated from the CPE catalog, so a package resolves to its CPE with one
+dict lookup instead of a substring or fuzzy search.
+
+Every catalog product contributes its PEP 503 name (hyphen, underscore and
+dot variants are one alias) plus derived aliases, ranked:
+
+    0  the product itself               python_dateutil   -> python-dateutil
+    1  without a python-/py- prefix     python-ldap       -> ldap
+       or a -python/-py suffix          docker-py         -> docker
+    2  with a python- prefix            jose              -> python-jose
+
+When several (vendor, product) keys claim an alias, the lowest rank wins,
+then a vendor named like the package ("pillow:pillow" over "debian:pillow"),
+then the key with the most CVEs. The number of competing keys is kept.
+
+User overrides (package,vendor,product CSV) are consulted before the
+generated aliases. Ingestion saves the table next to the CPE index
+(cpe_index/aliases/); the arrays are opened with mmap and turned into a dict
+on first lookup.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.requirements_parser import canonicalize_name
+
+ALIAS_DIR = "aliases"
+ALIAS_FORMAT = 1
+OVERRIDES_FILE = "cpe_alias_overrides.csv"
+ARRAYS = ("names", "vendors", "products", "candidates")
+
+_PREFIXES = ("python-", "python3-", "py-")
+_SUFFIXES = ("-python", "-python3", "-py")
+
+
+def alias_variants(product):
+    """(alias, rank) pairs a catalog product answers to."""
+    name = canonicalize_name(product)
+    variants = [(name, 0)]
+    variants += [(name[len(p):], 1) for p in _PREFIXES if name.startswith(p) and len(name) > len(p)]
+    variants += [(name[:-len(s)], 1) for s in _SUFFIXES if name.endswith(s) and len(name) > len(s)]
+    if not name.startswith("python-"):
+        variants.append(("python-" + name, 2))
+    return variants
+
+
+def read_overrides(path):
+    """{alias: (vendor, product)} from a package,vendor,product CSV ({} if the file does not exist)."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    df = pd.read_csv(path, dtype=str).dropna(subset=["package", "vendor", "product"])
+    return {canonicalize_name(p): (v.strip().lower(), r.strip().lower())
+            for p, v, r in df[["package", "vendor", "product"]].itertuples(index=False)}
+
+
+def _decode(values):
+    """UTF-8 strings of an S array (astype(str) would decode as ASCII and fail on non-ASCII names)."""
+    return np.char.decode(values, "utf-8").tolist()
+
+
+class AliasTable:
+    """Sorted alias names with the (vendor, product) each resolves to; lookup() is O(1)."""
+
+    def __init__(self, names, vendors, products, candidates, overrides=None, source=""):
+        self.names = names              # S bytes, sorted
+        self.vendors = vendors          # S bytes, per alias
+        self.products = products        # S bytes, per alias
+        self.candidates = candidates    # keys that claimed the alias
+        self.overrides = dict(overrides or {})
+        self.source = source
+        self._lookup = None
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def build(cls, vendors, products, cve_counts=None):
+        """Table over catalog keys: parallel vendor / product sequences and their CVE counts."""
+        vendors, products = list(vendors), list(products)
+        counts = np.zeros(len(vendors), dtype=np.int64) if cve_counts is None else np.asarray(cve_counts)
+        rows = []
+        for key, (vendor, product) in enumerate(zip(vendors, products)):
+            if not product:
+                continue
+            vendor_name = canonicalize_name(vendor)
+            for alias, rank in alias_variants(product):
+                affinity = vendor_name in (alias, canonicalize_name(product), "python-" + alias)
+                rows.append((alias, rank, not affinity, -int(counts[key]), key))
+        df = pd.DataFrame(rows, columns=["alias", "rank", "other_vendor", "neg_count", "key"])
+        if df.empty:
+            empty = np.array([], dtype=bytes)
+            return cls(empty, empty, empty, np.zeros(0, dtype=np.int32))
+        candidates = df.groupby("alias", sort=False)["key"].nunique()
+        best = df.sort_values(["alias", "rank", "other_vendor", "neg_count", "key"]).drop_duplicates("alias")
+        keys = best["key"].to_numpy()
+        return cls(np.array([a.encode("utf-8") for a in best["alias"]], dtype=bytes),
+                   np.array([vendors[k].encode("utf-8") for k in keys], dtype=bytes),
+                   np.array([products[k].encode("utf-8") for k in keys], dtype=bytes),
+                   candidates.loc[best["alias"]].to_numpy().astype(np.int32))
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        """Table over a unique_cpes.csv-style frame (cpe_vendor, cpe_product, cve_count)."""
+        catalog = catalog.dropna(subset=["cpe_vendor", "cpe_product"])
+        grouped = catalog.assign(cpe_vendor=catalog["cpe_vendor"].astype(str).str.lower(),
+                                 cpe_product=catalog["cpe_product"].astype(str).str.lower())
+        grouped = grouped.groupby(["cpe_vendor", "cpe_product"], sort=True)["cve_count"].sum().reset_index()
+        return cls.build(grouped["cpe_vendor"], grouped["cpe_product"], grouped["cve_count"].fillna(0))
+
+    def save(self, out_dir):
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for name in ARRAYS:
+            np.save(out_dir / f"{name}.npy", getattr(self, name))
+        (out_dir / "meta.json").write_text(json.dumps({"format": ALIAS_FORMAT, "aliases": len(self.names)}))
+
+    @classmethod
+    def load(cls, table_dir, overrides=None, source=""):
+        table_dir = Path(table_dir)
+        meta = json.loads((table_dir / "meta.json").read_text())
+        if meta.get("format") != ALIAS_FORMAT:
+            raise ValueError(f"Unsupported alias table format in {table_dir}: {meta.get('format')}")
+        arrays = (np.asarray(np.load(table_dir / f"{name}.npy", mmap_mode="r")) for name in ARRAYS)
+        return cls(*arrays, overrides=overrides, source=source)
+
+    @property
+    def fingerprint(self):
+        """Identifies the answers: the data the table came from plus the overrides."""
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(self.source.encode("utf-8"))
+        digest.update(json.dumps(sorted(self.overrides.items())).encode("utf-8"))
+        return digest.hexdigest()
+
+    def lookup(self, package):
+        """(vendor, product) for a package name, or None if neither the overrides nor the catalog know it."""
+        name = canonicalize_name(package)
+        if name in self.overrides:
+            return self.overrides[name]
+        if self._lookup is None:
+            # One pass over the arrays; every later lookup is a dict hit
+            self._lookup = {alias: i for i, alias in enumerate(_decode(self.names))}
+        i = self._lookup.get(name)
+        if i is None:
+            return None
+        return self.vendors[i].decode("utf-8"), self.products[i].decode("utf-8")
+
+    def collisions(self):
+        """Aliases more than one (vendor, product) key claimed, with the winner and the number of claimants."""
+        many = np.flatnonzero(self.candidates > 1)
+        return pd.DataFrame({
+            "alias": _decode(self.names[many]), "cpe_vendor": _decode(self.vendors[many]),
+            "cpe_product": _decode(self.products[many]), "candidates": self.candidates[many],
+        })
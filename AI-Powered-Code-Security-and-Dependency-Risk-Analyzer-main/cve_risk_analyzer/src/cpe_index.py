@@ -0,0 +1,443 @@
+# src/cpe_index.py
+"""
+Inverted CPE index
+------------------
+Maps a normalized (vendor, product) to the rows that list a CPE for it, so a
+dependency is answered with one dict lookup instead of a scan over every CVE.
+
+Built in one vectorized pass: the "; "-joined affected_cpes column is split
+into one URI per row, the vendor/product attributes are parsed with
+split_cpe_column(), and the (key, row) pairs are sorted so each key owns a
+contiguous slice of the postings.
+
+Ingestion also persists an index of the processed dataset as plain arrays
+(data/processed/cpe_index/), with a trigram index of the product names and
+the PyPI -> CPE alias table next to it; MappedCpeIndex opens it with mmap,
+so scanners look packages up without loading the dataset.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.cpe_aliases import ALIAS_DIR, AliasTable
+from src.cpe_parse import _string_array, split_cpe_column
+from src.cve_store import CATALOG_COLUMNS, CPE_KEY_COLUMNS
+from src.cvss import SEVERITY_LABELS, severity_codes
+from src.fuzzy_index import TrigramIndex
+from src.product_match import ProductMatcher
+
+URI_SEPARATOR = "; "   # how parse_nvd joins affected_cpes
+
+
+def normalize_key(vendor, product):
+    return f"{vendor.strip().lower()}:{product.strip().lower()}"
+
+
+class CpeInvertedIndex:
+    """(vendor, product) -> (row ids, CPE URIs) postings."""
+
+    def __init__(self, keys, offsets, row_ids, uris):
+        self.row_ids = row_ids      # postings, grouped by key and sorted by row id within a key
+        self.uris = uris            # CPE URI of each posting
+        self._slices = {key: (offsets[i], offsets[i + 1]) for i, key in enumerate(keys)}
+
+    def __len__(self):
+        return len(self._slices)
+
+    def __contains__(self, key):
+        return normalize_key(*key) in self._slices
+
+    @classmethod
+    def from_affected_cpes(cls, affected_cpes):
+        """Build from a column of URI lists joined with "; " (nvd_processed.csv's affected_cpes)."""
+        lists = pc.split_pattern(_string_array(affected_cpes), URI_SEPARATOR)
+        row_ids = pc.list_parent_indices(lists)
+        uris = pc.list_flatten(lists)
+        present = pc.not_equal(uris, "")
+        row_ids, uris = row_ids.filter(present), uris.filter(present)
+        return cls.from_uris(row_ids, uris)
+
+    @classmethod
+    def from_uris(cls, row_ids, uris):
+        """Build from parallel arrays of row ids and CPE URIs (one posting each)."""
+        attrs = split_cpe_column(uris, ["vendor", "product"])
+        keys = pc.binary_join_element_wise(
+            pc.utf8_lower(pc.utf8_trim_whitespace(attrs["vendor"].cast(pa.string()))),
+            pc.utf8_lower(pc.utf8_trim_whitespace(attrs["product"].cast(pa.string()))), ":")
+        table = pa.table({"key": keys, "row": row_ids, "uri": _string_array(uris)})
+        table = table.sort_by([("key", "ascending"), ("row", "ascending")])
+
+        sorted_keys = table["key"].to_numpy()
+        bounds = np.flatnonzero(sorted_keys[1:] != sorted_keys[:-1]) + 1
+        offsets = np.concatenate([[0], bounds, [len(sorted_keys)]]).astype(np.int64)
+        unique_keys = sorted_keys[offsets[:-1]] if len(sorted_keys) else []
+        return cls(list(unique_keys), offsets, table["row"].to_numpy().astype(np.int64),
+                   table["uri"].to_numpy(zero_copy_only=False))
+
+    def postings(self, vendor, product):
+        """(row ids, URIs) of every CPE listed for vendor:product; empty arrays when unknown."""
+        start, end = self._slices.get(normalize_key(vendor, product), (0, 0))
+        return self.row_ids[start:end], self.uris[start:end]
+
+    def rows(self, vendor, product):
+        """Sorted distinct row ids that list any CPE of vendor:product."""
+        return np.unique(self.postings(vendor, product)[0])
+
+    def rows_with_uri(self, vendor, product, uri):
+        """Sorted distinct row ids that list exactly this CPE URI."""
+        rows, uris = self.postings(vendor, product)
+        return np.unique(rows[uris == uri])
+
+
+# ---------------- Persistent, memory-mapped index ----------------
+# Ingestion writes data/processed/cpe_index/ next to the dataset. Every array
+# is a .npy file (or a raw .bin byte blob) opened with mmap, so a scanner
+# starts in milliseconds and scanners on one host share the page cache.
+#
+#   key_vendor.npy, key_product.npy   sorted lowercase (vendor, product) keys (fixed-width bytes)
+#   key_offsets.npy                   postings of key i are [offsets[i], offsets[i + 1])
+#   post_row.npy                      flat dataset row of each posting (one per CVE x CPE row)
+#   post_record.npy                   CVE record of each posting
+#   post_<column>.npy                 CPE version / part / target_sw / range codes into pool.bin (-1 = null)
+#   post_vulnerable.npy               1 / 0 / -1 (null)
+#   pool.bin, pool_offsets.npy        the distinct posting strings
+#   rec_<column>.bin / _offsets.npy   per-record strings (cve_id, description, published, last_modified,
+#                                     cvss_vector; indexes written before cvss_vector read it as null)
+#   rec_cvss_base_score.npy           per-record score (NaN = none)
+#   rec_severity.npy                  per-record SEVERITY_LABELS code
+#   fuzzy/                            trigram index over the product names (src/fuzzy_index.py)
+#
+# A record is one CVE occurrence: a run of rows with the same cve_id.
+
+INDEX_DIR = "cpe_index"
+FUZZY_DIR = "fuzzy"
+INDEX_FORMAT = 1
+POSTING_COLUMNS = ["cpe_version", "cpe_part", "cpe_target_sw", "version_start_including",
+                   "version_start_excluding", "version_end_including", "version_end_excluding"]
+RECORD_STRING_COLUMNS = ["cve_id", "description", "published", "last_modified", "cvss_vector"]
+
+
+def _string_values(column):
+    return [v.encode("utf-8") for v in pc.fill_null(column.cast(pa.string()), "").to_pylist()]
+
+
+class CpeIndexWriter:
+    """Accumulates the index while ChunkedRowWriter streams rows; written on close().
+
+    Per-record strings go straight to disk; only the integer posting columns
+    and the (small) pool of distinct CPE strings are held in memory.
+    """
+
+    def __init__(self, index_dir):
+        self.index_dir = Path(index_dir)
+        self._tmp_dir = self.index_dir.with_name(self.index_dir.name + ".tmp")
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+        self._tmp_dir.mkdir(parents=True)
+        self._pool = {}                   # posting string -> code
+        self._postings = {c: [] for c in ["row", "record", "vendor", "product", "vulnerable"] + POSTING_COLUMNS}
+        self._blobs = {c: open(self._tmp_dir / f"rec_{c}.bin", "wb") for c in RECORD_STRING_COLUMNS}
+        self._blob_ends = {c: [np.zeros(1, np.int64)] for c in RECORD_STRING_COLUMNS}
+        self._blob_sizes = dict.fromkeys(RECORD_STRING_COLUMNS, 0)
+        self._scores, self._severities = [], []
+        self._rows, self._records, self._last_cve = 0, 0, None
+
+    def _codes(self, column):
+        encoded = pc.dictionary_encode(column).combine_chunks()
+        lut = np.array([self._pool.setdefault(v, len(self._pool)) for v in encoded.dictionary.to_pylist()]
+                       + [-1], dtype=np.int32)
+        return lut[pc.fill_null(encoded.indices, -1).to_numpy()]
+
+    def write(self, table):
+        n = table.num_rows
+        if n == 0:
+            return
+        ids = table["cve_id"].to_pandas().fillna("").to_numpy(dtype=object)
+        starts = np.empty(n, dtype=bool)
+        starts[0] = ids[0] != self._last_cve
+        starts[1:] = ids[1:] != ids[:-1]
+        records = np.cumsum(starts) - 1 + self._records
+        self._records = int(records[-1]) + 1
+        self._last_cve = ids[-1]
+
+        firsts = table.filter(pa.array(starts))
+        for name in RECORD_STRING_COLUMNS:
+            # A batch that only continues the previous CVE starts no record (empty ends)
+            values = _string_values(firsts[name])
+            self._blobs[name].write(b"".join(values))
+            ends = np.cumsum([len(v) for v in values], dtype=np.int64) + self._blob_sizes[name]
+            self._blob_ends[name].append(ends)
+            self._blob_sizes[name] += sum(len(v) for v in values)
+        scores = firsts["cvss_base_score"].to_numpy(zero_copy_only=False).astype(np.float64)
+        self._scores.append(scores)
+        self._severities.append(severity_codes(scores, firsts["cvss_version"].to_pylist()))
+
+        vendor = pc.utf8_lower(pc.utf8_trim_whitespace(pc.fill_null(table["cpe_vendor"], "")))
+        product = pc.utf8_lower(pc.utf8_trim_whitespace(pc.fill_null(table["cpe_product"], "")))
+        present = pc.not_equal(product, "")
+        keep = present.to_numpy(zero_copy_only=False)
+        postings = self._postings
+        postings["row"].append(np.arange(self._rows, self._rows + n, dtype=np.int64)[keep])
+        postings["record"].append(records[keep].astype(np.int32))
+        postings["vendor"].append(self._codes(vendor.filter(present)))
+        postings["product"].append(self._codes(product.filter(present)))
+        for name in POSTING_COLUMNS:
+            postings[name].append(self._codes(table[name].filter(present)))
+        vulnerable = pc.fill_null(table["vulnerable"].filter(present).cast(pa.int8()), -1)
+        postings["vulnerable"].append(vulnerable.to_numpy().astype(np.int8))
+        self._rows += n
+
+    def close(self):
+        for blob in self._blobs.values():
+            blob.close()
+        tmp = self._tmp_dir
+        # Codes were handed out in arrival order; renumber them in sorted order
+        # so the files do not depend on how the rows were batched
+        pool = [s.encode("utf-8") for s in self._pool]
+        order = sorted(range(len(pool)), key=pool.__getitem__)
+        pool = [pool[i] for i in order]
+        recode = np.empty(len(order) + 1, dtype=np.int32)
+        recode[order] = np.arange(len(order), dtype=np.int32)
+        recode[-1] = -1
+        np.save(tmp / "pool_offsets.npy", np.concatenate([[0], np.cumsum([len(s) for s in pool])]).astype(np.int64))
+        (tmp / "pool.bin").write_bytes(b"".join(pool))
+        for name in RECORD_STRING_COLUMNS:
+            np.save(tmp / f"rec_{name}_offsets.npy", np.concatenate(self._blob_ends[name]))
+        np.save(tmp / "rec_cvss_base_score.npy", np.concatenate(self._scores or [np.zeros(0)]))
+        np.save(tmp / "rec_severity.npy", np.concatenate(self._severities or [np.zeros(0, np.uint8)]))
+
+        columns = {name: (np.concatenate(parts) if parts else np.zeros(0, np.int32))
+                   for name, parts in self._postings.items()}
+        for name in ["vendor", "product"] + POSTING_COLUMNS:
+            columns[name] = recode[columns[name]]
+        # Rank each distinct (vendor, product) pair by its bytes, then group postings by key
+        pairs = columns["vendor"].astype(np.int64) << 32 | columns["product"].astype(np.int64)
+        distinct, key_of = np.unique(pairs, return_inverse=True)
+        key_pairs = [(pool[p >> 32], pool[p & 0xFFFFFFFF]) for p in distinct.tolist()]
+        order = sorted(range(len(key_pairs)), key=key_pairs.__getitem__)
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        key_of = rank[key_of]
+        permutation = np.argsort(key_of, kind="stable")
+
+        sorted_pairs = [key_pairs[i] for i in order]
+        np.save(tmp / "key_vendor.npy", np.array([v for v, _ in sorted_pairs], dtype=bytes))
+        np.save(tmp / "key_product.npy", np.array([p for _, p in sorted_pairs], dtype=bytes))
+        counts = np.bincount(key_of, minlength=len(order))
+        np.save(tmp / "key_offsets.npy", np.concatenate([[0], np.cumsum(counts)]).astype(np.int64))
+        for name in ["row", "record", "vulnerable"] + POSTING_COLUMNS:
+            np.save(tmp / f"post_{name}.npy", columns[name][permutation])
+        TrigramIndex.build({p.decode("utf-8") for _, p in sorted_pairs}).save(tmp / FUZZY_DIR)
+        # Distinct CVE records per key break ties between vendors claiming the same alias
+        n_records = max(self._records, 1)
+        key_records = np.unique(key_of * n_records + columns["record"])
+        cve_counts = np.bincount(key_records // n_records, minlength=len(order))
+        AliasTable.build([v.decode("utf-8") for v, _ in sorted_pairs], [p.decode("utf-8") for _, p in sorted_pairs],
+                         cve_counts).save(tmp / ALIAS_DIR)
+        (tmp / "meta.json").write_text(json.dumps({
+            "format": INDEX_FORMAT, "keys": len(order), "postings": int(len(permutation)),
+            "records": self._records, "rows": self._rows, "fingerprint": content_fingerprint(tmp)}))
+
+        # Swap the directory in; processes that still map the old files keep reading them
+        old = self.index_dir.with_name(self.index_dir.name + ".old")
+        shutil.rmtree(old, ignore_errors=True)
+        if self.index_dir.exists():
+            os.replace(self.index_dir, old)
+        os.replace(tmp, self.index_dir)
+        shutil.rmtree(old, ignore_errors=True)
+
+    def abort(self):
+        for blob in self._blobs.values():
+            blob.close()
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+
+def content_fingerprint(index_dir):
+    """Hash of every index file; the same data always gives the same value, any change a new one."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(p for p in Path(index_dir).rglob("*") if p.is_file() and p.name != "meta.json"):
+        digest.update(path.relative_to(index_dir).as_posix().encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _map_bytes(path):
+    # mmap refuses empty files
+    if path.stat().st_size == 0:
+        return b""
+    with open(path, "rb") as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class _MappedStrings:
+    """A byte blob plus offsets; take() decodes each distinct element once."""
+
+    def __init__(self, blob_path, offsets_path):
+        self._blob = _map_bytes(blob_path)
+        self._offsets = np.asarray(np.load(offsets_path, mmap_mode="r"))
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        return self._blob[int(self._offsets[i]):int(self._offsets[i + 1])].decode("utf-8")
+
+    def take(self, indices):
+        """Decoded strings at these positions (None where the index is -1), as an object array."""
+        distinct, inverse = np.unique(np.asarray(indices, dtype=np.int64), return_inverse=True)
+        present = distinct[distinct >= 0]
+        blob = self._blob
+        starts, ends = self._offsets[present].tolist(), self._offsets[present + 1].tolist()
+        decoded = [blob[a:b].decode("utf-8") for a, b in zip(starts, ends)]
+        values = np.array(([None] if len(present) < len(distinct) else []) + decoded, dtype=object)
+        return values[inverse]
+
+
+class MappedCpeIndex:
+    """Read side of the index written by CpeIndexWriter; nothing is loaded until it is touched."""
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir = Path(index_dir)
+        self.meta = json.loads((index_dir / "meta.json").read_text())
+        if self.meta.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported CPE index format in {index_dir}: {self.meta.get('format')}")
+
+        def load(name):
+            # A plain ndarray view of the map; np.memmap adds overhead to every slice
+            return np.asarray(np.load(index_dir / f"{name}.npy", mmap_mode="r"))
+
+        self.key_vendor, self.key_product, self.offsets = load("key_vendor"), load("key_product"), load("key_offsets")
+        self.post_row, self.post_record = load("post_row"), load("post_record")
+        self.post_vulnerable = load("post_vulnerable")
+        self._post_codes = {name: load(f"post_{name}") for name in POSTING_COLUMNS}
+        self._pool = _MappedStrings(index_dir / "pool.bin", index_dir / "pool_offsets.npy")
+        self._records = {name: _MappedStrings(index_dir / f"rec_{name}.bin", index_dir / f"rec_{name}_offsets.npy")
+                         for name in RECORD_STRING_COLUMNS if (index_dir / f"rec_{name}.bin").exists()}
+        self.rec_score, self.rec_severity = load("rec_cvss_base_score"), load("rec_severity")
+        self._products = self._matcher = None
+
+    def __len__(self):
+        return len(self.key_vendor)
+
+    def __contains__(self, key):
+        return self.key_id(*key) >= 0
+
+    # ---- key lookups (all keys are lowercase) ----
+    def key_id(self, vendor, product):
+        """Position of (vendor, product) in the sorted keys, or -1."""
+        vendor = vendor.strip().lower().encode("utf-8")
+        product = product.strip().lower().encode("utf-8")
+        lo = np.searchsorted(self.key_vendor, vendor, side="left")
+        hi = np.searchsorted(self.key_vendor, vendor, side="right")
+        i = lo + np.searchsorted(self.key_product[lo:hi], product)
+        return int(i) if i < hi and self.key_product[i] == product else -1
+
+    def key_ids_for_product(self, product):
+        """Keys of every vendor that ships this product."""
+        return np.flatnonzero(self.key_product == product.strip().lower().encode("utf-8"))
+
+    def key_ids_for_products(self, products):
+        """Keys of every vendor that ships any of these products."""
+        wanted = np.array([p.strip().lower().encode("utf-8") for p in products], dtype=bytes)
+        return np.flatnonzero(np.isin(self.key_product, wanted))
+
+    def fuzzy(self):
+        """Trigram index over the product names, for top-k fuzzy lookups."""
+        return TrigramIndex.load(self.index_dir / FUZZY_DIR)
+
+    def aliases(self, overrides=None):
+        """PyPI name -> (vendor, product) table generated from these keys (see src/cpe_aliases.py)."""
+        return AliasTable.load(self.index_dir / ALIAS_DIR, overrides, source=self.meta.get("fingerprint", ""))
+
+    def vendors(self):
+        return np.char.decode(np.unique(self.key_vendor), "utf-8").tolist()
+
+    def products(self):
+        """Distinct product names, sorted; computed on the first call (do not modify the list)."""
+        if self._products is None:
+            self._products = np.char.decode(np.unique(self.key_product), "utf-8").tolist()
+        return self._products
+
+    def matcher(self):
+        """ProductMatcher over products(), built on the first call and reused by every later scan."""
+        if self._matcher is None:
+            self._matcher = ProductMatcher(self.products())
+        return self._matcher
+
+    # ---- postings ----
+    def postings(self, key_ids):
+        """Posting positions of the given keys, in dataset row order."""
+        offsets = self.offsets
+        found = [np.arange(offsets[k], offsets[k + 1]) for k in np.atleast_1d(key_ids).tolist() if k >= 0]
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        positions = np.concatenate(found)
+        return positions[np.argsort(self.post_row[positions], kind="stable")]
+
+    def posting_strings(self, name, positions):
+        return self._pool.take(self._post_codes[name][positions])
+
+    def records(self, positions):
+        """Distinct records of these postings, in dataset order."""
+        return np.unique(self.post_record[positions])
+
+    def record_frame(self, records, columns=RECORD_STRING_COLUMNS):
+        """cve_id / description / ... plus cvss_base_score and severity of each record."""
+        records = np.asarray(records, dtype=np.int64)
+        data = {name: self._records[name].take(records) if name in self._records
+                else np.full(len(records), None, dtype=object) for name in columns}
+        data["cvss_base_score"] = np.asarray(self.rec_score[records], dtype=np.float64)
+        data["severity"] = np.array(SEVERITY_LABELS, dtype=object)[self.rec_severity[records]]
+        return pd.DataFrame(data)
+
+    def frame(self, positions, record_columns=RECORD_STRING_COLUMNS):
+        """One flat-dataset-like row per posting (vendor/product lowercase)."""
+        positions = np.asarray(positions, dtype=np.int64)
+        keys = np.searchsorted(self.offsets, positions, side="right") - 1
+        df = pd.DataFrame({
+            "cpe_vendor": np.char.decode(self.key_vendor[keys], "utf-8"),
+            "cpe_product": np.char.decode(self.key_product[keys], "utf-8"),
+            **{name: self.posting_strings(name, positions) for name in POSTING_COLUMNS},
+        })
+        vulnerable = np.asarray(self.post_vulnerable[positions])
+        df["vulnerable"] = pd.array(np.where(vulnerable < 0, None, vulnerable == 1), dtype="boolean")
+        records = self.record_frame(self.post_record[positions], record_columns)
+        df = pd.concat([records, df], axis=1)
+        df["row"] = np.asarray(self.post_row[positions])
+        df["record"] = np.asarray(self.post_record[positions])
+        return df
+
+    def catalog(self, key_ids):
+        """unique_cpes.csv rows (cve_count, max_cvss_score, first/last published) for these keys."""
+        df = self.frame(self.postings(key_ids), record_columns=["published"])
+        if df.empty:
+            return pd.DataFrame(columns=CATALOG_COLUMNS)
+        grouped = df.groupby(CPE_KEY_COLUMNS, sort=True, dropna=False)
+        return pd.DataFrame({
+            "cve_count": grouped["record"].nunique(),
+            "max_cvss_score": grouped["cvss_base_score"].max(),
+            "first_published": grouped["published"].min(),
+            "last_published": grouped["published"].max(),
+        }).reset_index()[CATALOG_COLUMNS]
+
+
+def index_path(processed_dir):
+    return Path(processed_dir) / INDEX_DIR
+
+
+def open_cpe_index(processed_dir):
+    """The memory-mapped index ingestion wrote next to the dataset, or None if there is none."""
+    path = index_path(processed_dir)
+    if not (path / "meta.json").exists():
+        return None
+    return MappedCpeIndex(path)
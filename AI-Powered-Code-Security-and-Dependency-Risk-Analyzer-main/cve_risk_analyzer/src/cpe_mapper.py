@@ -1,3 +1,14 @@
+from pathlib import Path
+
+from src.cpe_aliases import OVERRIDES_FILE, AliasTable, read_overrides
+from src.cpe_index import open_cpe_index
+from src.cve_store import load_cpe_catalog
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+# Last resort for names the generated alias table (src/cpe_aliases.py) cannot
+# derive from the catalog; an entry in data/cpe_alias_overrides.csv or a
+# catalog alias takes precedence.
 CPE_MAPPING = {
     "django": ("django", "django"),
     "flask": ("palletsprojects", "flask"),
@@ -16,15 +27,70 @@ CPE_MAPPING = {
 }
 
 
+_alias_table = None
+
+
+def load_alias_table(processed_dir, overrides_path=None):
+    """Alias table of the ingested CPE index, else built from unique_cpes.csv, plus the user overrides."""
+    processed_dir = Path(processed_dir)
+    overrides = read_overrides(overrides_path or processed_dir.parent / OVERRIDES_FILE)
+    cpe_index = open_cpe_index(processed_dir)
+    if cpe_index is not None:
+        return cpe_index.aliases(overrides)
+    catalog_path = processed_dir / "unique_cpes.csv"
+    if catalog_path.exists():
+        stat = catalog_path.stat()
+        table = AliasTable.from_catalog(load_cpe_catalog(processed_dir))
+        table.source = f"{catalog_path}|{stat.st_size}|{stat.st_mtime_ns}"
+    else:
+        table = AliasTable.build([], [])
+    table.overrides = overrides
+    return table
+
+
+def alias_table():
+    """The table to_vendor_product() consults, loaded from data/processed on first use."""
+    global _alias_table
+    if _alias_table is None:
+        _alias_table = load_alias_table(BASE_DIR / "data" / "processed")
+    return _alias_table
+
+
+def use_alias_table(table):
+    """Resolve names with another table (e.g. one loaded from a different dataset)."""
+    global _alias_table
+    _alias_table = table
+
+
 def to_cpe_format(pkg, version=None):
     """
     Convert package+version → CPE 2.3 URI format (simplified)
     """
-    if pkg in CPE_MAPPING:
-        vendor, product = CPE_MAPPING[pkg]
-    else:
-        vendor, product = pkg, pkg  # fallback
+    vendor, product = to_vendor_product(pkg)
 
     if version:
         return f"cpe:2.3:a:{vendor}:{product}:{version}:*:*:*:*:*:*:*"
     return f"cpe:2.3:a:{vendor}:{product}:*:*:*:*:*:*:*:*:*"
+
+
+def to_vendor_product(pkg):
+    """Map a package name to its (vendor, product) CPE pair: overrides, catalog aliases, CPE_MAPPING, (pkg, pkg)."""
+    found = alias_table().lookup(pkg)
+    if found is not None:
+        return found
+    return CPE_MAPPING.get(pkg, (pkg, pkg))
+
+
+def affected_cves(pkg, version, version_index):
+    """
+    CVE ids whose CPE version ranges include pkg==version, using a
+    src.version_index.VersionIntervalIndex (O(log n) per lookup).
+    Falls back to any vendor that ships a product of the same name.
+    """
+    vendor, product = to_vendor_product(pkg)
+    if (vendor, product) in version_index:
+        return version_index.affected(vendor, product, version)
+    cves = set()
+    for other_vendor in version_index.vendors_for(product):
+        cves.update(version_index.affected(other_vendor, product, version))
+    return sorted(cves)
@@ -0,0 +1,73 @@
+# src/cpe_parse.py
+"""
+CPE 2.3 formatted-string parsing
+--------------------------------
+cpe:2.3:<part>:<vendor>:<product>:<version>:<update>:<edition>:<language>:
+        <sw_edition>:<target_sw>:<target_hw>:<other>
+
+A literal colon inside an attribute is written as "\\:" and a literal
+backslash as "\\\\", so a plain split(":") mis-splits those URIs.
+split_cpe_column() parses a whole column at once with Arrow compute kernels
+and dictionary-encodes each attribute, so repeated vendor/product strings
+are stored once. Attribute values keep their CPE escaping; only the split
+is escape-aware. Missing trailing attributes come back as "".
+"""
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+CPE_ATTRIBUTES = ["part", "vendor", "product", "version", "update", "edition",
+                  "language", "sw_edition", "target_sw", "target_hw", "other"]
+
+# Placeholders for escaped backslashes / colons while splitting (never valid in a CPE)
+_ESC_BACKSLASH = "\x01"
+_ESC_COLON = "\x00"
+# "cpe" + "2.3" + 11 attributes; padding guarantees every list has them all
+_PADDING = ":" * (len(CPE_ATTRIBUTES) + 1)
+
+
+def _protect_escapes(arr):
+    arr = pc.replace_substring(arr, "\\\\", _ESC_BACKSLASH)
+    return pc.replace_substring(arr, "\\:", _ESC_COLON)
+
+
+def _restore_escapes(arr):
+    arr = pc.replace_substring(arr, _ESC_COLON, "\\:")
+    return pc.replace_substring(arr, _ESC_BACKSLASH, "\\\\")
+
+
+def _string_array(values):
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    elif not isinstance(values, pa.Array):
+        values = pa.array(values, pa.string())
+    return pc.fill_null(values.cast(pa.string()), "")
+
+
+def split_cpe_column(uris, attributes=CPE_ATTRIBUTES):
+    """Split a column of CPE 2.3 URIs into a table of dictionary-encoded attribute columns."""
+    padded = pc.binary_join_element_wise(_protect_escapes(_string_array(uris)), _PADDING, "")
+    pieces = pc.split_pattern(padded, ":", max_splits=len(CPE_ATTRIBUTES) + 2)
+    columns = {}
+    for name in attributes:
+        value = pc.list_element(pieces, CPE_ATTRIBUTES.index(name) + 2)
+        columns[name] = pc.dictionary_encode(_restore_escapes(value))
+    return pa.table(columns)
+
+
+def parse_cpe(cpe_uri):
+    """Scalar version of split_cpe_column(): a dict of the 11 attributes of one URI."""
+    text = (cpe_uri or "").replace("\\\\", _ESC_BACKSLASH).replace("\\:", _ESC_COLON)
+    pieces = (text + _PADDING).split(":", len(CPE_ATTRIBUTES) + 2)
+    return {name: pieces[i + 2].replace(_ESC_COLON, "\\:").replace(_ESC_BACKSLASH, "\\\\")
+            for i, name in enumerate(CPE_ATTRIBUTES)}
+
+
+# target_sw values that can describe a PyPI package
+PYTHON_TARGET_SW = ["", "*", "-", "python", "pip", "pypi"]
+
+
+def python_candidate_mask(part, target_sw):
+    """Boolean mask of CPE rows that can be Python packages: applications with a Python-ish target_sw."""
+    return pc.and_(pc.is_in(_string_array(part), value_set=pa.array(["a", ""])),
+                   pc.is_in(pc.utf8_lower(_string_array(target_sw)), value_set=pa.array(PYTHON_TARGET_SW)))
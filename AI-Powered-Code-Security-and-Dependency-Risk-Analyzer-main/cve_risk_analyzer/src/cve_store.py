@@ -0,0 +1,313 @@
+# src/cve_store.py
+"""
+Processed CVE dataset layouts
+-----------------------------
+flat        data/processed/cve_cpe.parquet (+ cve_cpe.csv)
+            one row per CVE x CPE, CVE fields repeated on every row
+normalized  data/processed/normalized/
+            cves.parquet     one row per CVE occurrence (cve_key = row number)
+            cve_cpe.parquet  edge table: cve_key/cpe_id plus dictionary-encoded
+                             vendor/product/version/part/target_sw (for
+                             filtering without joins) and the version range
+                             of each match
+            cpes.parquet     CPE dimension table (cpe_id -> vendor/product/version)
+
+Both layouts come with data/processed/unique_cpes.csv, the CPE catalog:
+one row per (vendor, product, version) with cve_count, max_cvss_score and
+first/last published date, built while the rows stream through ingestion.
+
+load_flat() gives the old flat frame from either layout, so consumers do not
+need to know which one ingestion wrote.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from pathlib import Path
+
+# Output schema of one normalized CVE x CPE row (the flat layout)
+ROW_SCHEMA = pa.schema([
+    ("cve_id", pa.string()),
+    ("description", pa.string()),
+    ("cpe_vendor", pa.string()),
+    ("cpe_product", pa.string()),
+    ("cpe_version", pa.string()),
+    ("cpe_part", pa.string()),
+    ("cpe_target_sw", pa.string()),
+    ("version_start_including", pa.string()),
+    ("version_start_excluding", pa.string()),
+    ("version_end_including", pa.string()),
+    ("version_end_excluding", pa.string()),
+    ("vulnerable", pa.bool_()),
+    ("cvss_version", pa.string()),
+    ("cvss_base_score", pa.float64()),
+    ("cvss_vector", pa.string()),
+    ("published", pa.string()),
+    ("last_modified", pa.string()),
+])
+CPE_KEY_COLUMNS = ["cpe_vendor", "cpe_product", "cpe_version"]
+# Extra CPE attributes that let matchers skip non-application / non-Python CPEs early
+CPE_ATTR_COLUMNS = ["cpe_part", "cpe_target_sw"]
+# Version range bounds and vulnerable flag of each cpeMatch entry
+MATCH_COLUMNS = ["version_start_including", "version_start_excluding",
+                 "version_end_including", "version_end_excluding", "vulnerable"]
+EDGE_COLUMNS = CPE_KEY_COLUMNS + CPE_ATTR_COLUMNS + MATCH_COLUMNS
+CVE_COLUMNS = [f.name for f in ROW_SCHEMA if f.name not in EDGE_COLUMNS]
+
+_dict_string = pa.dictionary(pa.int32(), pa.string())
+CVE_SCHEMA = pa.schema([("cve_key", pa.int32())] + [ROW_SCHEMA.field(c) for c in CVE_COLUMNS])
+EDGE_SCHEMA = pa.schema([
+    ("cve_key", pa.int32()),
+    ("cpe_id", pa.int32()),
+    ("cpe_vendor", _dict_string),
+    ("cpe_product", _dict_string),
+    ("cpe_version", _dict_string),
+    ("cpe_part", _dict_string),
+    ("cpe_target_sw", _dict_string),
+    ("version_start_including", _dict_string),
+    ("version_start_excluding", _dict_string),
+    ("version_end_including", _dict_string),
+    ("version_end_excluding", _dict_string),
+    ("vulnerable", pa.bool_()),
+])
+CPE_SCHEMA = pa.schema([("cpe_id", pa.int32())] + [ROW_SCHEMA.field(c) for c in CPE_KEY_COLUMNS])
+
+NORMALIZED_DIR = "normalized"
+
+
+def conform_to_schema(table):
+    """Cast a flat table to ROW_SCHEMA, adding columns missing from older datasets as nulls."""
+    for field in ROW_SCHEMA:
+        if field.name not in table.column_names:
+            table = table.append_column(field.name, pa.nulls(table.num_rows, field.type))
+    return table.select(ROW_SCHEMA.names).cast(ROW_SCHEMA)
+
+
+def processed_dir_for(base_dir):
+    return Path(base_dir) / "data" / "processed"
+
+
+def has_normalized(processed_dir):
+    return (Path(processed_dir) / NORMALIZED_DIR / "cves.parquet").exists()
+
+
+def has_dataset(processed_dir):
+    processed_dir = Path(processed_dir)
+    return has_normalized(processed_dir) or (processed_dir / "cve_cpe.parquet").exists()
+
+
+# ---------------- Writing the normalized layout ----------------
+class NormalizedTablesWriter:
+    """Split flat row batches into the cves / cve_cpe / cpes tables."""
+
+    def __init__(self, out_dir, row_group_size, compression=None):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.row_group_size = row_group_size
+        self._cves = pq.ParquetWriter(self._tmp("cves"), CVE_SCHEMA, compression=compression)
+        self._edges = pq.ParquetWriter(self._tmp("cve_cpe"), EDGE_SCHEMA, compression=compression)
+        self._compression = compression
+        self._cpe_ids = {}          # (vendor, product, version) -> cpe_id
+        self._next_key = 0
+        self._last = None           # (cve_id, last_modified) of the previous row
+
+    def _tmp(self, name):
+        return self.out_dir / f"{name}.parquet.tmp"
+
+    def write(self, table):
+        df = table.select(["cve_id", "last_modified"]).to_pandas()
+        ids = df["cve_id"].fillna("").astype(object)
+        mods = df["last_modified"].fillna("").astype(object)
+        # A new CVE occurrence starts wherever (cve_id, last_modified) changes
+        starts = (ids != ids.shift()) | (mods != mods.shift())
+        if self._last is not None:
+            starts.iloc[0] = (ids.iloc[0], mods.iloc[0]) != self._last
+        else:
+            starts.iloc[0] = True
+        keys = starts.cumsum().to_numpy() - 1 + self._next_key
+        self._next_key = int(keys[-1]) + 1
+        self._last = (ids.iloc[-1], mods.iloc[-1])
+
+        start_mask = pa.array(starts.to_numpy())
+        cves = table.filter(start_mask).select(CVE_COLUMNS)
+        cves = cves.add_column(0, "cve_key", pa.array(keys[starts.to_numpy()], pa.int32()))
+        self._cves.write_table(cves, row_group_size=self.row_group_size)
+
+        cpe_keys = zip(*(table[c].to_pylist() for c in CPE_KEY_COLUMNS))
+        cpe_ids = [self._cpe_ids.setdefault(k, len(self._cpe_ids)) for k in cpe_keys]
+        edges = pa.table({
+            "cve_key": pa.array(keys, pa.int32()),
+            "cpe_id": pa.array(cpe_ids, pa.int32()),
+            **{c: pc.dictionary_encode(table[c]) for c in EDGE_COLUMNS if c != "vulnerable"},
+            "vulnerable": table["vulnerable"],
+        }).cast(EDGE_SCHEMA)
+        self._edges.write_table(edges, row_group_size=self.row_group_size)
+
+    def tmp_paths(self):
+        return {self._tmp(n): self.out_dir / f"{n}.parquet" for n in ("cves", "cve_cpe", "cpes")}
+
+    def close(self):
+        self._cves.close()
+        self._edges.close()
+        keys = list(self._cpe_ids)
+        cpes = pa.table({
+            "cpe_id": pa.array(range(len(keys)), pa.int32()),
+            **{c: pa.array([k[i] for k in keys], pa.string()) for i, c in enumerate(CPE_KEY_COLUMNS)},
+        }, schema=CPE_SCHEMA)
+        pq.write_table(cpes, self._tmp("cpes"), compression=self._compression)
+
+    def abort(self):
+        self._cves.close()
+        self._edges.close()
+        for tmp in self.tmp_paths():
+            tmp.unlink(missing_ok=True)
+
+
+# ---------------- Unique CPE catalog ----------------
+CATALOG_COLUMNS = CPE_KEY_COLUMNS + ["cve_count", "max_cvss_score", "first_published", "last_published"]
+
+
+class CpeCatalog:
+    """Per-(vendor, product, version) statistics accumulated batch by batch as rows are written.
+
+    cve_count counts CVE occurrences (a run of rows with one cve_id, as in
+    the normalized cves table): a CVE that is in two feeds is counted twice,
+    like its rows. Each batch is first reduced to distinct (CPE, occurrence)
+    pairs with an Arrow group-by, so the Python-level work is one dict update
+    per pair, not per row.
+    """
+
+    def __init__(self):
+        # key -> [cve_count, max_cvss_score, first_published, last_published]
+        self._entries = {}
+        # Only the last occurrence of a batch can continue into the next one
+        self._tail_cve, self._tail_keys = None, set()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def update(self, table):
+        if table.num_rows == 0:
+            return
+        ids = table["cve_id"].to_pandas().fillna("").to_numpy(dtype=object)
+        starts = np.empty(len(ids), dtype=bool)
+        starts[0] = ids[0] != self._tail_cve
+        starts[1:] = ids[1:] != ids[:-1]
+        occurrence = np.cumsum(starts)    # 0 = continues the previous batch's last occurrence
+        last_occurrence = int(occurrence[-1])
+
+        pairs = table.select(CPE_KEY_COLUMNS + ["cvss_base_score", "published"]).append_column(
+            "occurrence", pa.array(occurrence)).group_by(CPE_KEY_COLUMNS + ["occurrence"], use_threads=False).aggregate([
+                ("cvss_base_score", "max"), ("published", "min"), ("published", "max")])
+        columns = [pairs[c].to_pylist() for c in CPE_KEY_COLUMNS + [
+            "occurrence", "cvss_base_score_max", "published_min", "published_max"]]
+        entries, tail_keys = self._entries, set()
+        for vendor, product, version, occ, score, first, last in zip(*columns):
+            key = (vendor, product, version)
+            if occ == last_occurrence:
+                tail_keys.add(key)
+            entry = entries.get(key)
+            if entry is None:
+                entries[key] = [1, score, first, last]
+                continue
+            if occ != 0 or key not in self._tail_keys:
+                entry[0] += 1
+            if score is not None and (entry[1] is None or score > entry[1]):
+                entry[1] = score
+            if first is not None and (entry[2] is None or first < entry[2]):
+                entry[2] = first
+            if last is not None and (entry[3] is None or last > entry[3]):
+                entry[3] = last
+        if last_occurrence == 0:
+            tail_keys |= self._tail_keys
+        self._tail_cve, self._tail_keys = ids[-1], tail_keys
+
+    def to_frame(self):
+        keys = sorted(self._entries, key=lambda k: tuple(v or "" for v in k))
+        rows = [key + tuple(self._entries[key]) for key in keys]
+        return pd.DataFrame(rows, columns=CATALOG_COLUMNS).astype({"cve_count": "int64", "max_cvss_score": "float64"})
+
+
+def load_cpe_catalog(processed_dir):
+    """unique_cpes.csv; catalogs written before the statistics columns existed get them as NaN."""
+    df = pd.read_csv(Path(processed_dir) / "unique_cpes.csv", dtype={c: str for c in CPE_KEY_COLUMNS},
+                     keep_default_na=False, na_values={c: [""] for c in CATALOG_COLUMNS[3:]})
+    for col in CATALOG_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    return df[CATALOG_COLUMNS].astype({"cve_count": "Int64", "max_cvss_score": "float64"})
+
+
+# ---------------- Reading: compatibility view ----------------
+def _shared_strings(column, keys):
+    # Dictionary-encode once per CVE, then index per edge: every edge row of a
+    # CVE shares one copy of the string (pandas Categorical on to_pandas()).
+    encoded = pc.dictionary_encode(column).combine_chunks()
+    return pa.DictionaryArray.from_arrays(encoded.indices.take(keys), encoded.dictionary)
+
+
+def _flat_from_normalized(cves, edges, columns):
+    keys = edges["cve_key"].combine_chunks()
+    data = {}
+    for name in columns:
+        if name in EDGE_SCHEMA.names:
+            data[name] = edges[name]
+        elif ROW_SCHEMA.field(name).type == pa.string():
+            data[name] = _shared_strings(cves[name], keys)
+        else:
+            data[name] = cves[name].take(keys)
+    return pa.table(data)
+
+
+def load_flat_table(processed_dir, columns=None):
+    """Return the flat CVE x CPE table (strings dictionary-encoded) from whichever layout exists.
+
+    Requested columns missing from an older dataset are left out.
+    """
+    processed_dir = Path(processed_dir)
+    columns = list(columns or ROW_SCHEMA.names)
+    if has_normalized(processed_dir):
+        norm_dir = processed_dir / NORMALIZED_DIR
+        edge_names = pq.read_schema(norm_dir / "cve_cpe.parquet").names
+        cve_names = pq.read_schema(norm_dir / "cves.parquet").names
+        columns = [c for c in columns if c in edge_names or c in cve_names]
+        edges = pq.read_table(norm_dir / "cve_cpe.parquet",
+                              columns=["cve_key"] + [c for c in columns if c in edge_names])
+        cves = pq.read_table(norm_dir / "cves.parquet", columns=[c for c in columns if c in cve_names])
+        return _flat_from_normalized(cves, edges, columns)
+
+    parquet_path = processed_dir / "cve_cpe.parquet"
+    if parquet_path.exists():
+        available = pq.read_schema(parquet_path).names
+        columns = [c for c in columns if c in available]
+        string_cols = [c for c in columns if ROW_SCHEMA.field(c).type == pa.string()]
+        return pq.read_table(parquet_path, columns=columns, read_dictionary=string_cols)
+
+    csv_path = processed_dir / "cve_cpe.csv"
+    if not csv_path.exists():
+        raise FileNotFoundError(f"CVE data not found in {processed_dir}")
+    return pa.Table.from_pandas(pd.read_csv(csv_path, usecols=lambda c: c in columns), preserve_index=False)
+
+
+def load_flat(processed_dir, columns=None):
+    """Compatibility view: the old flat cve_cpe frame, with repeated strings as Categoricals."""
+    return load_flat_table(processed_dir, columns).to_pandas()
+
+
+def iter_flat_batches(processed_dir, batch_size):
+    """Stream the flat rows of the current dataset as ROW_SCHEMA tables."""
+    processed_dir = Path(processed_dir)
+    if has_normalized(processed_dir):
+        norm_dir = processed_dir / NORMALIZED_DIR
+        cves = pq.read_table(norm_dir / "cves.parquet")
+        for batch in pq.ParquetFile(norm_dir / "cve_cpe.parquet").iter_batches(batch_size=batch_size):
+            edges = pa.Table.from_batches([batch])
+            keys = edges["cve_key"].combine_chunks()
+            data = {c: (edges[c] if c in EDGE_SCHEMA.names else cves[c].take(keys))
+                    for c in ROW_SCHEMA.names if c in edges.column_names or c in cves.column_names}
+            yield conform_to_schema(pa.table(data))
+        return
+    for batch in pq.ParquetFile(processed_dir / "cve_cpe.parquet").iter_batches(batch_size=batch_size):
+        yield conform_to_schema(pa.Table.from_batches([batch]))
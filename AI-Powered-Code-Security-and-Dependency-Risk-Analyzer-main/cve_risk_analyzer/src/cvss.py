@@ -0,0 +1,119 @@
+# src/cvss.py
+"""
+CVSS scores and vector strings
+------------------------------
+Column-at-a-time helpers for the scanners, the CPE index and the ML scripts.
+
+severity_codes() / severity_labels() bucket a whole score column with one
+np.digitize call, using the NVD ranges:
+
+    UNKNOWN   no score (NaN / missing / not a number)
+    LOW       < 4.0            (0.0 too, unless zero_unknown)
+    MEDIUM    4.0 - 6.9
+    HIGH      7.0 - 8.9
+    CRITICAL  >= 9.0           (CVSS v2 has no CRITICAL: HIGH)
+
+parse_vectors() splits a column of vector strings into one categorical
+column per base metric (cvss_av, cvss_ac, cvss_pr, cvss_ui, cvss_s, cvss_c,
+cvss_i, cvss_a). Each distinct vector is parsed once (pd.factorize, then one
+pyarrow regex pass per CVSS version over the distinct strings), so a
+million-row column with a few thousand distinct vectors costs a few
+thousand regex matches. v3.0 / v3.1 vectors fill every metric; v2 vectors
+("AV:N/AC:L/Au:N/C:P/I:P/A:P") have no PR, UI or S, and keep their own
+impact letters (N/P/C). Vectors that match neither give missing values.
+
+vector_encoders() / vector_codes() turn those metrics into model features:
+one CategoryEncoder per column over its fixed letters, so a code means the
+same letter in every dataset and in every model (no vector: -1).
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.category_encoder import CategoryEncoder
+
+SEVERITY_LABELS = ["UNKNOWN", "LOW", "MEDIUM", "HIGH", "CRITICAL"]
+SEVERITY_THRESHOLDS = [4.0, 7.0, 9.0]
+
+METRICS = ["AV", "AC", "PR", "UI", "S", "C", "I", "A"]
+VECTOR_COLUMNS = [f"cvss_{m.lower()}" for m in METRICS]
+# Fixed categories (v3.x letters first, then v2's), so codes mean the same on every dataset
+METRIC_VALUES = {"AV": "NALP", "AC": "LHM", "PR": "NLH", "UI": "NR", "S": "UC",
+                 "C": "NLHPC", "I": "NLHPC", "A": "NLHPC"}
+
+_V3 = (r"^CVSS:3\.[01]/AV:(?P<AV>[NALP])/AC:(?P<AC>[LH])/PR:(?P<PR>[NLH])/UI:(?P<UI>[NR])/S:(?P<S>[UC])"
+       r"/C:(?P<C>[NLH])/I:(?P<I>[NLH])/A:(?P<A>[NLH])(?:/|$)")
+_V2 = (r"^\(?AV:(?P<AV>[LAN])/AC:(?P<AC>[HML])/Au:[MSN]"
+       r"/C:(?P<C>[NPC])/I:(?P<I>[NPC])/A:(?P<A>[NPC])(?:/|\)?$)")
+
+
+# ---------------- Severity ----------------
+def _scores(scores):
+    return np.asarray(pd.to_numeric(scores, errors="coerce"), dtype=np.float64)
+
+
+def severity_codes(scores, cvss_versions=None, zero_unknown=False):
+    """SEVERITY_LABELS code of each score; v2 scores (cvss_versions starting with "2") top out at HIGH."""
+    scores = _scores(scores)
+    codes = np.digitize(scores, SEVERITY_THRESHOLDS) + 1
+    if cvss_versions is not None:
+        v2 = np.char.startswith(np.asarray(cvss_versions, dtype=object).astype(str), "2")
+        codes[v2] = np.minimum(codes[v2], 3)
+    codes[np.isnan(scores)] = 0
+    if zero_unknown:
+        codes[scores <= 0] = 0
+    return codes.astype(np.uint8)
+
+
+def severity_labels(scores, cvss_versions=None, zero_unknown=False):
+    """Severity label of each score (object array), see severity_codes()."""
+    return np.array(SEVERITY_LABELS, dtype=object)[severity_codes(scores, cvss_versions, zero_unknown)]
+
+
+# ---------------- Vector strings ----------------
+def _metric_codes(matched, metric):
+    # Category code of the metric in each distinct vector (-1 when the pattern did not match)
+    values = pc.fill_null(pc.struct_field(matched, metric), "").to_numpy(zero_copy_only=False).astype(str)
+    letters = METRIC_VALUES[metric]
+    codes = np.full(len(values), -1, dtype=np.int8)
+    for code, letter in enumerate(letters):
+        codes[values == letter] = code
+    return codes
+
+
+def parse_vectors(vectors):
+    """DataFrame of categorical VECTOR_COLUMNS, one row per vector (same index for a Series)."""
+    index = vectors.index if isinstance(vectors, pd.Series) else None
+    row_codes, uniques = pd.factorize(pd.Series(vectors, dtype=object) if index is None else vectors)
+    distinct = pa.array(np.asarray(uniques, dtype=object).astype(str), type=pa.string())
+    v3 = pc.extract_regex(distinct, _V3)
+    v2 = pc.extract_regex(distinct, _V2)
+    v2_names = {v2.type.field(i).name for i in range(v2.type.num_fields)}
+    missing = row_codes < 0
+
+    columns = {}
+    for metric, column in zip(METRICS, VECTOR_COLUMNS):
+        codes = _metric_codes(v3, metric)
+        if metric in v2_names:
+            codes = np.where(codes >= 0, codes, _metric_codes(v2, metric))
+        per_row = codes[row_codes] if len(codes) else np.full(len(row_codes), -1, dtype=np.int8)
+        per_row[missing] = -1
+        columns[column] = pd.Categorical.from_codes(per_row, categories=list(METRIC_VALUES[metric]))
+    return pd.DataFrame(columns, index=index)
+
+
+# ---------------- Model features ----------------
+def vector_encoders():
+    """{VECTOR_COLUMNS column: CategoryEncoder over its METRIC_VALUES letters}; missing metrics encode to -1."""
+    return {column: CategoryEncoder(list(METRIC_VALUES[metric])) for metric, column in zip(METRICS, VECTOR_COLUMNS)}
+
+
+def vector_codes(vectors, encoders):
+    """(rows x len(encoders)) int64 metric codes of a column of vector strings (no encoders: zero columns)."""
+    vectors = pd.Series(vectors, dtype=object).reset_index(drop=True)
+    if not encoders:
+        return np.zeros((len(vectors), 0), dtype=np.int64)
+    metrics = parse_vectors(vectors)
+    return np.column_stack([encoder.transform(metrics[column].astype(object)) for column, encoder in encoders.items()])
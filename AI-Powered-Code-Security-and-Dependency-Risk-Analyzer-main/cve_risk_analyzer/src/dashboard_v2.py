@@ -1,9 +1,13 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import joblib
 from scipy.sparse import hstack
 from pathlib import Path
 
+from src.category_encoder import load_encoder   # run with python -m streamlit run src/dashboard_v2.py
+from src.cvss import vector_codes
+
 # -------------------------------------------------------------
 # Load Model and Encoders
 # -------------------------------------------------------------
@@ -12,26 +16,20 @@ def load_model_components():
     model_dir = Path("data/processed/model")
     model = joblib.load(model_dir / "trained_model_v2.pkl")
     tfidf = joblib.load(model_dir / "tfidf_vectorizer.pkl")
-    vendor_enc = joblib.load(model_dir / "vendor_encoder.pkl")
-    product_enc = joblib.load(model_dir / "product_encoder.pkl")
-    severity_enc = joblib.load(model_dir / "severity_encoder.pkl")
-    return model, tfidf, vendor_enc, product_enc, severity_enc
+    vendor_enc = load_encoder(model_dir / "vendor_encoder.pkl")
+    product_enc = load_encoder(model_dir / "product_encoder.pkl")
+    severity_enc = load_encoder(model_dir / "severity_encoder.pkl")
+    # CVSS metric encoders; models trained before ml_train_v2 used the metrics have none
+    vector_path = model_dir / "vector_encoders.pkl"
+    vector_encs = joblib.load(vector_path) if vector_path.exists() else {}
+    return model, tfidf, vendor_enc, product_enc, severity_enc, vector_encs
 
-model, tfidf, vendor_enc, product_enc, severity_enc = load_model_components()
+model, tfidf, vendor_enc, product_enc, severity_enc, vector_encs = load_model_components()
 
 st.set_page_config(page_title="AI-Powered CVE Severity Analyzer", layout="wide")
 st.title("🧠 AI-Powered CVE & Dependency Severity Analyzer")
 st.markdown("Analyze project dependencies or predict severity for new vulnerabilities using the trained ML model.")
 
-# -------------------------------------------------------------
-# Helper Encoding Function
-# -------------------------------------------------------------
-def safe_encode(encoder, value):
-    if value in encoder.classes_:
-        return encoder.transform([value])[0]
-    else:
-        return -1  # unseen category
-
 # -------------------------------------------------------------
 # Section 1: Upload and Analyze Dependencies
 # -------------------------------------------------------------
@@ -49,12 +47,14 @@ if uploaded_file:
     df_req["cvss_base_score"] = 0.0
     df_req["description"] = "No description available. Model will predict severity based on name only."
 
-    # Encode
-    df_req["vendor_encoded"] = df_req["cpe_vendor"].apply(lambda x: safe_encode(vendor_enc, x))
-    df_req["product_encoded"] = df_req["cpe_product"].apply(lambda x: safe_encode(product_enc, x))
+    # Encode (whole columns; unseen vendors / products get -1)
+    df_req["vendor_encoded"] = vendor_enc.transform(df_req["cpe_vendor"])
+    df_req["product_encoded"] = product_enc.transform(df_req["cpe_product"])
 
     X_text = tfidf.transform(df_req["description"])
-    X_struct = df_req[["vendor_encoded", "product_encoded", "cvss_base_score"]].values
+    # No CVSS vectors for bare dependency names: every metric is "unknown" (-1)
+    X_struct = np.column_stack([df_req[["vendor_encoded", "product_encoded", "cvss_base_score"]].values,
+                                vector_codes([None] * len(df_req), vector_encs)])
     X_combined = hstack([X_struct, X_text])
 
     preds = model.predict(X_combined)
@@ -73,15 +73,16 @@ with col1:
     vendor = st.text_input("Vendor", "djangoproject")
     product = st.text_input("Product", "django")
     cvss_score = st.number_input("Base CVSS Score (optional)", 0.0, 10.0, 0.0)
+    cvss_vector = st.text_input("CVSS Vector (optional)", "")
 with col2:
     description = st.text_area("Vulnerability Description", 
         "SQL injection in login module allows attackers to modify database queries.")
 
 if st.button("🔮 Predict Severity"):
-    v_enc = safe_encode(vendor_enc, vendor)
-    p_enc = safe_encode(product_enc, product)
+    v_enc = vendor_enc.transform([vendor])[0]
+    p_enc = product_enc.transform([product])[0]
     X_text = tfidf.transform([description])
-    X_struct = [[v_enc, p_enc, cvss_score]]
+    X_struct = np.column_stack([[[v_enc, p_enc, cvss_score]], vector_codes([cvss_vector or None], vector_encs)])
     X_combined = hstack([X_struct, X_text])
 
     pred_encoded = model.predict(X_combined)
@@ -5,72 +5,145 @@ This script:
 1. Reads project dependencies from requirements.txt
 2. Maps each dependency to CPE entries in your preprocessed NVD dataset
 3. Retrieves related CVEs, CVSS scores, and calculates severity
-4. Outputs a vulnerability report as CSV inside data/processed/
+4. Streams a vulnerability report (CSV, JSON Lines or Parquet) to data/processed/
+
+Run from the cve_risk_analyzer directory: python -m src.dependency_mapper
 """
 
+import argparse
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
+from src.cpe_index import open_cpe_index
+from src.cpe_parse import python_candidate_mask
+from src.cve_store import load_flat
+from src.cvss import SEVERITY_LABELS, severity_codes, severity_labels
+from src.product_match import MATCH_MODES, match_products
+from src.report_writers import open_report_writer
+from src.requirements_parser import dependency_frame
+from src.result_cache import ResultCache, cached_lookup
+from src.version_index import load_version_index, version_index_from_rows
+
+# Column order of the vulnerability report
+REPORT_COLUMNS = [
+    "req_package", "req_version", "cve_id", "cpe_vendor", "cpe_product", "cpe_version",
+    "cvss_base_score", "severity", "description", "published", "last_modified"
+]
+
 # ---------------- Utility: severity mapping ----------------
 def score_to_severity(score):
-    try:
-        score = float(score)
-    except (TypeError, ValueError):
-        return "UNKNOWN"
-    if score < 4.0:
-        return "LOW"
-    elif score < 7.0:
-        return "MEDIUM"
-    elif score < 9.0:
-        return "HIGH"
-    else:
-        return "CRITICAL"
+    # One score; whole columns go through src.cvss.severity_labels
+    return severity_labels([score])[0]
 
 # ---------------- Load dependencies ----------------
 def load_requirements(req_path):
-    pkgs = []
-    with open(req_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            if "==" in line:
-                name, version = line.split("==", 1)
-            elif "=" in line:
-                name, version = line.split("=", 1)
-            else:
-                name, version = line, ""
-            pkgs.append({"package": name.lower().strip(), "version": version.strip()})
-    return pd.DataFrame(pkgs)
+    # PEP 508 lines, pip freeze, poetry.lock or Pipfile.lock; names normalized per PEP 503
+    return dependency_frame(req_path)
 
 # ---------------- Load CVE–CPE dataset ----------------
-def load_cve_data(base_dir):
-    path = base_dir / "data" / "processed" / "cve_cpe.csv"
-    if not path.exists():
-        raise FileNotFoundError(f"CVE data not found at {path}")
-    df = pd.read_csv(path)
+def _lower_names(col):
+    # On Categorical columns map() runs once per category, not once per row
+    return col.map(lambda v: v.lower() if isinstance(v, str) else "")
+
+def load_cve_data(base_dir, python_only=False):
+    # Flat or normalized layout; repeated strings come back as Categoricals
+    df = load_flat(base_dir / "data" / "processed")
+    if python_only and "cpe_part" in df.columns:
+        # Skip OS/hardware CPEs and apps built for other ecosystems (node.js, wordpress, ...)
+        mask = python_candidate_mask(df["cpe_part"].astype(object), df["cpe_target_sw"].astype(object))
+        df = df[mask.to_numpy(zero_copy_only=False)].reset_index(drop=True)
     # Normalize product names
-    df["cpe_product"] = df["cpe_product"].fillna("").str.lower()
-    df["cpe_vendor"] = df["cpe_vendor"].fillna("").str.lower()
+    df["cpe_product"] = _lower_names(df["cpe_product"])
+    df["cpe_vendor"] = _lower_names(df["cpe_vendor"])
     return df
 
 # ---------------- Map dependencies to CVEs ----------------
-def map_dependencies(req_df, cve_df):
-    mapped_rows = []
+def filter_affected(matches, version, version_index):
+    """Keep only rows whose CVE's version ranges include the pinned version."""
+    affected = set()
+    for vendor, product in matches[["cpe_vendor", "cpe_product"]].drop_duplicates().itertuples(index=False):
+        affected.update(version_index.affected(vendor, product, version))
+    return matches[matches["cve_id"].isin(affected)]
+
+def index_matches(cpe_index, products, python_only=False):
+    """Rows of every CPE of these products, read from the memory-mapped index."""
+    matches = cpe_index.frame(cpe_index.postings(cpe_index.key_ids_for_products(products)))
+    if python_only and not matches.empty:
+        mask = python_candidate_mask(matches["cpe_part"], matches["cpe_target_sw"])
+        matches = matches[mask.to_numpy(zero_copy_only=False)]
+    return matches.drop(columns=["severity", "row", "record"])
+
+def map_dependencies(req_df, cve_df=None, version_index=None, cpe_index=None,
+                     match_versions=False, python_only=False, match="contains", cache=None):
+    """Map each requirement to CVE rows, from cve_df or (when given) the cpe_index.
+
+    Package names are matched against the distinct product names once, for
+    all requirements together (see src/product_match.py for the modes).
+    With cpe_index, match_versions builds a version index over just the
+    matched products; with cve_df, pass a prebuilt version_index instead.
+    With cache (src.result_cache.ResultCache), only the (package, version)
+    pairs it has not seen for these options and this dataset are mapped.
+
+    Collects iter_mapped_frames() into one DataFrame; stream large scans
+    with iter_matches() instead.
+    """
+    frames = list(iter_mapped_frames(req_df, cve_df, version_index, cpe_index,
+                                     match_versions, python_only, match, cache))
+    if not frames:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+def iter_matches(req_df, cve_df=None, version_index=None, cpe_index=None,
+                 match_versions=False, python_only=False, match="contains", cache=None, chunk_size=256):
+    """Yield one report row (a dict keyed by REPORT_COLUMNS) at a time, dependency by dependency."""
+    for frame in iter_mapped_frames(req_df, cve_df, version_index, cpe_index,
+                                    match_versions, python_only, match, cache, chunk_size):
+        yield from frame.reindex(columns=REPORT_COLUMNS).to_dict("records")
+
+def iter_mapped_frames(req_df, cve_df=None, version_index=None, cpe_index=None,
+                       match_versions=False, python_only=False, match="contains", cache=None, chunk_size=256):
+    """Yield the rows of map_dependencies() as DataFrames in requirement order:
+    one per dependency, or one per chunk_size dependencies through the cache."""
+    if cache is not None:
+        versions = match_versions if cpe_index is not None else version_index is not None
+        mode = f"{'index' if cpe_index is not None else 'dataset'}|{match}|versions={versions}|python={python_only}"
+        deps = list(req_df[["package", "version"]].itertuples(index=False, name=None)) if len(req_df) else []
+        for start in range(0, len(deps), chunk_size):
+            yield cached_lookup(
+                cache, "dependency_mapper", mode, deps[start:start + chunk_size],
+                lambda missing: map_dependencies(pd.DataFrame(missing, columns=["package", "version"]), cve_df,
+                                                 version_index, cpe_index, match_versions, python_only, match),
+                ["req_package", "req_version"])
+        return
+    if cpe_index is not None:
+        products = cpe_index.matcher()      # normalized once per index, not once per scan
+    else:
+        rows_by_product = cve_df.groupby("cpe_product", sort=False, observed=True).indices
+        products = list(rows_by_product)
+    matched_products = match_products(req_df["package"].tolist() if len(req_df) else [], products, match)
+
     for _, dep in req_df.iterrows():
         pkg = dep["package"]
         version = dep["version"]
-        # Find matching CPE entries by partial match
-        matches = cve_df[cve_df["cpe_product"].str.contains(pkg, case=False, na=False)]
+        if cpe_index is not None:
+            matches = index_matches(cpe_index, matched_products[pkg], python_only)
+            if match_versions and version and not matches.empty:
+                matches = filter_affected(matches, version, version_index_from_rows(matches))
+        else:
+            rows = [rows_by_product[p] for p in matched_products[pkg]]
+            matches = cve_df.iloc[np.sort(np.concatenate(rows)) if rows else []]
+            if version_index is not None and version and not matches.empty:
+                matches = filter_affected(matches, version, version_index)
         if not matches.empty:
             matches = matches.copy()
             matches["req_package"] = pkg
             matches["req_version"] = version
-            matches["severity"] = matches["cvss_base_score"].apply(score_to_severity)
-            mapped_rows.append(matches)
+            matches["severity"] = severity_labels(matches["cvss_base_score"])
+            yield matches
         else:
             # No CVE found for this dependency
-            mapped_rows.append(pd.DataFrame([{
+            yield pd.DataFrame([{
                 "req_package": pkg,
                 "req_version": version,
                 "cve_id": None,
@@ -80,38 +153,80 @@ def map_dependencies(req_df, cve_df):
                 "cvss_base_score": None,
                 "severity": "UNKNOWN",
                 "description": "No known CVEs found for this dependency."
-            }]))
-    return pd.concat(mapped_rows, ignore_index=True)
+            }])
 
 # ---------------- Main ----------------
-def main():
+def main(match_versions=False, python_only=False, use_index=True, match="contains", use_cache=True,
+         out_path=None, req_path=None):
+    """Write the report; returns the worst severity among the matched CVEs (None if there are none)."""
     base_dir = Path(__file__).resolve().parents[1]
-    req_path = base_dir / "requirements.txt"
-    out_path = base_dir / "data" / "processed" / "dependency_vulnerability_report.csv"
+    req_path = Path(req_path or base_dir / "requirements.txt")
+    # CSV, JSON Lines or Parquet, by extension
+    out_path = Path(out_path or base_dir / "data" / "processed" / "dependency_vulnerability_report.csv")
 
     print("📦 Loading project dependencies...")
     req_df = load_requirements(req_path)
     print(f"Found {len(req_df)} dependencies.")
 
-    print("🧠 Loading CVE–CPE dataset...")
-    cve_df = load_cve_data(base_dir)
-    print(f"Loaded {len(cve_df)} CVE entries from processed data.")
+    cpe_index = open_cpe_index(base_dir / "data" / "processed") if use_index else None
+    # Keyed on the dataset fingerprint, so a new ingest starts from an empty cache
+    cache = ResultCache.for_dataset(base_dir / "data" / "processed") if use_cache else None
+    if cpe_index is not None:
+        # Memory-mapped: only the pages of the matched CPEs are ever read
+        print(f"🗂️ Using CPE index ({len(cpe_index):,} products, {cpe_index.meta['rows']:,} CVE entries)")
+        frames = iter_mapped_frames(req_df, cpe_index=cpe_index, match_versions=match_versions,
+                                    python_only=python_only, match=match, cache=cache)
+    else:
+        print("🧠 Loading CVE–CPE dataset...")
+        cve_df = load_cve_data(base_dir, python_only)
+        print(f"Loaded {len(cve_df)} CVE entries from processed data.")
 
-    print("🔍 Mapping dependencies to vulnerabilities...")
-    mapped_df = map_dependencies(req_df, cve_df)
+        version_index = None
+        if match_versions:
+            print("📐 Building version range index...")
+            version_index = load_version_index(base_dir / "data" / "processed")
 
-    # Reorder and save
-    columns_order = [
-        "req_package", "req_version", "cve_id", "cpe_vendor", "cpe_product", "cpe_version",
-        "cvss_base_score", "severity", "description", "published", "last_modified"
-    ]
-    mapped_df = mapped_df[[c for c in columns_order if c in mapped_df.columns]]
+        frames = iter_mapped_frames(req_df, cve_df, version_index, python_only=python_only, match=match,
+                                    cache=cache)
 
-    mapped_df.to_csv(out_path, index=False, encoding="utf-8")
+    # Rows go to disk as each dependency is mapped
+    print("🔍 Mapping dependencies to vulnerabilities...")
+    matched, worst = 0, -1
+    with open_report_writer(out_path, REPORT_COLUMNS) as writer:
+        for frame in frames:
+            writer.write_frame(frame)
+            hits = frame["cve_id"].notna().to_numpy()
+            matched += int(hits.sum())
+            if hits.any():
+                worst = max(worst, int(severity_codes(frame["cvss_base_score"][hits]).max()))
     print(f"\n✅ Vulnerability report saved at:\n{out_path}")
-    print(f"Total matched vulnerabilities: {mapped_df['cve_id'].notna().sum()}")
+    print(f"Total matched vulnerabilities: {matched}")
     print(f"Total dependencies scanned: {len(req_df)}")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Lookup cache: {stats['hits']} hits ({stats['memory_hits']} memory, {stats['disk_hits']} disk), "
+              f"{stats['misses']} misses")
+        cache.close()
+    return SEVERITY_LABELS[worst] if worst >= 0 else None
 
 # ---------------- Run ----------------
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Map requirements.txt dependencies to known CVEs.")
+    parser.add_argument("--match-versions", action="store_true",
+                        help="only report CVEs whose CPE version ranges include the pinned version")
+    parser.add_argument("--python-only", action="store_true",
+                        help="ignore OS/hardware CPEs and applications targeting other ecosystems")
+    parser.add_argument("--no-index", action="store_true",
+                        help="load the full CVE-CPE dataset instead of the memory-mapped CPE index")
+    parser.add_argument("--match", default="contains", choices=MATCH_MODES,
+                        help="contains: product contains the package name (one Aho-Corasick pass); "
+                             "exact: normalized name equality; regex: package name as a regular expression")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="resolve every dependency again instead of reusing data/processed/lookup_cache.sqlite")
+    parser.add_argument("--requirements", help="manifest to scan: requirements.txt, pip freeze output, "
+                                               "poetry.lock or Pipfile.lock (default: requirements.txt)")
+    parser.add_argument("--out", help="report path; .csv, .jsonl / .ndjson or .parquet "
+                                      "(default: data/processed/dependency_vulnerability_report.csv)")
+    args = parser.parse_args()
+    main(match_versions=args.match_versions, python_only=args.python_only, use_index=not args.no_index,
+         match=args.match, use_cache=not args.no_cache, out_path=args.out, req_path=args.requirements)
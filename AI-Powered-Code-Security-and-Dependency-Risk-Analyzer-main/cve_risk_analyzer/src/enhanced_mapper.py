@@ -1,10 +1,14 @@
 import pandas as pd
 import numpy as np
 import joblib
-import difflib
-import re
 from pathlib import Path
-from sklearn.preprocessing import LabelEncoder
+
+from src.category_encoder import CategoryEncoder
+from src.cpe_index import open_cpe_index
+from src.cpe_mapper import load_alias_table
+from src.cve_store import CPE_KEY_COLUMNS, load_cpe_catalog
+from src.fuzzy_index import TrigramIndex
+from src.requirements_parser import dependency_frame
 
 # -----------------------
 # 1️⃣ File Paths
@@ -20,69 +24,62 @@ REQ_PATH = BASE_DIR / "requirements_test.txt"
 print("📦 Loading trained ML model...")
 model = joblib.load(MODEL_PATH)
 
-print("📄 Loading unique CPE dataset...")
-cpe_df = pd.read_csv(CPE_DATA_PATH)
-cpe_df = cpe_df.fillna("unknown")
-cpe_df.columns = [c.strip().lower() for c in cpe_df.columns]
-
-print(f"✅ Loaded {len(cpe_df)} CPE entries")
+# The memory-mapped index from src.nvd_ingest opens in milliseconds; fall back to the CSV catalog
+cpe_index = open_cpe_index(CPE_DATA_PATH.parent)
+if cpe_index is not None:
+    print("🗂️ Opening CPE index...")
+    cpe_products, cpe_vendors = cpe_index.products(), cpe_index.vendors()
+    product_index = cpe_index.fuzzy()   # trigram index saved by ingestion
+    print(f"✅ Indexed {len(cpe_products)} CPE products")
+else:
+    print("📄 Loading unique CPE catalog...")
+    # vendor/product/version + cve_count, max_cvss_score, first/last_published per CPE
+    cpe_df = load_cpe_catalog(CPE_DATA_PATH.parent)
+    cpe_df[CPE_KEY_COLUMNS] = cpe_df[CPE_KEY_COLUMNS].fillna("unknown")
+    cpe_products = cpe_df["cpe_product"].astype(str).unique().tolist()
+    cpe_vendors = cpe_df["cpe_vendor"].astype(str).unique().tolist()
+    product_index = TrigramIndex.build(cpe_products)
+    print(f"✅ Loaded {len(cpe_df)} CPE entries")
+# PyPI name -> CPE product aliases; most packages resolve here without a fuzzy search
+aliases = load_alias_table(CPE_DATA_PATH.parent)
+known_products = set(cpe_products)
 
 # -----------------------
 # 3️⃣ Helper Functions
 # -----------------------
 def read_requirements(req_path: Path):
-    """Read requirements.txt and extract package name + version."""
-    packages = []
-    pattern = re.compile(r"([a-zA-Z0-9_.-]+)==?([0-9a-zA-Z_.-]*)")
-    with open(req_path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            match = pattern.match(line)
-            if match:
-                pkg, version = match.groups()
-                packages.append((pkg.lower(), version))
-            else:
-                packages.append((line.lower(), ""))
-    return pd.DataFrame(packages, columns=["package", "version"])
-
-
-def get_best_match(package_name, cpe_products, cutoff=0.75):
-    """Fuzzy match package name to closest CPE product."""
-    matches = difflib.get_close_matches(package_name, cpe_products, n=1, cutoff=cutoff)
-    return matches[0] if matches else None
+    """Read requirements.txt (or a pip freeze / poetry.lock / Pipfile.lock) into package + pinned version."""
+    return dependency_frame(req_path)
 
 
-# -----------------------
-# 4️⃣ Safe Label Encoder Wrapper
-# -----------------------
-class SafeLabelEncoder(LabelEncoder):
-    def transform_safe(self, values):
-        values = np.array(values)
-        known_classes = set(self.classes_)
-        transformed = []
-        for v in values:
-            if v in known_classes:
-                transformed.append(super().transform([v])[0])
-            else:
-                transformed.append(super().transform([self.classes_[0]])[0])  # fallback to first known
-        return np.array(transformed)
+def product_catalog(product):
+    """Catalog rows (vendor/product/version, cve_count, max_cvss_score, ...) of one CPE product."""
+    if cpe_index is not None:
+        rows = cpe_index.catalog(cpe_index.key_ids_for_product(product))
+        rows[CPE_KEY_COLUMNS] = rows[CPE_KEY_COLUMNS].fillna("unknown")
+        return rows
+    return cpe_df[cpe_df["cpe_product"] == product]
+
+
+def get_best_match(package_name, cutoff=0.75):
+    """Alias or fuzzy match of a package name to a CPE product: (product, similarity) or (None, 0.0)."""
+    found = aliases.lookup(package_name)
+    if found is not None and found[1] in known_products:   # an override may name a product not in the data
+        return found[1], 1.0
+    matches = product_index.top_k(package_name, k=1, cutoff=cutoff)
+    return matches[0] if matches else (None, 0.0)
 
 
 # -----------------------
-# 5️⃣ Prepare Encoders
+# 4️⃣ Prepare Encoders
 # -----------------------
-vendor_encoder = SafeLabelEncoder()
-product_encoder = SafeLabelEncoder()
-severity_encoder = SafeLabelEncoder()
-
-vendor_encoder.fit(list(cpe_df["cpe_vendor"].astype(str)) + ["unknown_vendor"])
-product_encoder.fit(list(cpe_df["cpe_product"].astype(str)) + ["unknown_product"])
-severity_encoder.fit(["CRITICAL", "HIGH", "MEDIUM", "LOW", "UNKNOWN"])
+# Unseen vendors / products fall back to the first known class (code 0)
+vendor_encoder = CategoryEncoder.fit(cpe_vendors + ["unknown_vendor"], unknown=0)
+product_encoder = CategoryEncoder.fit(cpe_products + ["unknown_product"], unknown=0)
+severity_encoder = CategoryEncoder.fit(["CRITICAL", "HIGH", "MEDIUM", "LOW", "UNKNOWN"])
 
 # -----------------------
-# 6️⃣ Predict Severity
+# 5️⃣ Predict Severity
 # -----------------------
 req_df = read_requirements(REQ_PATH)
 print(f"📥 Loaded {len(req_df)} dependencies to analyze")
@@ -93,41 +90,42 @@ for _, row in req_df.iterrows():
     pkg = row["package"]
     version = row["version"] or "unknown"
 
-    best_match = get_best_match(pkg, cpe_df["cpe_product"].astype(str).tolist(), cutoff=0.6)
+    best_match, match_score = get_best_match(pkg, cutoff=0.6)
     if best_match:
-        matched_row = cpe_df[cpe_df["cpe_product"] == best_match].iloc[0]
+        product_rows = product_catalog(best_match)
+        # Prefer the catalog entry for this exact version; otherwise use the product's worst score
+        version_rows = product_rows[product_rows["cpe_version"] == version]
+        rows = version_rows if len(version_rows) else product_rows
+        matched_row = rows.loc[rows["cve_count"].fillna(0).idxmax()]
         vendor = matched_row["cpe_vendor"]
         product = matched_row["cpe_product"]
-        base_score = matched_row.get("cvss_base_score", np.nan)
+        base_score = rows["max_cvss_score"].max()
+        cve_count = int(rows["cve_count"].sum())
     else:
-        vendor, product, base_score = "unknown_vendor", "unknown_product", np.nan
-
-    # Prepare features for prediction
-    input_df = pd.DataFrame([{
-        "cpe_vendor": vendor,
-        "cpe_product": product,
-        "cvss_base_score": base_score if not pd.isna(base_score) else 0.0
-    }])
-
-    input_df["vendor_encoded"] = vendor_encoder.transform_safe(input_df["cpe_vendor"].astype(str))
-    input_df["product_encoded"] = product_encoder.transform_safe(input_df["cpe_product"].astype(str))
-
-    X_test = input_df[["vendor_encoded", "product_encoded", "cvss_base_score"]]
-    severity_pred = model.predict(X_test)[0]
-    pred_label = severity_encoder.inverse_transform([severity_pred])[0]
+        vendor, product, base_score, cve_count = "unknown_vendor", "unknown_product", np.nan, 0
 
     predictions.append({
         "dependency": f"{pkg}=={version}",
         "matched_vendor": vendor,
         "matched_product": product,
+        "match_score": round(match_score, 3),
         "cvss_score": base_score,
-        "predicted_severity": pred_label
+        "cve_count": cve_count,
     })
 
+# One encode + predict over all dependencies instead of one per row
+output_df = pd.DataFrame(predictions, columns=["dependency", "matched_vendor", "matched_product", "match_score",
+                                               "cvss_score", "cve_count"])
+X_test = pd.DataFrame({
+    "vendor_encoded": vendor_encoder.transform(output_df["matched_vendor"].astype(str)),
+    "product_encoded": product_encoder.transform(output_df["matched_product"].astype(str)),
+    "cvss_base_score": output_df["cvss_score"].astype(float).fillna(0.0),
+})
+output_df["predicted_severity"] = severity_encoder.inverse_transform(model.predict(X_test)) if len(X_test) else []
+
 # -----------------------
-# 7️⃣ Save & Display Results
+# 6️⃣ Save & Display Results
 # -----------------------
-output_df = pd.DataFrame(predictions)
 output_path = BASE_DIR / "data" / "processed" / "severity_predictions.csv"
 output_df.to_csv(output_path, index=False)
 
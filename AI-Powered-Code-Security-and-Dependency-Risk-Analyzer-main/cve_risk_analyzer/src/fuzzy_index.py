@@ -0,0 +1,129 @@
+# src/fuzzy_index.py
+"""
+Fuzzy product-name index
+------------------------
+Finds the CPE products closest to a package name without comparing it to
+every product. Names are normalized (product_match.normalize_name) and cut
+into character trigrams, padded like pg_trgm ("  flask " -> "  f", " fl",
+"fla", ...). Each trigram keeps the sorted ids of the names containing it.
+
+A query counts shared trigrams over the postings of its own trigrams
+(np.bincount), ranks those candidates by trigram similarity
+shared / (|query| + |name| - shared), and rescores the best `shortlist` of
+them with difflib's ratio, the measure get_close_matches() uses. Trigrams
+found in more than max_df of all names are skipped while the query has
+rarer ones, so common fragments ("lib", "  p") do not flood the count.
+
+Arrays are stored as .npy files, so a saved index is opened with mmap.
+"""
+
+import difflib
+import json
+from pathlib import Path
+
+import numpy as np
+
+from src.product_match import normalize_name
+
+FUZZY_FORMAT = 1
+
+
+def trigrams(name):
+    padded = f"  {normalize_name(name)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Trigram postings over a fixed list of names; top_k() returns (name, score) pairs."""
+
+    def __init__(self, names, grams, offsets, postings, gram_counts):
+        self.names = names              # S bytes, utf-8, sorted
+        self.grams = grams              # S bytes, utf-8, sorted
+        self.offsets = offsets          # postings of grams[i] are postings[offsets[i]:offsets[i + 1]]
+        self.postings = postings        # name ids
+        self.gram_counts = gram_counts  # trigrams per name
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def build(cls, names):
+        names = sorted(set(names))
+        gram_ids, pairs, counts = {}, [], []
+        for name_id, name in enumerate(names):
+            grams = trigrams(name)
+            counts.append(len(grams))
+            pairs.extend((gram_ids.setdefault(g, len(gram_ids)), name_id) for g in grams)
+        gram_list = sorted(gram_ids, key=lambda g: g.encode("utf-8"))
+        rank = np.empty(len(gram_list), dtype=np.int64)
+        rank[[gram_ids[g] for g in gram_list]] = np.arange(len(gram_list))
+        pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        gram_of = rank[pairs[:, 0]]
+        order = np.lexsort((pairs[:, 1], gram_of))
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(gram_of, minlength=len(gram_list)))])
+        return cls(np.array([n.encode("utf-8") for n in names], dtype=bytes),
+                   np.array([g.encode("utf-8") for g in gram_list], dtype=bytes),
+                   offsets.astype(np.int64), pairs[order, 1].astype(np.int32),
+                   np.array(counts, dtype=np.int16))
+
+    def save(self, out_dir):
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for name in ("names", "grams", "offsets", "postings", "gram_counts"):
+            np.save(out_dir / f"{name}.npy", getattr(self, name))
+        (out_dir / "meta.json").write_text(json.dumps({"format": FUZZY_FORMAT, "names": len(self.names)}))
+
+    @classmethod
+    def load(cls, index_dir):
+        index_dir = Path(index_dir)
+        meta = json.loads((index_dir / "meta.json").read_text())
+        if meta.get("format") != FUZZY_FORMAT:
+            raise ValueError(f"Unsupported fuzzy index format in {index_dir}: {meta.get('format')}")
+        # Plain ndarray views of the maps: slicing a np.memmap costs more than the lookup itself
+        return cls(*(np.asarray(np.load(index_dir / f"{name}.npy", mmap_mode="r"))
+                     for name in ("names", "grams", "offsets", "postings", "gram_counts")))
+
+    def _gram_postings(self, grams):
+        keys = np.array([g.encode("utf-8") for g in grams], dtype=bytes)
+        pos = np.searchsorted(self.grams, keys)
+        pos = np.minimum(pos, len(self.grams) - 1)
+        found = pos[self.grams[pos] == keys]
+        return [self.postings[self.offsets[i]:self.offsets[i + 1]] for i in found.tolist()]
+
+    def top_k(self, query, k=5, cutoff=0.0, shortlist=16, max_df=0.05):
+        """Up to k (name, score) pairs with score >= cutoff, best first; score is difflib's ratio."""
+        grams = trigrams(query)
+        if not grams or len(self.names) == 0:
+            return []
+        postings = self._gram_postings(grams)
+        rare = [p for p in postings if len(p) <= max_df * len(self.names)]
+        postings = rare or postings
+        if not postings:
+            return []
+
+        candidates, shared = np.unique(np.concatenate(postings), return_counts=True)
+        similarity = shared / (len(grams) + self.gram_counts[candidates] - shared)
+        if len(candidates) > shortlist:
+            top = np.argpartition(-similarity, shortlist)[:shortlist]
+            candidates, similarity = candidates[top], similarity[top]
+        best = candidates[np.argsort(-similarity, kind="stable")]
+
+        target = normalize_name(query)
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(target)
+        scored = []
+        for name in self.names[best].tolist():
+            name = name.decode("utf-8")
+            matcher.set_seq1(normalize_name(name))
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                score = matcher.ratio()
+                if score >= cutoff:
+                    scored.append((score, name))
+        # Same order as get_close_matches(): best score first, ties to the larger name
+        scored.sort(reverse=True)
+        return [(name, score) for score, name in scored[:k]]
+
+    def best_match(self, query, cutoff=0.6):
+        """The closest name with score >= cutoff, or None."""
+        found = self.top_k(query, k=1, cutoff=cutoff)
+        return found[0][0] if found else None
@@ -0,0 +1,123 @@
+# src/json_backend.py
+"""
+Pluggable JSON decoding for NVD feeds
+-------------------------------------
+Three interchangeable backends:
+    json    stdlib, whole-document load (always available)
+    orjson  whole-document load, several times faster than json
+    ijson   streaming, one item at a time (flat memory); fastest with its
+            C (yajl2_c) backend, slow with the pure-Python one
+
+"auto" never gives up streaming: iter_items() / iter_kv_items() use ijson
+whenever it is installed, C backend or not, so memory stays flat however
+large the feed; orjson / json only when ijson is missing, or when asked for
+by name. For whole-document loads "auto" picks orjson, then json. All
+backends take binary file objects and return floats (not Decimal) for
+numbers.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # optional streaming backend
+    ijson = None
+
+BACKENDS = ["auto", "ijson", "orjson", "json"]
+# What a malformed document raises, whichever backend decodes it (orjson's error is a ValueError)
+DECODE_ERRORS = (ValueError,) + ((ijson.JSONError,) if ijson is not None else ())
+STREAMING_BACKENDS = {"ijson"}
+
+
+def ijson_has_c_backend():
+    return ijson is not None and ijson.backend.endswith("_c")
+
+
+def available_backends():
+    names = ["json"]
+    if orjson is not None:
+        names.append("orjson")
+    if ijson is not None:
+        names.append("ijson")
+    return names
+
+
+def resolve_backend(name="auto", streaming=True):
+    """Turn "auto" into a concrete backend name; reject backends that are not installed.
+
+    With streaming=True "auto" prefers ijson even without its C backend: a
+    whole-document backend would hold the entire feed in memory.
+    """
+    if name == "auto":
+        if streaming and ijson is not None:
+            return "ijson"
+        if orjson is not None:
+            return "orjson"
+        return "json"
+    if name not in available_backends():
+        raise ValueError(f"JSON backend '{name}' is not available (installed: {', '.join(available_backends())})")
+    return name
+
+
+def load(fh, backend="auto"):
+    """Decode a whole document from a binary file object."""
+    backend = resolve_backend(backend, streaming=False)
+    if backend == "orjson":
+        return orjson.loads(fh.read())
+    if backend == "ijson":
+        return next(ijson.items(fh, "", use_float=True))
+    return json.load(fh)
+
+
+def iter_items(fh, prefix, backend="auto"):
+    """Yield the elements at an ijson-style prefix such as "vulnerabilities.item".
+
+    ijson streams them; whole-document backends load once and walk the path.
+    """
+    backend = resolve_backend(backend, streaming=True)
+    if backend == "ijson":
+        yield from ijson.items(fh, prefix, use_float=True)
+        return
+
+    node = load(fh, backend)
+    for key in prefix.split("."):
+        if key == "item":
+            break
+        node = node.get(key, []) if isinstance(node, dict) else []
+    yield from node
+
+
+def iter_kv_items(fh, prefix, backend="auto"):
+    """Yield the (key, value) pairs of the object at an ijson-style prefix such as "default"."""
+    backend = resolve_backend(backend, streaming=True)
+    if backend == "ijson":
+        yield from ijson.kvitems(fh, prefix, use_float=True)
+        return
+
+    node = load(fh, backend)
+    for key in prefix.split(".") if prefix else []:
+        node = node.get(key, {}) if isinstance(node, dict) else {}
+    if isinstance(node, dict):
+        yield from node.items()
+
+
+def iter_top_level_keys(fh):
+    """Yield the top-level keys of a JSON object, stopping as soon as the caller does."""
+    if ijson is not None:
+        for prefix, event, value in ijson.parse(fh):
+            if prefix == "" and event == "map_key":
+                yield value
+        return
+    yield from load(fh, "auto")
+
+
+def describe(backend="auto", streaming=True):
+    name = resolve_backend(backend, streaming)
+    if name == "ijson":
+        return f"ijson ({ijson.backend})"
+    return name
@@ -4,9 +4,10 @@ Step 7: Use trained model to predict vulnerability severity
 
 import pandas as pd
 import joblib
-from sklearn.preprocessing import LabelEncoder
 from pathlib import Path
 
+from src.category_encoder import CategoryEncoder
+
 # -------------------------------------------------------
 # 1️⃣ Load trained model and encoders
 # -------------------------------------------------------
@@ -36,25 +37,15 @@ print(new_df)
 # -------------------------------------------------------
 # 3️⃣ Encode categorical features
 # -------------------------------------------------------
-# We’ll refit encoders from known data (since we’re not using a persistent one)
-from sklearn.preprocessing import LabelEncoder
-
-# Simulate fitting from past data — in production, you’d save these encoders
-vendor_enc = LabelEncoder()
-product_enc = LabelEncoder()
-
-# Load your ML dataset to restore encoder fitting
-base_df = pd.read_csv("data/processed/ml_ready_dataset.csv")
-
-vendor_enc.fit(base_df["cpe_vendor"])
-product_enc.fit(base_df["cpe_product"])
+# ml_preprocess.py encoded the training data with the sorted vendors / products
+# of ml_ready_dataset.csv, so an encoder fitted on those columns gives the same codes
+base_df = pd.read_csv("data/processed/ml_ready_dataset.csv", usecols=["cpe_vendor", "cpe_product"])
+vendor_enc = CategoryEncoder.fit(base_df["cpe_vendor"].astype(str))
+product_enc = CategoryEncoder.fit(base_df["cpe_product"].astype(str))
 
-new_df["vendor_encoded"] = new_df["cpe_vendor"].apply(
-    lambda x: vendor_enc.transform([x])[0] if x in vendor_enc.classes_ else -1
-)
-new_df["product_encoded"] = new_df["cpe_product"].apply(
-    lambda x: product_enc.transform([x])[0] if x in product_enc.classes_ else -1
-)
+# Whole columns at once; unseen vendors / products get -1
+new_df["vendor_encoded"] = vendor_enc.transform(new_df["cpe_vendor"])
+new_df["product_encoded"] = product_enc.transform(new_df["cpe_product"])
 
 # -------------------------------------------------------
 # 4️⃣ Predict severity
@@ -5,11 +5,15 @@ Uses TF-IDF + structured features to predict severity
 for new CVEs or dependency descriptions.
 """
 
+import numpy as np
 import pandas as pd
 import joblib
 from scipy.sparse import hstack
 from pathlib import Path
 
+from src.category_encoder import load_encoder
+from src.cvss import vector_codes
+
 # -------------------------------------------------------
 # 1️⃣ Load trained model and encoders
 # -------------------------------------------------------
@@ -17,9 +21,12 @@ model_dir = Path("data/processed/model")
 
 model = joblib.load(model_dir / "trained_model_v2.pkl")
 tfidf = joblib.load(model_dir / "tfidf_vectorizer.pkl")
-vendor_enc = joblib.load(model_dir / "vendor_encoder.pkl")
-product_enc = joblib.load(model_dir / "product_encoder.pkl")
-severity_enc = joblib.load(model_dir / "severity_encoder.pkl")
+vendor_enc = load_encoder(model_dir / "vendor_encoder.pkl")
+product_enc = load_encoder(model_dir / "product_encoder.pkl")
+severity_enc = load_encoder(model_dir / "severity_encoder.pkl")
+# CVSS metric encoders; models trained before ml_train_v2 used the metrics have none
+vector_path = model_dir / "vector_encoders.pkl"
+vector_encs = joblib.load(vector_path) if vector_path.exists() else {}
 
 print("✅ Model and encoders loaded successfully.")
 
@@ -32,6 +39,7 @@ samples = [
         "cpe_vendor": "code-projects",
         "cpe_product": "chat_system",
         "cvss_base_score": 0.0,
+        "cvss_vector": "CVSS:3.1/AV:N/AC:L/PR:N/UI:N/S:U/C:H/I:H/A:N",
         "description": "SQL injection vulnerability allows attackers to modify database queries through the login form."
     },
     {
@@ -55,26 +63,24 @@ samples = [
 ]
 
 df = pd.DataFrame(samples)
+df["cvss_vector"] = df.get("cvss_vector")   # optional per sample
 print("\n📦 New vulnerabilities for prediction:")
 print(df[["cpe_product", "description"]])
 
 # -------------------------------------------------------
 # 3️⃣ Encode structured features
 # -------------------------------------------------------
-def safe_encode(encoder, value):
-    if value in encoder.classes_:
-        return encoder.transform([value])[0]
-    else:
-        return -1  # unseen category
-
-df["vendor_encoded"] = df["cpe_vendor"].apply(lambda x: safe_encode(vendor_enc, x))
-df["product_encoded"] = df["cpe_product"].apply(lambda x: safe_encode(product_enc, x))
+# Whole columns at once; unseen vendors / products get -1
+df["vendor_encoded"] = vendor_enc.transform(df["cpe_vendor"])
+df["product_encoded"] = product_enc.transform(df["cpe_product"])
 
 # -------------------------------------------------------
 # 4️⃣ Generate TF-IDF vectors for descriptions
 # -------------------------------------------------------
 X_text = tfidf.transform(df["description"])
-X_struct = df[["vendor_encoded", "product_encoded", "cvss_base_score"]].values
+# CVSS metrics of the vector strings (no vector -> -1), in the order the model was trained on
+X_struct = np.column_stack([df[["vendor_encoded", "product_encoded", "cvss_base_score"]].values,
+                            vector_codes(df["cvss_vector"], vector_encs)])
 X_combined = hstack([X_struct, X_text])
 
 # -------------------------------------------------------
@@ -92,18 +92,19 @@ and saves an ML-ready dataset.
 
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder
 from pathlib import Path
 
+from src.category_encoder import CategoryEncoder
+from src.cve_store import load_flat
+from src.cvss import VECTOR_COLUMNS, parse_vectors, severity_labels
+
 # -------------------------------------------------------
 # 1️⃣ Load the dataset
 # -------------------------------------------------------
-data_path = Path("data/processed/cve_cpe.csv")
-
-if not data_path.exists():
-    raise FileNotFoundError(f"❌ Could not find {data_path}")
-
-df = pd.read_csv(data_path)
+# Flat cve_cpe.parquet/csv or the normalized layout; only the columns used below
+processed_dir = Path("data/processed")
+df = load_flat(processed_dir, columns=["cve_id", "cpe_vendor", "cpe_product", "cpe_version", "cvss_base_score",
+                                      "cvss_vector"])
 
 print("✅ Loaded dataset:")
 print(f"Total records: {len(df)}")
@@ -126,11 +127,11 @@ for col in expected_cols:
     if col not in df.columns:
         df[col] = np.nan
 
-# Fill missing data
+# Fill missing data (object dtype so fills work on Categorical columns)
 df["description"] = df["description"].fillna("No description provided.")
-df["cpe_vendor"] = df["cpe_vendor"].fillna("unknown_vendor")
-df["cpe_product"] = df["cpe_product"].fillna("unknown_product")
-df["cpe_version"] = df["cpe_version"].fillna("unknown")
+df["cpe_vendor"] = df["cpe_vendor"].astype(object).fillna("unknown_vendor")
+df["cpe_product"] = df["cpe_product"].astype(object).fillna("unknown_product")
+df["cpe_version"] = df["cpe_version"].astype(object).fillna("unknown")
 
 # Convert CVSS to numeric safely
 df["cvss_base_score"] = pd.to_numeric(df["cvss_base_score"], errors="coerce").fillna(0)
@@ -140,28 +141,22 @@ df["cvss_base_score"] = pd.to_numeric(df["cvss_base_score"], errors="coerce").fi
 # -------------------------------------------------------
 if "severity" not in df.columns:
     print("🧩 Severity column not found — generating from CVSS base score...")
-    def derive_severity(score):
-        if score >= 9.0:
-            return "CRITICAL"
-        elif score >= 7.0:
-            return "HIGH"
-        elif score >= 4.0:
-            return "MEDIUM"
-        elif score > 0:
-            return "LOW"
-        else:
-            return "UNKNOWN"
-    df["severity"] = df["cvss_base_score"].apply(derive_severity)
+    # Scores are 0-filled above, so 0 means no score
+    df["severity"] = severity_labels(df["cvss_base_score"], zero_unknown=True)
 else:
     df["severity"] = df["severity"].fillna("UNKNOWN").str.upper()
 
+# Base metrics (attack vector, complexity, privileges, ...) from the vector string
+df = df.join(parse_vectors(df["cvss_vector"]))
+
 # -------------------------------------------------------
 # 4️⃣ Encode categorical values
 # -------------------------------------------------------
-label_enc = LabelEncoder()
-df["vendor_encoded"] = label_enc.fit_transform(df["cpe_vendor"].astype(str))
-df["product_encoded"] = label_enc.fit_transform(df["cpe_product"].astype(str))
-df["severity_encoded"] = label_enc.fit_transform(df["severity"].astype(str))
+# Sorted-label codes (LabelEncoder's); ml_predict / ai_dependency_analyzer refit the same encoders
+for column, encoded in [("cpe_vendor", "vendor_encoded"), ("cpe_product", "product_encoded"),
+                        ("severity", "severity_encoded")]:
+    values = df[column].astype(str)
+    df[encoded] = CategoryEncoder.fit(values).transform(values)
 
 # -------------------------------------------------------
 # 5️⃣ Select useful ML features
@@ -169,7 +164,8 @@ df["severity_encoded"] = label_enc.fit_transform(df["severity"].astype(str))
 ml_df = df[[
     "cpe_vendor", "cpe_product", "cpe_version",
     "cvss_base_score", "severity",
-    "vendor_encoded", "product_encoded", "severity_encoded"
+    "vendor_encoded", "product_encoded", "severity_encoded",
+    *VECTOR_COLUMNS
 ]]
 
 # -------------------------------------------------------
@@ -10,9 +10,8 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import (
     accuracy_score, classification_report, confusion_matrix
 )
+import sys
 from pathlib import Path
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 # -------------------------------------------------------
 # 1️⃣ Load ML-ready dataset
@@ -57,14 +56,18 @@ print("Accuracy:", round(accuracy_score(y_test, y_pred), 3))
 print("\nClassification Report:")
 print(classification_report(y_test, y_pred))
 
-# Confusion matrix visualization
-plt.figure(figsize=(6, 4))
-sns.heatmap(confusion_matrix(y_test, y_pred), annot=True, fmt="d", cmap="Blues")
-plt.title("Confusion Matrix - Severity Prediction")
-plt.xlabel("Predicted")
-plt.ylabel("Actual")
-plt.tight_layout()
-plt.show()
+# Confusion matrix visualization (--no-plot skips it, and matplotlib / seaborn are never imported)
+if "--no-plot" not in sys.argv[1:]:
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(6, 4))
+    sns.heatmap(confusion_matrix(y_test, y_pred), annot=True, fmt="d", cmap="Blues")
+    plt.title("Confusion Matrix - Severity Prediction")
+    plt.xlabel("Predicted")
+    plt.ylabel("Actual")
+    plt.tight_layout()
+    plt.show()
 
 # -------------------------------------------------------
 # 5️⃣ Save model
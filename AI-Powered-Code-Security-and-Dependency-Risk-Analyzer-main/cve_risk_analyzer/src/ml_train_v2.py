@@ -1,8 +1,9 @@
 """
 Step 8: Advanced ML Model for Severity Prediction
 -------------------------------------------------
-Uses both structured features (vendor, product, cvss)
-and unstructured features (description text).
+Uses both structured features (vendor, product, cvss score
+and the CVSS vector's base metrics) and unstructured
+features (description text).
 """
 
 import pandas as pd
@@ -10,13 +11,15 @@ import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 from scipy.sparse import hstack
+import sys
 from pathlib import Path
 import joblib
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from src.category_encoder import CategoryEncoder
+from src.cve_store import has_dataset, load_flat
+from src.cvss import vector_encoders
 
 # -------------------------------------------------------
 # 1️⃣ Load data
@@ -31,10 +34,10 @@ df = pd.read_csv(data_path)
 # Optional: add description if available
 if "description" not in df.columns:
     print("⚠️ No description found — merging from original dataset.")
-    base_csv = Path("data/processed/cve_cpe.csv")
-    if base_csv.exists():
-        base_df = pd.read_csv(base_csv, usecols=["description"])
-        df["description"] = base_df["description"].fillna("No description provided.")
+    processed_dir = Path("data/processed")
+    if has_dataset(processed_dir) or (processed_dir / "cve_cpe.csv").exists():
+        base_df = load_flat(processed_dir, columns=["description"])
+        df["description"] = base_df["description"].astype(object).fillna("No description provided.")
     else:
         df["description"] = "No description provided."
 
@@ -47,15 +50,21 @@ print(df.head(3))
 df["description"] = df["description"].fillna("No description provided.")
 df["cvss_base_score"] = pd.to_numeric(df["cvss_base_score"], errors="coerce").fillna(0)
 
-# Encode vendor & product
-vendor_enc = LabelEncoder()
-product_enc = LabelEncoder()
-df["vendor_encoded"] = vendor_enc.fit_transform(df["cpe_vendor"].astype(str))
-df["product_encoded"] = product_enc.fit_transform(df["cpe_product"].astype(str))
+# Encode vendor & product (saved below; predictors encode whole columns with them, unseen -> -1)
+vendor_enc = CategoryEncoder.fit(df["cpe_vendor"].astype(str))
+product_enc = CategoryEncoder.fit(df["cpe_product"].astype(str))
+df["vendor_encoded"] = vendor_enc.transform(df["cpe_vendor"].astype(str))
+df["product_encoded"] = product_enc.transform(df["cpe_product"].astype(str))
+
+# CVSS base metrics (cvss_av ... cvss_a, written by ml_preprocess.py); no vector -> -1
+vector_encs = vector_encoders()
+for column, enc in vector_encs.items():
+    df[f"{column}_encoded"] = enc.transform(df[column]) if column in df.columns else -1
+struct_columns = ["vendor_encoded", "product_encoded", "cvss_base_score"] + [f"{c}_encoded" for c in vector_encs]
 
 # Encode labels (severity)
-label_enc = LabelEncoder()
-df["severity_encoded"] = label_enc.fit_transform(df["severity"].astype(str))
+label_enc = CategoryEncoder.fit(df["severity"].astype(str))
+df["severity_encoded"] = label_enc.transform(df["severity"].astype(str))
 
 # -------------------------------------------------------
 # 3️⃣ TF-IDF feature extraction from descriptions
@@ -71,7 +80,7 @@ X_text = tfidf.fit_transform(df["description"])
 # -------------------------------------------------------
 # 4️⃣ Combine structured + text features
 # -------------------------------------------------------
-X_struct = df[["vendor_encoded", "product_encoded", "cvss_base_score"]].values
+X_struct = df[struct_columns].values
 X_combined = hstack([X_struct, X_text])  # sparse + numeric
 y = df["severity_encoded"]
 
@@ -106,14 +115,18 @@ print(f"\n✅ Model Accuracy: {acc:.3f}")
 print("\nClassification Report:")
 print(classification_report(y_test, y_pred))
 
-# Confusion matrix visualization
-plt.figure(figsize=(6, 4))
-sns.heatmap(confusion_matrix(y_test, y_pred), annot=True, fmt="d", cmap="Blues")
-plt.title("Confusion Matrix - Severity Prediction (v2)")
-plt.xlabel("Predicted")
-plt.ylabel("Actual")
-plt.tight_layout()
-plt.show()
+# Confusion matrix visualization (--no-plot skips it, and matplotlib / seaborn are never imported)
+if "--no-plot" not in sys.argv[1:]:
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(6, 4))
+    sns.heatmap(confusion_matrix(y_test, y_pred), annot=True, fmt="d", cmap="Blues")
+    plt.title("Confusion Matrix - Severity Prediction (v2)")
+    plt.xlabel("Predicted")
+    plt.ylabel("Actual")
+    plt.tight_layout()
+    plt.show()
 
 # -------------------------------------------------------
 # 8️⃣ Save model + encoders + vectorizer
@@ -126,5 +139,6 @@ joblib.dump(tfidf, model_dir / "tfidf_vectorizer.pkl")
 joblib.dump(vendor_enc, model_dir / "vendor_encoder.pkl")
 joblib.dump(product_enc, model_dir / "product_encoder.pkl")
 joblib.dump(label_enc, model_dir / "severity_encoder.pkl")
+joblib.dump(vector_encs, model_dir / "vector_encoders.pkl")   # predictors add the metric columns when present
 
 print(f"\n✅ Advanced model and encoders saved to {model_dir}")
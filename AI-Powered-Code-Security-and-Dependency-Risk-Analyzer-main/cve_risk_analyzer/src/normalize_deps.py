@@ -1,13 +1,6 @@
+from src.requirements_parser import iter_dependencies
+
+
 def load_dependencies(filepath="data/dependencies/requirements.txt"):
-    deps = []
-    with open(filepath, "r") as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith("#"):
-                continue
-            if "==" in line:
-                pkg, ver = line.split("==")
-                deps.append((pkg.lower(), ver))
-            else:
-                deps.append((line.lower(), None))
-    return deps
+    """(package, pinned version or None) for each dependency of a requirements file or lockfile."""
+    return [(dep.name, dep.version or None) for dep in iter_dependencies(filepath)]
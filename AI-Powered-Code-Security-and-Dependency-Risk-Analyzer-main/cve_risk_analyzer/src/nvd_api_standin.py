@@ -0,0 +1,145 @@
+# src/nvd_api_standin.py
+"""
+Local stand-in for the NVD CVE API 2.0
+--------------------------------------
+Serves synthetic CVEs (src/synthetic_feed.py) from
+    GET /rest/json/cves/2.0?startIndex=&resultsPerPage=[&lastModStartDate=&lastModEndDate=]
+with the same response envelope as services.nvd.nist.gov, so the fetcher
+can be exercised offline. It can also misbehave on purpose: a request
+budget that answers 403 when exceeded (like NVD's rate limit) and a share
+of random 503s.
+
+    python -m src.nvd_api_standin --cves 10000 --port 8808
+    python -m src.nvd_fetch --base-url http://127.0.0.1:8808/rest/json/cves/2.0
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from src.nvd_fetch import parse_rate
+from src.synthetic_feed import generate_items
+
+API_PATH = "/rest/json/cves/2.0"
+MAX_RESULTS_PER_PAGE = 2000
+
+
+def _api_timestamp(value):
+    # "2025-01-01T00:00:00.000Z" / "...+00:00" -> the feed's "2025-01-01T00:00:00.000"
+    return value[:23] if value else None
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server_version = "NVDStandIn/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != API_PATH:
+            return self._send(404, {"message": "Not found"})
+        if not self.server.allow_request():
+            return self._send(403, {"message": "Rate limit exceeded"})
+        if self.server.rng_fail():
+            return self._send(503, {"message": "Service unavailable"})
+
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        try:
+            start = int(query.get("startIndex", 0))
+            per_page = min(int(query.get("resultsPerPage", MAX_RESULTS_PER_PAGE)), MAX_RESULTS_PER_PAGE)
+        except ValueError:
+            return self._send(400, {"message": "Invalid startIndex/resultsPerPage"})
+
+        items = self.server.items
+        lo, hi = _api_timestamp(query.get("lastModStartDate")), _api_timestamp(query.get("lastModEndDate"))
+        if lo or hi:
+            items = [i for i in items if (not lo or i["cve"]["lastModified"] >= lo)
+                     and (not hi or i["cve"]["lastModified"] <= hi)]
+        page = items[start:start + per_page]
+        self._send(200, {
+            "resultsPerPage": len(page),
+            "startIndex": start,
+            "totalResults": len(items),
+            "format": "NVD_CVE",
+            "version": "2.0",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S.000", time.gmtime()),
+            "vulnerabilities": page,
+        })
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, n_cves=10_000, seed=0, rate_limit=None, fail_rate=0.0, verbose=False):
+        super().__init__(address, StandInHandler)
+        self.items = list(generate_items(n_cves, "2.0", seed))
+        self.rate_limit = rate_limit          # (requests, seconds) or None
+        self.fail_rate = fail_rate
+        self.verbose = verbose
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PATH}"
+
+    def allow_request(self):
+        if self.rate_limit is None:
+            return True
+        max_requests, window = self.rate_limit
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= window:
+                self._recent.popleft()
+            if len(self._recent) >= max_requests:
+                return False
+            self._recent.append(now)
+            return True
+
+    def rng_fail(self):
+        with self._lock:
+            return self._rng.random() < self.fail_rate
+
+
+def start_standin(host="127.0.0.1", port=0, **options):
+    """Start a stand-in server in a background thread; call .shutdown() when done."""
+    server = StandInServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve synthetic CVEs with the NVD CVE API 2.0 interface.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--cves", type=int, default=10_000, help="number of synthetic CVEs to serve")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rate-limit", type=parse_rate, help="answer 403 above N requests per S seconds, e.g. 5/30")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with 503")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    server = StandInServer((args.host, args.port), n_cves=args.cves, seed=args.seed,
+                           rate_limit=args.rate_limit, fail_rate=args.fail_rate, verbose=args.verbose)
+    print(f"🛰️ Serving {args.cves:,} synthetic CVEs at {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,279 @@
+# src/nvd_fetch.py
+"""
+NVD CVE API 2.0 sync
+--------------------
+Pages through https://services.nvd.nist.gov/rest/json/cves/2.0 with several
+requests in flight, inside a request budget (NVD allows 5 requests per 30 s
+without an API key and 50 with one). Each page goes straight from the HTTP
+response into the ingest normalizer and lands as a normalized part file
+under data/processed/fetch_parts/; no raw JSON is written.
+
+Finished pages are recorded in data/processed/nvd_fetch_checkpoint.json
+together with the query, so an interrupted sync picks up at the first
+missing startIndex. When every page is in, the parts are merged into the
+dataset (upsert when one exists) and the checkpoint is removed.
+
+    python -m src.nvd_fetch                        # full sync
+    python -m src.nvd_fetch --since-last-sync      # only CVEs modified since the last sync
+    python -m src.nvd_fetch --base-url http://127.0.0.1:8808/rest/json/cves/2.0   # local stand-in
+
+Uses only the standard library for HTTP (urllib in worker threads).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from src import json_backend
+from src.cve_store import processed_dir_for
+from src.nvd_ingest import DEFAULT_COMPRESSION, DEFAULT_ROW_GROUP_SIZE, LAYOUTS, merge_parts, write_part
+
+NVD_API_URL = "https://services.nvd.nist.gov/rest/json/cves/2.0"
+MAX_PAGE_SIZE = 2000
+PUBLIC_RATE = (5, 30.0)      # requests per seconds without an API key
+KEYED_RATE = (50, 30.0)
+RETRY_STATUS = {403, 429, 500, 502, 503, 504}   # NVD answers 403 when the rate limit is hit
+MAX_DELTA_DAYS = 120         # longest lastModStartDate..lastModEndDate range the API accepts
+CHECKPOINT_NAME = "nvd_fetch_checkpoint.json"
+SYNC_STATE_NAME = "nvd_sync_state.json"
+PARTS_DIR = "fetch_parts"
+
+
+# ---------------- Request budget ----------------
+class RateBudget:
+    """Sliding-window limit: at most max_requests starts in any `window` seconds."""
+
+    def __init__(self, max_requests, window):
+        self.max_requests = max_requests
+        self.window = window
+        self._starts = deque()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._starts and now - self._starts[0] >= self.window:
+                    self._starts.popleft()
+                if len(self._starts) < self.max_requests:
+                    self._starts.append(now)
+                    return
+                await asyncio.sleep(self.window - (now - self._starts[0]))
+
+
+def parse_rate(value):
+    """'5/30' -> (5, 30.0): at most 5 requests per 30 seconds."""
+    requests, seconds = value.split("/")
+    return int(requests), float(seconds)
+
+
+# ---------------- HTTP ----------------
+def _get_json(url, headers, timeout):
+    with urlopen(Request(url, headers=headers), timeout=timeout) as resp:
+        return json_backend.load(resp)
+
+
+async def fetch_page(budget, base_url, params, headers, retries=5, timeout=60, backoff=2.0):
+    """GET one page, retrying rate-limit/server errors with exponential backoff."""
+    url = f"{base_url}?{urlencode(params)}"
+    loop = asyncio.get_running_loop()
+    for attempt in range(retries + 1):
+        await budget.acquire()
+        try:
+            return await loop.run_in_executor(None, _get_json, url, headers, timeout)
+        except HTTPError as e:
+            if e.code not in RETRY_STATUS or attempt == retries:
+                raise
+            reason = f"HTTP {e.code}"
+        except (URLError, TimeoutError, ConnectionError) as e:
+            if attempt == retries:
+                raise
+            reason = str(e)
+        delay = backoff * 2 ** attempt
+        print(f"⚠️ startIndex={params['startIndex']}: {reason}, retrying in {delay:.0f}s")
+        await asyncio.sleep(delay)
+
+
+# ---------------- Checkpoint ----------------
+def _write_json(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path, query, page_size):
+    """Resume state for this query, or a fresh one (stale parts are removed by the caller)."""
+    if path.exists():
+        state = json.loads(path.read_text())
+        if state.get("query") == query and state.get("page_size") == page_size:
+            return state
+        print("⚠️ Checkpoint is for a different query — starting over.")
+    return {"query": query, "page_size": page_size, "total_results": None,
+            "next_start_index": 0, "done": [], "started_at": _now_iso()}
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000+00:00")
+
+
+# ---------------- Sync ----------------
+class NVDSync:
+    def __init__(self, processed_dir, base_url=NVD_API_URL, api_key=None, page_size=MAX_PAGE_SIZE,
+                 concurrency=2, rate=None, query=None, retries=5, layout="flat", **writer_opts):
+        self.processed_dir = Path(processed_dir)
+        self.base_url = base_url
+        self.headers = {"User-Agent": "cve-risk-analyzer"}
+        if api_key:
+            self.headers["apiKey"] = api_key
+        self.page_size = min(page_size, MAX_PAGE_SIZE)
+        self.concurrency = concurrency
+        self.rate = rate or (KEYED_RATE if api_key else PUBLIC_RATE)
+        self.query = dict(query or {})
+        self.retries = retries
+        self.layout = layout
+        self.writer_opts = writer_opts
+        self.parts_dir = self.processed_dir / PARTS_DIR
+        self.checkpoint_path = self.processed_dir / CHECKPOINT_NAME
+
+    def part_path(self, start):
+        return self.parts_dir / f"page-{start:08d}.parquet"
+
+    def pending(self):
+        total = self.state["total_results"]
+        done = set(self.state["done"])
+        return [s for s in range(0, total, self.page_size) if s not in done]
+
+    def _mark_done(self, start, total_results):
+        done = set(self.state["done"]) | {start}
+        # The result set can grow while we page; never shrink the known total
+        self.state["total_results"] = max(total_results, self.state["total_results"] or 0)
+        self.state["done"] = sorted(done)
+        next_start = 0
+        while next_start in done:
+            next_start += self.page_size
+        self.state["next_start_index"] = next_start
+        _write_json(self.checkpoint_path, self.state)
+
+    async def _fetch_and_store(self, start):
+        params = {**self.query, "startIndex": start, "resultsPerPage": self.page_size}
+        page = await fetch_page(self.budget, self.base_url, params, self.headers, self.retries)
+        items = page.get("vulnerabilities", [])
+        # Normalizing and writing is CPU work; keep the event loop free for the other requests
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, partial(write_part, items, "2.0", self.part_path(start),
+                                                 **self.writer_opts))
+        self._mark_done(start, page.get("totalResults", 0))
+        done = len(self.state["done"])
+        total = max(1, -(-self.state["total_results"] // self.page_size))
+        print(f"📥 startIndex={start:,}: {len(items):,} CVEs ({done}/{total} pages)")
+
+    async def _worker(self, queue):
+        while not queue.empty():
+            await self._fetch_and_store(queue.get_nowait())
+
+    async def fetch_all(self):
+        self.budget = RateBudget(*self.rate)
+        if self.state["total_results"] is None:
+            await self._fetch_and_store(0)     # learn totalResults
+        while True:
+            pending = self.pending()
+            if not pending:
+                return
+            queue = asyncio.Queue()
+            for start in pending:
+                queue.put_nowait(start)
+            workers = [asyncio.create_task(self._worker(queue))
+                       for _ in range(min(self.concurrency, len(pending)))]
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                for w in workers:
+                    w.cancel()
+
+    def run(self):
+        """Fetch every page (resuming from the checkpoint), then merge them into the dataset."""
+        self.processed_dir.mkdir(parents=True, exist_ok=True)
+        self.state = load_checkpoint(self.checkpoint_path, self.query, self.page_size)
+        if not self.state["done"]:
+            shutil.rmtree(self.parts_dir, ignore_errors=True)
+        else:
+            print(f"↩️ Resuming at startIndex={self.state['next_start_index']:,} "
+                  f"({len(self.state['done'])} pages already fetched)")
+        self.parts_dir.mkdir(parents=True, exist_ok=True)
+
+        print(f"🌐 {self.base_url} — {self.concurrency} in flight, "
+              f"budget {self.rate[0]} requests / {self.rate[1]:.0f}s")
+        try:
+            asyncio.run(self.fetch_all())
+        except KeyboardInterrupt:
+            print(f"\n🛑 Interrupted — {len(self.state['done'])} pages saved; run again to resume.")
+            raise
+
+        part_paths = [self.part_path(s) for s in self.state["done"]]
+        merge_parts(part_paths, self.processed_dir, self.layout, **self.writer_opts)
+        _write_json(self.processed_dir / SYNC_STATE_NAME,
+                    {"last_sync": self.state["started_at"], "base_url": self.base_url, "query": self.query})
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+        self.checkpoint_path.unlink(missing_ok=True)
+
+
+def delta_query(processed_dir):
+    """lastModStartDate/EndDate since the previous sync, or {} when a full sync is needed."""
+    state_path = Path(processed_dir) / SYNC_STATE_NAME
+    if not state_path.exists():
+        print("⚠️ No previous sync recorded — running a full sync.")
+        return {}
+    last_sync = datetime.fromisoformat(json.loads(state_path.read_text())["last_sync"])
+    if datetime.now(timezone.utc) - last_sync > timedelta(days=MAX_DELTA_DAYS):
+        print(f"⚠️ Last sync is older than {MAX_DELTA_DAYS} days — running a full sync.")
+        return {}
+    start = last_sync.strftime("%Y-%m-%dT%H:%M:%S.000+00:00")
+
+    # An interrupted delta sync keeps its original end date so the checkpoint still applies
+    checkpoint_path = Path(processed_dir) / CHECKPOINT_NAME
+    if checkpoint_path.exists():
+        query = json.loads(checkpoint_path.read_text()).get("query", {})
+        if query.get("lastModStartDate") == start:
+            return query
+    return {"lastModStartDate": start, "lastModEndDate": _now_iso()}
+
+
+# ---------------- Entry point ----------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync CVEs from the NVD CVE API 2.0 into data/processed.")
+    parser.add_argument("--base-url", default=NVD_API_URL)
+    parser.add_argument("--api-key", default=os.environ.get("NVD_API_KEY"),
+                        help="NVD API key (default: $NVD_API_KEY); raises the request budget")
+    parser.add_argument("--page-size", type=int, default=MAX_PAGE_SIZE, help="resultsPerPage (max 2000)")
+    parser.add_argument("--concurrency", type=int, default=2, help="requests in flight")
+    parser.add_argument("--rate", type=parse_rate, help="request budget as N/SECONDS (default 5/30, or 50/30 with an API key)")
+    parser.add_argument("--retries", type=int, default=5)
+    parser.add_argument("--since-last-sync", action="store_true",
+                        help="only fetch CVEs modified since the previous successful sync")
+    parser.add_argument("--layout", default="flat", choices=LAYOUTS)
+    parser.add_argument("--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE)
+    parser.add_argument("--compression", default=DEFAULT_COMPRESSION,
+                        choices=["snappy", "zstd", "gzip", "brotli", "lz4", "none"])
+    args = parser.parse_args()
+
+    processed_dir = processed_dir_for(Path(__file__).resolve().parents[1])
+    sync = NVDSync(processed_dir, base_url=args.base_url, api_key=args.api_key, page_size=args.page_size,
+                   concurrency=args.concurrency, rate=args.rate,
+                   query=delta_query(processed_dir) if args.since_last_sync else None,
+                   retries=args.retries, layout=args.layout,
+                   row_group_size=args.row_group_size, compression=args.compression)
+    try:
+        sync.run()
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -617,43 +617,95 @@
 
 
 
+import argparse
 import json
-import gzip
+import hashlib
+import os
+import shutil
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 from tqdm import tqdm
 
-# ---------------- Utility: Safe open for .gz or .json ----------------
-def safe_open(gzpath):
-    if str(gzpath).endswith(".gz"):
-        return gzip.open(gzpath, "rt", encoding="utf-8")
-    return open(gzpath, "r", encoding="utf-8")
+from src import json_backend
+from src.compressed_io import open_feed
+from src.cpe_index import INDEX_DIR, CpeIndexWriter
+from src.cpe_parse import parse_cpe, split_cpe_column
+from src.cve_store import (CPE_ATTR_COLUMNS, CPE_KEY_COLUMNS, MATCH_COLUMNS, NORMALIZED_DIR, ROW_SCHEMA,
+                           CpeCatalog, NormalizedTablesWriter, conform_to_schema, has_dataset, iter_flat_batches)
+from src.result_cache import prune_cache
+
+# Top-level keys of the two supported feed layouts. NVD 2.0 feeds start with
+# resultsPerPage/startIndex/..., legacy 1.1 feeds with CVE_data_type/...
+FEED_2_0_KEYS = {"resultsPerPage", "startIndex", "totalResults", "format",
+                 "version", "timestamp", "vulnerabilities"}
+ITEM_PREFIXES = {"2.0": "vulnerabilities.item", "1.1": "CVE_Items.item"}
+
+# Rows per Parquet row group / CSV chunk; bounds ingest memory
+DEFAULT_ROW_GROUP_SIZE = 100_000
+DEFAULT_COMPRESSION = "snappy"
+LAYOUTS = ["flat", "normalized", "both"]
+
+# normalize_item() rows carry the raw CPE URI; rows_to_table() splits it into the cpe_* columns
+RAW_ROW_SCHEMA = pa.schema([pa.field("cpe_uri", pa.string())] +
+                           [f for f in ROW_SCHEMA if f.name not in CPE_KEY_COLUMNS + CPE_ATTR_COLUMNS])
+
+# Manifest of what is already in the processed dataset, used by --incremental.
+# Rejected CVEs stay in it as tombstones so older copies are not re-added.
+REJECTED = "REJECTED"
+MANIFEST_SCHEMA = pa.schema([
+    ("cve_id", pa.string()),
+    ("last_modified", pa.string()),
+    ("content_hash", pa.string()),
+])
+
+# ---------------- Utility: Safe open for plain or compressed feeds ----------------
+def safe_open(gzpath, mode="rt"):
+    # .gz/.bz2/.xz/.zst are decompressed in a reader thread, overlapping with parsing
+    return open_feed(gzpath, mode)
 
 # ---------------- Parse CPE URI into components ----------------
 def parse_cpe_components(cpe_uri):
     # Example: cpe:2.3:a:microsoft:edge:124.0.1:*:*:*:*:*:*:*
-    try:
-        parts = cpe_uri.split(":")
-        vendor = parts[3] if len(parts) > 3 else ""
-        product = parts[4] if len(parts) > 4 else ""
-        version = parts[5] if len(parts) > 5 else ""
-        return vendor, product, version
-    except Exception:
-        return "", "", ""
+    # Escape-aware (\\:); ingestion itself parses whole batches in rows_to_table()
+    attrs = parse_cpe(cpe_uri)
+    return attrs["vendor"], attrs["product"], attrs["version"]
 
 # ---------------- Detect feed version ----------------
 def detect_feed_type(json_path):
-    with safe_open(json_path) as fh:
-        data = json.load(fh)
-    if "vulnerabilities" in data:
-        return "2.0"
-    elif "CVE_Items" in data:
-        return "1.1"
-    else:
-        return "unknown"
+    """Detect the feed layout from its top-level keys without parsing the items."""
+    with safe_open(json_path, "rb") as fh:
+        for key in json_backend.iter_top_level_keys(fh):
+            if key in FEED_2_0_KEYS:
+                return "2.0"
+            if key.startswith("CVE_"):
+                return "1.1"
+    return "unknown"
 
 # ---------------- Iterate through items ----------------
-def iterate_items(json_path, feed_type):
+def iterate_items(json_path, feed_type="auto", backend="auto"):
+    """Yield CVE items one at a time.
+
+    With the (default) ijson backend items are streamed and memory stays flat
+    regardless of feed size; orjson/json load the document once.
+    """
+    if feed_type not in ITEM_PREFIXES:
+        feed_type = detect_feed_type(json_path)
+    if feed_type not in ITEM_PREFIXES:
+        print(f"⚠️ Unknown feed structure in {json_path}")
+        return
+
+    with safe_open(json_path, "rb") as fh:
+        items = json_backend.iter_items(fh, ITEM_PREFIXES[feed_type], backend)
+        for item in tqdm(items, desc=Path(json_path).name):
+            yield item
+
+# ---------------- Legacy whole-document reader (kept for benchmarks) ----------------
+def iterate_items_json_load(json_path, feed_type="auto"):
     with safe_open(json_path) as fh:
         data = json.load(fh)
 
@@ -665,9 +717,19 @@ def iterate_items(json_path, feed_type):
         print(f"⚠️ Unknown feed structure in {json_path}")
         return
 
-    for item in tqdm(items, desc=json_path.name):
+    for item in tqdm(items, desc=Path(json_path).name):
         yield item
 
+# ---------------- CPE match with version range ----------------
+NO_MATCH_RANGE = dict.fromkeys(MATCH_COLUMNS)
+
+def cpe_match_key(match, uri_field):
+    # Same field names in 2.0 cpeMatch and 1.1 cpe_match entries
+    return (match[uri_field],
+            match.get("versionStartIncluding"), match.get("versionStartExcluding"),
+            match.get("versionEndIncluding"), match.get("versionEndExcluding"),
+            match.get("vulnerable"))
+
 # ---------------- Normalize single CVE entry ----------------
 def normalize_item(item, feed_type="auto"):
     # --- NVD 2.0 feeds ---
@@ -696,28 +758,25 @@ def normalize_item(item, feed_type="auto"):
         pub_date = cve.get("published")
         mod_date = cve.get("lastModified")
 
-        # Collect CPEs
-        cpe_uris = set()
+        # Collect CPEs (with their version range and vulnerable flag)
+        cpe_uris = {}  # dict keeps first-seen order, so output is reproducible across processes
         for cfg in cve.get("configurations", []):
             for node in cfg.get("nodes", []):
                 for m in node.get("cpeMatch", []):
-                    uri = m.get("criteria")
-                    if uri:
-                        cpe_uris.add(uri)
+                    if m.get("criteria"):
+                        cpe_uris[cpe_match_key(m, "criteria")] = None
                 for child in node.get("children", []):
                     for m in child.get("cpeMatch", []):
-                        uri = m.get("criteria")
-                        if uri:
-                            cpe_uris.add(uri)
+                        if m.get("criteria"):
+                            cpe_uris[cpe_match_key(m, "criteria")] = None
 
         rows = []
         if not cpe_uris:
             rows.append({
                 "cve_id": cve_id,
                 "description": desc,
-                "cpe_vendor": "",
-                "cpe_product": "",
-                "cpe_version": "",
+                "cpe_uri": "",
+                **NO_MATCH_RANGE,
                 "cvss_version": cvss_ver,
                 "cvss_base_score": base_score,
                 "cvss_vector": vector,
@@ -725,14 +784,12 @@ def normalize_item(item, feed_type="auto"):
                 "last_modified": mod_date
             })
         else:
-            for uri in cpe_uris:
-                v, p, ver = parse_cpe_components(uri)
+            for uri, *match_range in cpe_uris:
                 rows.append({
                     "cve_id": cve_id,
                     "description": desc,
-                    "cpe_vendor": v,
-                    "cpe_product": p,
-                    "cpe_version": ver,
+                    "cpe_uri": uri,
+                    **dict(zip(MATCH_COLUMNS, match_range)),
                     "cvss_version": cvss_ver,
                     "cvss_base_score": base_score,
                     "cvss_vector": vector,
@@ -762,27 +819,23 @@ def normalize_item(item, feed_type="auto"):
     pub_date = item.get("publishedDate")
     mod_date = item.get("lastModifiedDate")
 
-    cpe_uris = set()
+    cpe_uris = {}  # dict keeps first-seen order, so output is reproducible across processes
     for n in item.get("configurations", {}).get("nodes", []):
         for m in n.get("cpe_match", []):
-            uri = m.get("cpe23Uri")
-            if uri:
-                cpe_uris.add(uri)
+            if m.get("cpe23Uri"):
+                cpe_uris[cpe_match_key(m, "cpe23Uri")] = None
         for child in n.get("children", []):
             for m in child.get("cpe_match", []):
-                uri = m.get("cpe23Uri")
-                if uri:
-                    cpe_uris.add(uri)
+                if m.get("cpe23Uri"):
+                    cpe_uris[cpe_match_key(m, "cpe23Uri")] = None
 
     rows = []
-    for uri in cpe_uris:
-        v, p, ver = parse_cpe_components(uri)
+    for uri, *match_range in cpe_uris:
         rows.append({
             "cve_id": cve_id,
             "description": desc,
-            "cpe_vendor": v,
-            "cpe_product": p,
-            "cpe_version": ver,
+            "cpe_uri": uri,
+            **dict(zip(MATCH_COLUMNS, match_range)),
             "cvss_version": cvss_ver,
             "cvss_base_score": base_score,
             "cvss_vector": vector,
@@ -791,45 +844,416 @@ def normalize_item(item, feed_type="auto"):
         })
     return rows
 
-# ---------------- Main ingest function ----------------
-def ingest_all():
-    base_dir = Path(__file__).resolve().parents[1]
-    raw_dir = base_dir / "data" / "raw"
-    processed_dir = base_dir / "data" / "processed"
-    processed_dir.mkdir(parents=True, exist_ok=True)
-
-    all_rows = []
-
-    for gzpath in raw_dir.glob("nvdcve-*.json*"):
-        print(f"Processing {gzpath.name}")
+# ---------------- CVE identity for the manifest ----------------
+def item_identity(item):
+    """Return (cve_id, last_modified, rejected) for a 2.0 or 1.1 item."""
+    cve = item.get("cve", {})
+    if "id" in cve:
+        return cve.get("id", ""), cve.get("lastModified"), cve.get("vulnStatus") == "Rejected"
+    cve_id = cve.get("CVE_data_meta", {}).get("ID", "")
+    descs = cve.get("description", {}).get("description_data", [])
+    rejected = any(d.get("value", "").startswith("** REJECT **") for d in descs)
+    return cve_id, item.get("lastModifiedDate"), rejected
+
+def content_hash(item):
+    # lastModified is tracked separately; leave it out so a touched-but-unchanged
+    # CVE hashes the same as before
+    if "lastModifiedDate" in item:
+        item = {k: v for k, v in item.items() if k != "lastModifiedDate"}
+    elif "lastModified" in item.get("cve", {}):
+        item = {**item, "cve": {k: v for k, v in item["cve"].items() if k != "lastModified"}}
+    payload = json.dumps(item, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+def load_manifest(manifest_path):
+    if not manifest_path.exists():
+        return None
+    table = pq.read_table(manifest_path).to_pydict()
+    return dict(zip(table["cve_id"], zip(table["last_modified"], table["content_hash"])))
+
+def write_manifest(manifest, manifest_path):
+    table = pa.Table.from_pydict({
+        "cve_id": list(manifest),
+        "last_modified": [v[0] for v in manifest.values()],
+        "content_hash": [v[1] for v in manifest.values()],
+    }, schema=MANIFEST_SCHEMA)
+    pq.write_table(table, manifest_path)
+
+# ---------------- Normalize a whole feed ----------------
+def normalize_feed(json_path, manifest=None, backend="auto"):
+    """Yield normalized rows for every non-rejected CVE in a feed.
+
+    When a manifest dict is passed it is filled with cve_id -> (last_modified, hash).
+    """
+    ftype = detect_feed_type(json_path)
+    yield from normalize_items(iterate_items(json_path, ftype, backend), ftype, manifest)
+
+def normalize_items(items, ftype="2.0", manifest=None):
+    """normalize_feed() for items from any source (a feed file, an API page, ...)."""
+    for item in items:
+        try:
+            cve_id, mod_date, rejected = item_identity(item)
+            if rejected:
+                if manifest is not None:
+                    manifest[cve_id] = (mod_date, REJECTED)
+                continue
+            rows = normalize_item(item, ftype)
+            if manifest is not None:
+                manifest[cve_id] = (mod_date, content_hash(item))
+            if rows:
+                yield from rows
+        except Exception as e:
+            print(f"⚠️ Skipping item due to error: {e}")
+
+def rows_to_table(rows):
+    """Build a ROW_SCHEMA table from normalize_item() rows, splitting all CPE URIs in one vectorized pass."""
+    raw = pa.Table.from_pylist(rows, schema=RAW_ROW_SCHEMA)
+    attrs = split_cpe_column(raw["cpe_uri"], ["part", "vendor", "product", "version", "target_sw"])
+    columns = {name: raw[name] for name in RAW_ROW_SCHEMA.names if name != "cpe_uri"}
+    columns.update({f"cpe_{name}": attrs[name] for name in attrs.column_names})
+    return pa.table(columns).select(ROW_SCHEMA.names).cast(ROW_SCHEMA)
+
+def drop_cves(table, cve_ids):
+    if not cve_ids:
+        return table
+    keep = pc.invert(pc.is_in(table["cve_id"], value_set=pa.array(sorted(cve_ids), pa.string())))
+    return table.filter(keep)
+
+# ---------------- Chunked output writer ----------------
+class ChunkedRowWriter:
+    """Stream normalized rows into Parquet row groups (and optionally CSV) in fixed-size batches.
+
+    Peak memory is set by row_group_size, not by the size of the dataset.
+    Files are written under a .tmp name and moved into place on close.
+    With normalized_dir set, the cves / cve_cpe / cpes tables are written too.
+    unique_csv gets the CPE catalog (CVE count, max CVSS, first/last published per CPE).
+    index_dir gets the memory-mapped CPE -> CVE index (src/cpe_index.py).
+    """
+
+    def __init__(self, parquet_path=None, csv_path=None, unique_csv=None, normalized_dir=None,
+                 row_group_size=DEFAULT_ROW_GROUP_SIZE, compression=DEFAULT_COMPRESSION, index_dir=None):
+        self.parquet_path, self.csv_path, self.unique_csv = (
+            Path(p) if p else None for p in (parquet_path, csv_path, unique_csv))
+        self.row_group_size = row_group_size
+        self.total = 0
+        self._rows = []
+        self._catalog = CpeCatalog() if self.unique_csv else None
+        compression = None if compression == "none" else compression
+        self._parquet = pq.ParquetWriter(self._tmp(self.parquet_path), ROW_SCHEMA,
+                                         compression=compression) if self.parquet_path else None
+        self._csv = open(self._tmp(self.csv_path), "w", encoding="utf-8", newline="") if self.csv_path else None
+        self._normalized = NormalizedTablesWriter(normalized_dir, row_group_size,
+                                                  compression) if normalized_dir else None
+        self._index = CpeIndexWriter(index_dir) if index_dir else None
+
+    @staticmethod
+    def _tmp(path):
+        return path.with_name(path.name + ".tmp")
+
+    def _renames(self):
+        renames = {self._tmp(p): p for p in (self.parquet_path, self.csv_path, self.unique_csv) if p}
+        if self._normalized:
+            renames.update(self._normalized.tmp_paths())
+        return renames
+
+    def output_paths(self):
+        return list(self._renames().values()) + ([self._index.index_dir] if self._index else [])
+
+    def write_rows(self, rows):
+        for row in rows:
+            self._rows.append(row)
+            if len(self._rows) >= self.row_group_size:
+                self.flush()
+
+    def write_table(self, table):
+        self.flush()
+        for batch in table.to_batches(max_chunksize=self.row_group_size):
+            self._write_batch(pa.Table.from_batches([batch], schema=ROW_SCHEMA))
+
+    def flush(self):
+        if self._rows:
+            table = rows_to_table(self._rows)
+            self._rows = []
+            self._write_batch(table)
+
+    def _write_batch(self, table):
+        if table.num_rows == 0:
+            return
+        if self._parquet:
+            self._parquet.write_table(table, row_group_size=self.row_group_size)
+        if self._csv:
+            table.to_pandas().to_csv(self._csv, index=False, header=(self.total == 0))
+        if self._normalized:
+            self._normalized.write(table)
+        if self._catalog is not None:
+            self._catalog.update(table)
+        if self._index:
+            self._index.write(table)
+        self.total += table.num_rows
+
+    def close(self):
+        self.flush()
+        if self._parquet:
+            self._parquet.close()
+        if self._csv:
+            if self.total == 0:
+                rows_to_table([]).to_pandas().to_csv(self._csv, index=False)
+            self._csv.close()
+        if self._normalized:
+            self._normalized.close()
+        if self._catalog is not None:
+            self._catalog.to_frame().to_csv(self._tmp(self.unique_csv), index=False)
+        for tmp, path in self._renames().items():
+            os.replace(tmp, path)
+        if self._index:
+            self._index.close()
+
+    def abort(self):
+        if self._parquet:
+            self._parquet.close()
+        if self._csv:
+            self._csv.close()
+        if self._normalized:
+            self._normalized.abort()
+        if self._index:
+            self._index.abort()
+        for tmp in self._renames():
+            tmp.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+def open_dataset_writer(processed_dir, layout="flat", **writer_opts):
+    flat = layout in ("flat", "both")
+    return ChunkedRowWriter(processed_dir / "cve_cpe.parquet" if flat else None,
+                            processed_dir / "cve_cpe.csv" if flat else None,
+                            processed_dir / "unique_cpes.csv",
+                            normalized_dir=processed_dir / NORMALIZED_DIR if layout != "flat" else None,
+                            index_dir=processed_dir / INDEX_DIR, **writer_opts)
+
+def remove_stale_layout(processed_dir, layout):
+    # The dataset readers prefer the normalized layout, so never leave a stale one behind
+    if layout == "flat":
+        shutil.rmtree(processed_dir / NORMALIZED_DIR, ignore_errors=True)
+    elif layout == "normalized":
+        for name in ("cve_cpe.parquet", "cve_cpe.csv"):
+            (processed_dir / name).unlink(missing_ok=True)
+
+def copy_dataset(processed_dir, writer, exclude=()):
+    for table in iter_flat_batches(processed_dir, writer.row_group_size):
+        writer.write_table(drop_cves(table, exclude))
+
+def print_outputs(writer):
+    print("\n✅ Wrote:")
+    for path in writer.output_paths():
+        print(path)
+
+def finish_outputs(writer, processed_dir):
+    print_outputs(writer)
+    # Cached lookups were answered from the previous dataset
+    pruned = prune_cache(processed_dir)
+    if pruned:
+        print(f"🧹 Dropped {pruned:,} cached lookups of the previous dataset")
+
+# ---------------- Parallel worker: one feed -> one part file ----------------
+def ingest_feed_part(json_path, part_path, backend="auto", **writer_opts):
+    print(f"Processing {Path(json_path).name}")
+    ftype = detect_feed_type(json_path)
+    return write_part(iterate_items(json_path, ftype, backend), ftype, part_path, **writer_opts)
+
+def write_part(items, ftype, part_path, **writer_opts):
+    """Normalize items into one part file plus its manifest (the unit a resumed run can reuse)."""
+    manifest = {}
+    with ChunkedRowWriter(part_path, **writer_opts) as writer:
+        writer.write_rows(normalize_items(items, ftype, manifest))
+    write_manifest(manifest, part_path.with_suffix(".manifest.parquet"))
+    return part_path
+
+def copy_part_rows(part_paths, writer, keep):
+    """Copy rows of each part, keeping only CVEs that part owns (keep: part path -> cve_id set)."""
+    for part_path in part_paths:
+        wanted = pa.array(sorted(keep.get(part_path, ())), pa.string())
+        for batch in pq.ParquetFile(part_path).iter_batches(batch_size=writer.row_group_size):
+            table = conform_to_schema(pa.Table.from_batches([batch]))
+            writer.write_table(table.filter(pc.is_in(table["cve_id"], value_set=wanted)))
+
+def merge_parts(part_paths, processed_dir, layout="flat", full=False, **writer_opts):
+    """Merge normalized part files into the dataset: upsert when one exists, otherwise (or
+    with full=True) write it from the parts alone.
+
+    A CVE found in several parts is taken from its newest copy (the earlier part
+    on a lastModified tie); against an existing dataset the same lastModified /
+    content-hash rules as ingest_incremental() apply.
+    """
+    manifest_path = processed_dir / "cve_manifest.parquet"
+    manifest = None if full else load_manifest(manifest_path)
+    if manifest is None or not has_dataset(processed_dir):
+        manifest = {}
+        full = True
+    else:
+        full = False
+
+    owner, removed = {}, set()
+    for part_path in part_paths:
+        for cve_id, (mod_date, digest) in load_manifest(part_path.with_suffix(".manifest.parquet")).items():
+            known = manifest.get(cve_id)
+            if known is not None and (mod_date or "") <= (known[0] or ""):
+                continue
+            manifest[cve_id] = (mod_date, digest)
+            owner.pop(cve_id, None)
+            if digest == REJECTED:
+                if known is not None and known[1] != REJECTED:
+                    removed.add(cve_id)
+                continue
+            if known is not None and known[1] == digest:
+                continue
+            owner[cve_id] = part_path
+            removed.add(cve_id)
+
+    if not full and not removed:
+        print("\n✅ Dataset already up to date.")
+        return None
+
+    keep = {}
+    for cve_id, part_path in owner.items():
+        keep.setdefault(part_path, set()).add(cve_id)
+    with open_dataset_writer(processed_dir, layout, **writer_opts) as writer:
+        if not full:
+            copy_dataset(processed_dir, writer, exclude=removed)
+        copy_part_rows(part_paths, writer, keep)
+    remove_stale_layout(processed_dir, layout)
+
+    if full:
+        print(f"\n✅ Total CVE entries: {writer.total:,}")
+    else:
+        print(f"\n✅ Upserted {len(owner):,} CVEs, removed {len(removed.difference(owner)):,}; "
+              f"total CVE entries: {writer.total:,}")
+    finish_outputs(writer, processed_dir)
+    write_manifest(manifest, manifest_path)
+    return writer
+
+def find_feeds(raw_dir):
+    # Sorted so the serial and parallel paths emit rows in the same order
+    return sorted(raw_dir.glob("nvdcve-*.json*"))
+
+# ---------------- Incremental (delta) ingest ----------------
+def ingest_incremental(feeds, processed_dir, layout="flat", backend="auto", **writer_opts):
+    """Re-normalize only new or changed CVEs and upsert them into cve_cpe.parquet.
+
+    A CVE is skipped when its lastModified is not newer than the manifest, or
+    when it changed but its content hash did not. Rejected CVEs are removed.
+    Returns False when there is no previous dataset to update.
+    """
+    manifest_path = processed_dir / "cve_manifest.parquet"
+    manifest = load_manifest(manifest_path)
+    if manifest is None or not has_dataset(processed_dir):
+        return False
+
+    changed = {}      # cve_id -> rows, later feeds win
+    removed = set()   # cve_ids whose old rows must be dropped
+    for gzpath in feeds:
+        print(f"Checking {gzpath.name}")
         ftype = detect_feed_type(gzpath)
-        for item in iterate_items(gzpath, ftype):
+        for item in iterate_items(gzpath, ftype, backend):
             try:
-                rows = normalize_item(item, ftype)
-                if rows:
-                    all_rows.extend(rows)
+                cve_id, mod_date, rejected = item_identity(item)
+                known = manifest.get(cve_id)
+                # Same or older copy (yearly feeds overlap with the modified feed)
+                if known is not None and (mod_date or "") <= (known[0] or ""):
+                    continue
+                if rejected:
+                    changed.pop(cve_id, None)
+                    if known is None or known[1] != REJECTED:
+                        removed.add(cve_id)
+                    manifest[cve_id] = (mod_date, REJECTED)
+                    continue
+                digest = content_hash(item)
+                manifest[cve_id] = (mod_date, digest)
+                if known is not None and known[1] == digest:
+                    continue
+                changed[cve_id] = normalize_item(item, ftype)
+                removed.add(cve_id)
             except Exception as e:
                 print(f"⚠️ Skipping item due to error: {e}")
 
-    # Build DataFrame
-    df = pd.DataFrame(all_rows)
-    print(f"\n✅ Total CVE entries: {len(df):,}")
+    if not removed:
+        print("\n✅ Dataset already up to date.")
+        return True
 
-    # Save Parquet
-    parquet_path = processed_dir / "cve_cpe.parquet"
-    df.to_parquet(parquet_path, index=False)
+    with open_dataset_writer(processed_dir, layout, **writer_opts) as writer:
+        copy_dataset(processed_dir, writer, exclude=removed)
+        writer.write_rows(row for rows in changed.values() for row in rows)
+    remove_stale_layout(processed_dir, layout)
 
-    # Save CSV
-    csv_path = processed_dir / "cve_cpe.csv"
-    df.to_csv(csv_path, index=False, encoding="utf-8")
+    deleted = removed.difference(changed)
+    print(f"\n✅ Upserted {len(changed):,} CVEs, removed {len(deleted):,}; "
+          f"total CVE entries: {writer.total:,}")
+    finish_outputs(writer, processed_dir)
+    write_manifest(manifest, manifest_path)
+    return True
 
-    # Save unique CPEs
-    unique_cpes = df[["cpe_vendor", "cpe_product", "cpe_version"]].drop_duplicates()
-    unique_csv = processed_dir / "unique_cpes.csv"
-    unique_cpes.to_csv(unique_csv, index=False)
+# ---------------- Main ingest function ----------------
+def ingest_all(workers=1, incremental=False, row_group_size=DEFAULT_ROW_GROUP_SIZE,
+               compression=DEFAULT_COMPRESSION, layout="flat", backend="auto", raw_dir=None, processed_dir=None):
+    base_dir = Path(__file__).resolve().parents[1]
+    raw_dir = Path(raw_dir) if raw_dir else base_dir / "data" / "raw"
+    processed_dir = Path(processed_dir) if processed_dir else base_dir / "data" / "processed"
+    processed_dir.mkdir(parents=True, exist_ok=True)
 
-    print(f"\n✅ Wrote:\n{parquet_path}\n{csv_path}\n{unique_csv}")
+    writer_opts = {"row_group_size": row_group_size, "compression": compression}
+    feeds = find_feeds(raw_dir)
+    print(f"🔧 JSON backend: {json_backend.describe(backend)}")
+
+    if incremental:
+        if ingest_incremental(feeds, processed_dir, layout, backend, **writer_opts):
+            return
+        print("⚠️ No previous dataset/manifest found — running a full ingest.")
+
+    # Every feed becomes a part file, serially or in a process pool; merge_parts() then keeps
+    # the newest copy of each CVE (yearly feeds overlap with the modified feed), the same
+    # dataset an incremental ingest of those feeds ends with
+    part_dir = processed_dir / "parts"
+    shutil.rmtree(part_dir, ignore_errors=True)
+    part_dir.mkdir(parents=True)
+    part_files = [part_dir / f"part-{i:05d}.parquet" for i in range(len(feeds))]
+    ingest_part = partial(ingest_feed_part, backend=backend, **writer_opts)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            part_paths = list(pool.map(ingest_part, feeds, part_files))
+    else:
+        part_paths = list(map(ingest_part, feeds, part_files))
+    try:
+        merge_parts(part_paths, processed_dir, layout, full=True, **writer_opts)
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
 
 # ---------------- Entry point ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Normalize NVD feeds in data/raw into CVE x CPE tables.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="normalize feeds in N worker processes (one part file per feed)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only re-normalize new/changed CVEs and upsert them into the existing dataset")
+    parser.add_argument("--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE,
+                        help="rows per Parquet row group / CSV chunk (bounds peak memory)")
+    parser.add_argument("--compression", default=DEFAULT_COMPRESSION,
+                        choices=["snappy", "zstd", "gzip", "brotli", "lz4", "none"],
+                        help="Parquet compression codec")
+    parser.add_argument("--layout", default="flat", choices=LAYOUTS,
+                        help="flat cve_cpe table, normalized cves/cve_cpe/cpes tables, or both")
+    parser.add_argument("--json-backend", default="auto", choices=json_backend.BACKENDS,
+                        help="feed decoder: auto streams with ijson when installed (flat memory), else orjson > json")
+    args = parser.parse_args(argv)
+    ingest_all(workers=args.workers, incremental=args.incremental,
+               row_group_size=args.row_group_size, compression=args.compression,
+               layout=args.layout, backend=args.json_backend)
+
+
 if __name__ == "__main__":
-    ingest_all()
+    main()
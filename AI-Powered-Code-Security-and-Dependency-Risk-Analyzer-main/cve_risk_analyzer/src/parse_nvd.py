@@ -1,8 +1,11 @@
-import json, pandas as pd, os
+import pandas as pd, os
 
-def parse_nvd_feed(json_file, output="data/processed/nvd_processed.csv"):
-    with open(json_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+from src import json_backend
+
+def parse_nvd_feed(json_file, output="data/processed/nvd_processed.csv", backend="auto"):
+    # backend: "auto", "orjson" or "json" (see src/json_backend.py)
+    with open(json_file, "rb") as f:
+        data = json_backend.load(f, backend)
 
     records = []
     for item in data.get("vulnerabilities", []):
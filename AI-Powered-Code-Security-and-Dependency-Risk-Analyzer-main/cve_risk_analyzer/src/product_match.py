@@ -0,0 +1,133 @@
+# src/product_match.py
+"""
+Matching many package names against CPE product names at once
+--------------------------------------------------------------
+Three modes, all run over the distinct product names (never over CVE rows):
+
+    contains  a product matches every package name it contains, found with
+              one Aho-Corasick automaton over all package names: a single
+              pass over the products, however many packages are requested.
+              Names are literal strings (no regex surprises from "c++"),
+              normalized as for exact, so the canonical requirement name
+              "typing-extensions" is found in "typing_extensions".
+    exact     normalized equality through a dict: lowercase, with runs of
+              "-", "_" and "." treated as one separator, so the PyPI name
+              "job-recruitment" finds the CPE product "job_recruitment".
+    regex     the old behaviour: each package name is a case-insensitive
+              regular expression searched in every product.
+
+match_products() returns package -> matched products, in product order.
+A ProductMatcher does the per-product work (normalizing every name) once,
+for callers that match against the same products again and again (the CPE
+index memoizes one; the scan service builds it before its first request).
+"""
+
+import re
+from collections import deque
+
+MATCH_MODES = ["contains", "exact", "regex"]
+
+_SEPARATORS = re.compile(r"[-_.]+")
+
+
+def normalize_name(name):
+    return _SEPARATORS.sub("-", str(name).strip().lower())
+
+
+class AhoCorasick:
+    """Automaton over a fixed set of patterns; search() reports every pattern occurring in a text."""
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._goto = [{}]          # node -> {char: node}
+        self._fail = [0]
+        self._out = [()]           # node -> pattern ids ending here (including via fail links)
+        for pid, pattern in enumerate(self.patterns):
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] += (pid,)
+
+        # Breadth-first, so a node's fail target is finished before the node itself
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] += self._out[self._fail[child]]
+
+    def search(self, text):
+        """Set of ids of the patterns that occur in text."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+class ProductMatcher:
+    """Fixed product list, normalized once; match() answers match_products() for it."""
+
+    def __init__(self, products):
+        self.products = list(products)
+        self._names = {}           # normalized name -> positions of the products with that name
+        for i, product in enumerate(self.products):
+            self._names.setdefault(normalize_name(product), []).append(i)
+
+    def __len__(self):
+        return len(self.products)
+
+    def match(self, packages, mode="contains"):
+        """For each distinct package name, the products (in product order) it matches."""
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode '{mode}' (expected one of {', '.join(MATCH_MODES)})")
+        packages = list(dict.fromkeys(packages))
+        products = self.products
+
+        if mode == "exact":
+            return {pkg: [products[i] for i in self._names.get(normalize_name(pkg), [])] for pkg in packages}
+
+        if mode == "regex":
+            matched = {}
+            for pkg in packages:
+                try:
+                    pattern = re.compile(pkg, re.IGNORECASE)
+                except re.error as e:
+                    raise ValueError(f"Package name '{pkg}' is not a valid regular expression: {e}") from None
+                matched[pkg] = [p for p in products if pattern.search(p)]
+            return matched
+
+        # An empty name is contained in everything; the automaton cannot represent it
+        literal = [pkg for pkg in packages if normalize_name(pkg)]
+        automaton = AhoCorasick([normalize_name(pkg) for pkg in literal])
+        hits = [[] for _ in literal]
+        for name, positions in self._names.items():
+            for pid in automaton.search(name):
+                hits[pid].extend(positions)
+        matched = {pkg: [products[i] for i in sorted(positions)] for pkg, positions in zip(literal, hits)}
+        return {pkg: matched[pkg] if pkg in matched else list(products) for pkg in packages}
+
+
+def match_products(packages, products, mode="contains"):
+    """For each distinct package name, the products (in the given order) it matches.
+
+    products may be a ProductMatcher, to reuse its normalized names.
+    """
+    matcher = products if isinstance(products, ProductMatcher) else ProductMatcher(products)
+    return matcher.match(packages, mode)
@@ -0,0 +1,155 @@
+# src/report_writers.py
+"""
+Incremental report writers
+--------------------------
+Scanners yield their matches as they go (dependency_mapper.iter_matches,
+analyzer.iter_matches); these writers append them to the report in batches,
+so a scan with millions of matches never holds the whole report in memory
+and the first rows are on disk within a second.
+
+    csv      header first, then rows; byte-for-byte what DataFrame.to_csv
+             writes for the same rows
+    jsonl    one JSON object per line (NaN -> null), also .ndjson
+    parquet  one row group per batch; readable once the writer is closed
+
+The format comes from the file extension unless given. Rows are buffered
+and flushed every batch_size rows or flush_seconds, whichever comes first.
+Columns are fixed up front: missing ones are written empty, extra ones are
+dropped, and Parquet numeric score columns are float64, everything else a
+string.
+"""
+
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+REPORT_FORMATS = ["csv", "jsonl", "parquet"]
+EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+FLOAT_COLUMNS = {"cvss_base_score", "cvss_score", "score", "match_score"}
+
+
+def detect_format(path):
+    fmt = EXTENSIONS.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Cannot tell the report format of {path} "
+                         f"(expected one of {', '.join(EXTENSIONS)}, or pass fmt)")
+    return fmt
+
+
+class ReportWriter:
+    """Buffers records / frames and appends them to path in batches; use as a context manager."""
+
+    def __init__(self, path, columns, batch_size=10000, flush_seconds=1.0):
+        self.path = Path(path)
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.rows_written = 0
+        self._frames, self._records, self._pending = [], [], 0
+        self._last_flush = time.monotonic()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, record):
+        """Add one row (a dict keyed by column)."""
+        self._records.append(record)
+        self._added(1)
+
+    def write_frame(self, frame):
+        """Add the rows of a DataFrame."""
+        if len(frame):
+            self._take_records()
+            self._frames.append(frame)
+            self._added(len(frame))
+
+    def _added(self, n):
+        self._pending += n
+        if self._pending >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def _take_records(self):
+        # Keep records and frames in arrival order
+        if self._records:
+            self._frames.append(pd.DataFrame(self._records))
+            self._records = []
+
+    def flush(self):
+        self._take_records()
+        if self._frames:
+            batch = pd.concat(self._frames, ignore_index=True) if len(self._frames) > 1 else self._frames[0]
+            self._write_batch(batch.reindex(columns=self.columns))
+            self.rows_written += len(batch)
+        self._frames, self._pending = [], 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._close()
+            self._file = None
+
+    # Formats implement these
+    def _open(self):
+        raise NotImplementedError
+
+    def _write_batch(self, batch):
+        raise NotImplementedError
+
+    def _close(self):
+        self._file.close()
+
+
+class CsvReportWriter(ReportWriter):
+    def _open(self):
+        self._file = open(self.path, "w", encoding="utf-8", newline="")
+        pd.DataFrame(columns=self.columns).to_csv(self._file, index=False)
+        self._file.flush()
+
+    def _write_batch(self, batch):
+        batch.to_csv(self._file, header=False, index=False)
+        self._file.flush()
+
+
+class JsonlReportWriter(ReportWriter):
+    def _open(self):
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def _write_batch(self, batch):
+        self._file.write(batch.to_json(orient="records", lines=True, force_ascii=False))
+        self._file.flush()
+
+
+class ParquetReportWriter(ReportWriter):
+    def _open(self):
+        self.schema = pa.schema([(c, pa.float64() if c in FLOAT_COLUMNS else pa.string()) for c in self.columns])
+        self._file = pq.ParquetWriter(self.path, self.schema)
+
+    def _write_batch(self, batch):
+        arrays = []
+        for field in self.schema:
+            col = batch[field.name]
+            if field.type == pa.float64():
+                arrays.append(pa.array(pd.to_numeric(col, errors="coerce"), type=pa.float64(), from_pandas=True))
+            else:
+                arrays.append(pa.array(col, from_pandas=True).cast(pa.string()))
+        self._file.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+
+
+WRITERS = {"csv": CsvReportWriter, "jsonl": JsonlReportWriter, "parquet": ParquetReportWriter}
+
+
+def open_report_writer(path, columns, fmt=None, **options):
+    """Writer for path in fmt (one of REPORT_FORMATS; by default from the extension)."""
+    fmt = fmt or detect_format(path)
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown report format '{fmt}' (expected one of {', '.join(REPORT_FORMATS)})")
+    return WRITERS[fmt](path, columns, **options)
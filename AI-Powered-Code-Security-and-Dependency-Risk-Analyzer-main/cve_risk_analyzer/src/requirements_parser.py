@@ -0,0 +1,178 @@
+# src/requirements_parser.py
+"""
+Dependency manifest parser
+--------------------------
+One parser for every scanner. Reads:
+
+    requirements  requirements.txt and `pip freeze` output: PEP 508 lines
+                  (name[extras] specifiers ; marker, or name @ url), "\\"
+                  continuations, --hash and other per-line options, inline
+                  comments, and "-e ...#egg=name" editables
+    poetry        poetry.lock ([[package]] name / version)
+    pipfile       Pipfile.lock (the "default" and "develop" sections)
+
+Names are normalized per PEP 503 (lowercase, runs of "-", "_", "." -> "-").
+version is the pinned version (a single == or === clause without a
+wildcard) or "" when the requirement is a range or unpinned; the full
+specifier is kept next to it.
+
+Every format is read as a stream: line by line for requirements files and
+poetry.lock, one package entry at a time for Pipfile.lock (via
+src/json_backend.py), so a multi-thousand-line lockfile is never held in
+memory. pandas and the JSON backends are imported only when needed.
+"""
+
+import re
+from collections import namedtuple
+from pathlib import Path
+
+FORMATS = ["auto", "requirements", "poetry", "pipfile"]
+
+Dependency = namedtuple("Dependency", ["name", "version", "specifier", "extras", "marker"])
+
+_SEPARATORS = re.compile(r"[-_.]+")
+_COMMENT = re.compile(r"(^|\s)#.*$")
+_OPTION = re.compile(r"\s--?[A-Za-z]")
+_REQUIREMENT = re.compile(r"""
+    \s*(?P<name>[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?)\s*
+    (?:\[(?P<extras>[^\]]*)\])?\s*
+    (?:@\s*(?P<url>[^\s;]+)\s*|\(?(?P<spec>[^;()]*)\)?\s*)
+    (?:;\s*(?P<marker>.*?))?\s*$
+""", re.VERBOSE)
+_CLAUSE = re.compile(r"\s*(===|==|~=|!=|<=|>=|<|>)\s*([^\s,]+)\s*$")
+_EGG = re.compile(r"[#&]egg=([A-Za-z0-9._-]+)")
+_TOML_STRING = re.compile(r'^(name|version)\s*=\s*"((?:[^"\\]|\\.)*)"\s*$')
+
+
+def canonicalize_name(name):
+    """PEP 503 normalized project name."""
+    return _SEPARATORS.sub("-", name).lower()
+
+
+def pinned_version(specifier):
+    """The version a specifier pins (one == / === clause, no wildcard), else ""."""
+    clauses = [c for c in specifier.split(",") if c.strip()]
+    if len(clauses) != 1:
+        return ""
+    match = _CLAUSE.match(clauses[0])
+    if match is None or match.group(1) not in ("==", "===") or match.group(2).endswith("*"):
+        return ""
+    return match.group(2)
+
+
+# ---------------- requirements.txt / pip freeze ----------------
+def parse_requirement(line):
+    """Dependency for one requirement line (comments already removed), or None if it is not one."""
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("-"):
+        # Options: only editables name a package, through their #egg= fragment
+        if line.startswith(("-e", "--editable")):
+            egg = _EGG.search(line)
+            if egg:
+                return Dependency(canonicalize_name(egg.group(1)), "", "", "", "")
+        return None
+    line = _OPTION.split(line, 1)[0]          # per-requirement --hash=..., --global-option, ...
+    match = _REQUIREMENT.fullmatch(line)
+    if match is None:
+        return None
+    specifier = (match.group("spec") or "").replace(" ", "")
+    if specifier and not all(_CLAUSE.match(c) for c in specifier.split(",")):
+        return None
+    extras = ",".join(sorted(e.strip().lower() for e in (match.group("extras") or "").split(",") if e.strip()))
+    if match.group("url"):
+        specifier = "@" + match.group("url")
+    return Dependency(canonicalize_name(match.group("name")), pinned_version(specifier), specifier,
+                      extras, match.group("marker") or "")
+
+
+def logical_lines(lines):
+    """Lines with comments removed and "\\" continuations joined."""
+    pending = ""
+    for line in lines:
+        line = _COMMENT.sub("", line.rstrip("\r\n"))
+        if line.endswith("\\"):
+            pending += line[:-1] + " "
+            continue
+        yield pending + line
+        pending = ""
+    if pending:
+        yield pending
+
+
+def iter_requirements(lines):
+    """Dependencies of requirements.txt / pip freeze lines (any iterable of str, e.g. an open file)."""
+    for line in logical_lines(lines):
+        dep = parse_requirement(line)
+        if dep is not None:
+            yield dep
+
+
+# ---------------- poetry.lock ----------------
+def iter_poetry_lock(lines):
+    """Dependencies of poetry.lock lines: the name and version of each [[package]] table."""
+    name = version = None
+    in_package = False
+    for line in lines:
+        line = line.strip()
+        if line.startswith("["):
+            if in_package and name:
+                yield Dependency(canonicalize_name(name), version or "", f"=={version}" if version else "", "", "")
+            in_package = line == "[[package]]"
+            name = version = None
+        elif in_package:
+            match = _TOML_STRING.match(line)
+            if match:
+                if match.group(1) == "name":
+                    name = match.group(2)
+                else:
+                    version = match.group(2)
+    if in_package and name:
+        yield Dependency(canonicalize_name(name), version or "", f"=={version}" if version else "", "", "")
+
+
+# ---------------- Pipfile.lock ----------------
+def iter_pipfile_lock(path, sections=("default", "develop"), backend="auto"):
+    """Dependencies of a Pipfile.lock, one package entry at a time."""
+    from src import json_backend   # ijson / orjson load only when a Pipfile.lock is read
+
+    for section in sections:
+        with open(path, "rb") as fh:
+            for name, entry in json_backend.iter_kv_items(fh, section, backend):
+                if not isinstance(entry, dict):
+                    continue
+                specifier = entry.get("version") or ""
+                if not specifier and entry.get("git"):
+                    specifier = "@git+" + entry["git"] + (f"@{entry['ref']}" if entry.get("ref") else "")
+                yield Dependency(canonicalize_name(name), pinned_version(specifier), specifier,
+                                 ",".join(sorted(entry.get("extras") or [])), entry.get("markers") or "")
+
+
+# ---------------- Entry points ----------------
+def detect_format(path):
+    name = Path(path).name.lower()
+    if name == "poetry.lock":
+        return "poetry"
+    if name == "pipfile.lock":
+        return "pipfile"
+    return "requirements"
+
+
+def iter_dependencies(path, fmt="auto"):
+    """Stream the dependencies of a manifest; fmt is one of FORMATS ("auto" looks at the file name)."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown manifest format '{fmt}' (expected one of {', '.join(FORMATS)})")
+    fmt = detect_format(path) if fmt == "auto" else fmt
+    if fmt == "pipfile":
+        yield from iter_pipfile_lock(path)
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        yield from (iter_poetry_lock(f) if fmt == "poetry" else iter_requirements(f))
+
+
+def dependency_frame(path, fmt="auto"):
+    """DataFrame with the package and (pinned) version columns the scanners use."""
+    import pandas as pd   # only here: the scan client parses manifests without pandas
+
+    return pd.DataFrame([(d.name, d.version) for d in iter_dependencies(path, fmt)], columns=["package", "version"])
@@ -0,0 +1,232 @@
+# src/result_cache.py
+"""
+Dependency lookup cache
+-----------------------
+Remembers the CVE rows found for a (package, version) so popular pins are
+resolved against the dataset once, not once per scan.
+
+Two levels:
+    memory  an LRU of the most recent results (per process)
+    disk    a SQLite table shared by every process and run
+            (data/processed/lookup_cache.sqlite), values stored as Arrow IPC
+
+Entries are keyed on (scope, package, version, mode, dataset fingerprint).
+scope names the caller (the analyzer and the mapper report different
+columns), mode holds every option that changes the answer (matcher, version
+filtering, ...). The fingerprint identifies the data the answer came from:
+the content hash ingestion writes into the CPE index meta, or the size and
+mtime of the dataset files. A new ingest therefore never sees old entries;
+ingestion also calls prune_cache() to delete them.
+
+cached_lookup() wraps a resolver that answers a list of dependencies with
+one frame; only the dependencies the cache misses are passed to it.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.cpe_index import index_path
+from src.cve_store import NORMALIZED_DIR
+
+CACHE_FILE = "lookup_cache.sqlite"
+
+
+# ---------------- Dataset fingerprint ----------------
+def file_fingerprint(*paths):
+    """Hash of the names, sizes and mtimes of the given files (directories are walked)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in map(Path, paths):
+        files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+        for f in files:
+            stat = f.stat() if f.exists() else None
+            digest.update(f"{f}|{stat.st_size if stat else -1}|{stat.st_mtime_ns if stat else -1}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def dataset_fingerprint(processed_dir):
+    """Fingerprint of the processed dataset: the CPE index content hash, else file stats."""
+    processed_dir = Path(processed_dir)
+    meta_path = index_path(processed_dir) / "meta.json"
+    if meta_path.exists():
+        fingerprint = json.loads(meta_path.read_text()).get("fingerprint")
+        if fingerprint:
+            return str(fingerprint)
+    return file_fingerprint(processed_dir / "cve_cpe.parquet", processed_dir / NORMALIZED_DIR)
+
+
+# ---------------- Serialization ----------------
+def _to_bytes(table):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _from_bytes(blob):
+    return pa.ipc.open_stream(blob).read_all().to_pandas()
+
+
+# ---------------- Cache ----------------
+def _connect(path, check_same_thread=True):
+    db = sqlite3.connect(path, timeout=30, check_same_thread=check_same_thread)
+    db.execute("PRAGMA journal_mode=WAL")   # readers in other processes do not block the writer
+    db.execute("""CREATE TABLE IF NOT EXISTS results (
+        scope TEXT, package TEXT, version TEXT, mode TEXT, fingerprint TEXT, frame BLOB,
+        PRIMARY KEY (scope, package, version, mode, fingerprint))""")
+    return db
+
+
+def prune_cache(processed_dir):
+    """Delete the cached results of every dataset but the current one; returns the rows removed."""
+    processed_dir = Path(processed_dir)
+    if not (processed_dir / CACHE_FILE).exists():
+        return 0
+    db = _connect(processed_dir / CACHE_FILE)
+    try:
+        with db:
+            return db.execute("DELETE FROM results WHERE fingerprint != ?",
+                              (dataset_fingerprint(processed_dir),)).rowcount
+    finally:
+        db.close()
+
+
+class ResultCache:
+    """Two-level (LRU + SQLite) cache of per-dependency result frames for one dataset fingerprint."""
+
+    def __init__(self, path, fingerprint, maxsize=4096, check_same_thread=True):
+        # check_same_thread=False: several threads may share the cache; _lock serializes the
+        # LRU and the connection, Arrow encoding / decoding runs outside it
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.maxsize = maxsize
+        self.memory_hits = self.disk_hits = self.misses = 0
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = _connect(self.path, check_same_thread)
+
+    @classmethod
+    def for_dataset(cls, processed_dir, maxsize=4096, check_same_thread=True):
+        processed_dir = Path(processed_dir)
+        return cls(processed_dir / CACHE_FILE, dataset_fingerprint(processed_dir), maxsize, check_same_thread)
+
+    @property
+    def hits(self):
+        return self.memory_hits + self.disk_hits
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "memory_hits": self.memory_hits, "disk_hits": self.disk_hits,
+                "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_entries": len(self._lru)}
+
+    def _remember(self, key, frame):
+        self._lru[key] = frame
+        self._lru.move_to_end(key)
+        if len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def get(self, scope, package, version, mode):
+        """The cached frame, or None on a miss."""
+        key = (scope, package, version, mode)
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                self.memory_hits += 1
+                return self._lru[key]
+            row = None if self._db is None else self._db.execute(
+                "SELECT frame FROM results WHERE scope=? AND package=? AND version=? AND mode=? AND fingerprint=?",
+                key + (self.fingerprint,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        frame = _from_bytes(row[0])
+        with self._lock:
+            self._remember(key, frame)
+        return frame
+
+    def put_many(self, scope, mode, frames, tables=None):
+        """Store {(package, version): frame} in both levels, in one transaction.
+
+        tables may hold the same results as Arrow tables (e.g. slices of one
+        converted frame), which saves converting each frame separately.
+        """
+        rows = []
+        for dep, frame in frames.items():
+            package, version = dep
+            table = tables[dep] if tables is not None else pa.Table.from_pandas(frame, preserve_index=False)
+            rows.append((scope, package, version, mode, self.fingerprint, _to_bytes(table)))
+        with self._lock:
+            for (package, version), frame in frames.items():
+                self._remember((scope, package, version, mode), frame)
+            if self._db is None:
+                return
+            with self._db:
+                self._db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            if self._db is None:
+                return
+            with self._db:
+                self._db.execute("DELETE FROM results")
+
+    def close(self):
+        """Close the SQLite connection. Lookups still in flight keep working on the memory level only."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def cached_lookup(cache, scope, mode, deps, resolve, key_columns):
+    """
+    Results for deps [(package, version), ...] in order, resolving only the misses.
+
+    resolve(missing_deps) answers a list of distinct dependencies with one
+    frame; key_columns name the columns of that frame that hold each row's
+    (package, version) (a single column is compared with the dependency's
+    label, "pkg==ver" or "pkg"). Each dependency's rows are stored, an
+    empty frame included, so known-clean pins are cached too.
+    """
+    deps = list(deps)
+    found = {dep: cache.get(scope, dep[0], dep[1], mode) for dep in dict.fromkeys(deps)}
+    missing = [dep for dep, frame in found.items() if frame is None]
+    if missing:
+        resolved = resolve(missing)
+        if len(key_columns) == 1:
+            keys = {dep: f"{dep[0]}=={dep[1]}" if dep[1] else dep[0] for dep in missing}
+            by = key_columns[0]
+        else:
+            keys = {dep: dep for dep in missing}
+            by = list(key_columns)
+        rows_of = resolved.groupby(by, sort=False).indices if len(resolved) else {}
+        # One take puts each dependency's rows next to each other; slicing them out is then free
+        ranges, order, start = {}, [], 0
+        for key, rows in rows_of.items():
+            ranges[key] = (start, start + len(rows))
+            order.append(rows)
+            start += len(rows)
+        grouped = resolved.iloc[np.concatenate(order)] if order else resolved
+        table = pa.Table.from_pandas(grouped, preserve_index=False)
+        fresh, tables = {}, {}
+        for dep, key in keys.items():
+            start, stop = ranges.get(key, (0, 0))
+            fresh[dep] = grouped.iloc[start:stop].reset_index(drop=True)
+            tables[dep] = table.slice(start, stop - start)
+        cache.put_many(scope, mode, fresh, tables)
+        found.update(fresh)
+    frames = [found[dep] for dep in deps if len(found[dep])]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,54 @@
+# src/scan_client.py
+"""
+Scan service client
+-------------------
+Sends a manifest's dependencies to a running src.scan_service and prints
+the findings. Kept free of pandas / NumPy imports: hooks and CI jobs call
+it on every commit, and interpreter startup is most of their cost.
+"""
+
+import json
+import urllib.error
+import urllib.request
+
+from src.requirements_parser import iter_dependencies
+
+DEFAULT_PORT = 8765
+DEFAULT_URL = f"http://127.0.0.1:{DEFAULT_PORT}"
+# src.cvss.SEVERITY_LABELS order, after NONE (no CVEs); repeated here so the client imports no NumPy
+SEVERITY_ORDER = ["NONE", "UNKNOWN", "LOW", "MEDIUM", "HIGH", "CRITICAL"]
+FAIL_LEVELS = SEVERITY_ORDER[2:]
+
+
+def reaches(severity, fail_on):
+    """True when severity is at least fail_on (None never fails)."""
+    return fail_on is not None and SEVERITY_ORDER.index(severity) >= SEVERITY_ORDER.index(fail_on)
+
+
+def request_scan(url, payload, timeout=30):
+    """POST payload to <url>/scan and return the decoded answer."""
+    request = urllib.request.Request(url.rstrip("/") + "/scan", data=json.dumps(payload).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.load(response)
+
+
+def scan_manifests(paths, url=DEFAULT_URL, fail_on=None, timeout=30):
+    """Send the manifests' dependencies to a running service; exit status 1 if any reaches fail_on."""
+    deps = [{"package": d.name, "version": d.version} for path in paths for d in iter_dependencies(path)]
+    try:
+        answer = request_scan(url, {"dependencies": deps, "matches": False}, timeout)
+    except (urllib.error.URLError, OSError) as e:
+        print(f"❌ Scan service at {url} not reachable: {e}")
+        return 2
+    failed = False
+    for dep in answer["dependencies"]:
+        if not dep["cves"]:
+            continue
+        label = f"{dep['package']}=={dep['version']}" if dep["version"] else dep["package"]
+        predicted = f" (predicted {dep['predicted_severity']})" if "predicted_severity" in dep else ""
+        print(f"{dep['severity']:<9} {label:<40} {dep['cves']} CVEs, max score {dep['max_score']}{predicted}")
+        failed |= reaches(dep["severity"], fail_on)
+    print(f"🔎 {len(answer['dependencies'])} dependencies, {sum(d['cves'] for d in answer['dependencies'])} CVEs "
+          f"in {answer['elapsed_ms']} ms (generation {answer['generation']})")
+    return 1 if failed else 0
@@ -0,0 +1,428 @@
+# src/scan_service.py
+"""
+Local scan service
+------------------
+A long-running HTTP/JSON server (stdlib http.server) that keeps the scan
+artifacts warm, so a pre-commit hook or CI job gets its answer in
+milliseconds instead of reloading CSVs and pickles on every run:
+
+    - the memory-mapped CPE index and its alias table (src/cpe_index.py)
+    - the distinct product names, normalized once for matching
+      (src/product_match.py ProductMatcher)
+    - trained_model_v2.pkl with its TF-IDF vectorizer and encoders, when
+      they exist and joblib is installed (otherwise scans report CVEs only)
+    - the lookup cache (src/result_cache.py): a package seen before, in
+      this or an earlier run of the service, is answered without a lookup
+
+Severity predictions of concurrent requests are batched together: the
+first request waits up to --batch-wait ms for others to join, and the
+model runs once for all of them.
+
+A watcher thread polls the artifact fingerprint (index content hash plus
+model / alias override file stats) every --reload-interval seconds. Once a
+new fingerprint has held still for one interval (writers are done), the
+artifacts are loaded in the background and swapped in with one reference
+assignment; requests in flight finish on the snapshot they started with.
+If loading fails, the previous artifacts keep serving. The replaced
+snapshot's cache connection is closed once the new one is in place.
+
+A bad payload (an invalid regex in match="regex" included) is answered
+with 400, any other failure with 500; no request is left without a reply.
+
+Endpoints:
+    GET  /health   generation, fingerprint and what is loaded
+    POST /scan     {"requirements": "<requirements.txt / pip freeze text>"}
+                   or {"poetry_lock": "<poetry.lock text>"}
+                   or {"dependencies": [{"package": "django", "version": "3.2"}, ...]}
+                   options: match, match_versions, python_only, predict,
+                   matches (false: per-dependency summary only)
+    POST /reload   load the artifacts now if they changed
+
+Run from the cve_risk_analyzer directory:
+    python -m src.scan_service serve --port 8765
+    python -m src.scan_service scan requirements.txt --fail-on HIGH
+"""
+
+import argparse
+import json
+import queue
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.category_encoder import as_encoder
+from src.cpe_aliases import OVERRIDES_FILE
+from src.cpe_index import open_cpe_index
+from src.cpe_mapper import load_alias_table
+from src.cvss import severity_labels, vector_codes
+from src.dependency_mapper import REPORT_COLUMNS, map_dependencies
+from src.product_match import MATCH_MODES
+from src.requirements_parser import canonicalize_name, iter_poetry_lock, iter_requirements
+from src.result_cache import ResultCache, dataset_fingerprint, file_fingerprint
+from src.scan_client import DEFAULT_PORT, DEFAULT_URL, FAIL_LEVELS, scan_manifests
+
+try:
+    import joblib
+except ImportError:  # optional: without it the service reports CVEs but no predictions
+    joblib = None
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+MAX_BODY = 16 * 1024 * 1024
+MODEL_FILES = {"model": "trained_model_v2.pkl", "tfidf": "tfidf_vectorizer.pkl",
+               "vendor": "vendor_encoder.pkl", "product": "product_encoder.pkl",
+               "severity": "severity_encoder.pkl"}
+VECTOR_ENCODERS_FILE = "vector_encoders.pkl"   # optional: models trained before the CVSS metric features lack it
+
+
+# ---------------- Artifacts ----------------
+def artifact_fingerprint(processed_dir):
+    """Changes whenever the index, the model files or the alias overrides change."""
+    processed_dir = Path(processed_dir)
+    files = [processed_dir / "model" / name for name in [*MODEL_FILES.values(), VECTOR_ENCODERS_FILE]]
+    return f"{dataset_fingerprint(processed_dir)}|{file_fingerprint(*files, processed_dir.parent / OVERRIDES_FILE)}"
+
+
+class SeverityModel:
+    """trained_model_v2.pkl with its vectorizer and encoders; predict() takes a frame of features."""
+
+    def __init__(self, parts):
+        self.model, self.tfidf = parts["model"], parts["tfidf"]
+        # Older trainings saved LabelEncoders; both encode whole columns as CategoryEncoders
+        self.vendor, self.product = as_encoder(parts["vendor"]), as_encoder(parts["product"])
+        self.severity = as_encoder(parts["severity"])
+        self.vectors = parts.get("vectors") or {}
+
+    @classmethod
+    def load(cls, model_dir):
+        """The model, or None if joblib or any of the files is missing."""
+        paths = {name: Path(model_dir) / f for name, f in MODEL_FILES.items()}
+        if joblib is None or not all(p.exists() for p in paths.values()):
+            return None
+        parts = {name: joblib.load(p) for name, p in paths.items()}
+        if (Path(model_dir) / VECTOR_ENCODERS_FILE).exists():
+            parts["vectors"] = joblib.load(Path(model_dir) / VECTOR_ENCODERS_FILE)
+        return cls(parts)
+
+    def predict(self, features):
+        """Severity labels for cpe_vendor, cpe_product, cvss_base_score, cvss_vector, description rows."""
+        from scipy.sparse import hstack   # installed with scikit-learn
+
+        struct = np.column_stack([
+            self.vendor.transform(features["cpe_vendor"]).astype(np.float64),
+            self.product.transform(features["cpe_product"]).astype(np.float64),
+            features["cvss_base_score"].to_numpy(dtype=np.float64),
+            vector_codes(features["cvss_vector"], self.vectors).astype(np.float64),
+        ])
+        encoded = self.model.predict(hstack([struct, self.tfidf.transform(features["description"])]))
+        return self.severity.inverse_transform(encoded)
+
+
+class Artifacts:
+    """One consistent snapshot of everything a scan reads; reloads replace it whole."""
+
+    def __init__(self, processed_dir, generation, use_cache=True):
+        processed_dir = Path(processed_dir)
+        self.fingerprint = artifact_fingerprint(processed_dir)
+        self.generation = generation
+        self.cpe_index = open_cpe_index(processed_dir)
+        if self.cpe_index is None:
+            raise FileNotFoundError(f"No CPE index in {processed_dir}; run python -m src.nvd_ingest first")
+        self.aliases = load_alias_table(processed_dir)
+        self.model = SeverityModel.load(processed_dir / "model")
+        # Normalized product names, built once per generation; every scan matches against them
+        self.matcher = self.cpe_index.matcher()
+        self.cache = (ResultCache.for_dataset(processed_dir, check_same_thread=False) if use_cache else None)
+        self.loaded_at = time.time()
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.close()
+
+    def describe(self):
+        return {"generation": self.generation, "fingerprint": self.fingerprint,
+                "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.loaded_at)),
+                "products": len(self.cpe_index), "cve_entries": int(self.cpe_index.meta["rows"]),
+                "model": self.model is not None, "cache": self.cache is not None}
+
+
+# ---------------- Micro-batched inference ----------------
+class InferenceBatcher:
+    """Collects predict() calls for up to max_wait seconds and runs the model once for all of them."""
+
+    def __init__(self, max_wait=0.005, max_rows=4096):
+        self.max_wait = max_wait
+        self.max_rows = max_rows
+        self.batches = self.calls = 0
+        self._queue = queue.Queue()
+        threading.Thread(target=self._run, name="inference-batcher", daemon=True).start()
+
+    def predict(self, model, features):
+        """Blocks until the batch holding these rows has been predicted."""
+        future = Future()
+        self._queue.put((model, features, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            rows = len(items[0][1])
+            deadline = time.monotonic() + self.max_wait
+            while rows < self.max_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+                rows += len(items[-1][1])
+            # A reload can swap the model between two requests of one batch
+            for model in dict.fromkeys(item[0] for item in items):
+                self._predict([item for item in items if item[0] is model])
+
+    def _predict(self, items):
+        self.batches += 1
+        self.calls += len(items)
+        try:
+            labels = items[0][0].predict(pd.concat([item[1] for item in items], ignore_index=True))
+        except Exception as e:  # hand the error to every waiting request
+            for _, _, future in items:
+                future.set_exception(e)
+            return
+        start = 0
+        for _, features, future in items:
+            future.set_result(list(labels[start:start + len(features)]))
+            start += len(features)
+
+
+# ---------------- Scanning ----------------
+def payload_dependencies(payload):
+    """(package, version) frame of a /scan payload."""
+    if "dependencies" in payload:
+        deps = [(canonicalize_name(str(d["package"])), str(d.get("version") or "")) for d in payload["dependencies"]]
+    elif "requirements" in payload:
+        deps = [(d.name, d.version) for d in iter_requirements(str(payload["requirements"]).splitlines())]
+    elif "poetry_lock" in payload:
+        deps = [(d.name, d.version) for d in iter_poetry_lock(str(payload["poetry_lock"]).splitlines())]
+    else:
+        raise ValueError("Payload needs 'dependencies', 'requirements' or 'poetry_lock'")
+    return pd.DataFrame(list(dict.fromkeys(deps)), columns=["package", "version"])
+
+
+def _json_records(frame):
+    # pandas' C encoder (NaN -> null) is many times faster than to_dict() on thousands of rows
+    return json.loads(frame.to_json(orient="records", force_ascii=False))
+
+
+def prediction_features(state, report, req_df):
+    """One model input row per dependency: its worst matched CVE (REPORT_COLUMNS plus cvss_vector),
+    or its alias and no score."""
+    matched = report[report["cve_id"].notna()]
+    worst = matched.sort_values("cvss_base_score", ascending=False, kind="stable").drop_duplicates(
+        ["req_package", "req_version"]).set_index(["req_package", "req_version"])
+    rows = []
+    for pkg, ver in req_df.itertuples(index=False, name=None):
+        if (pkg, ver) in worst.index:
+            hit = worst.loc[(pkg, ver)]
+            score, vector, description = hit["cvss_base_score"], hit["cvss_vector"], hit["description"]
+            rows.append((hit["cpe_vendor"], hit["cpe_product"], 0.0 if pd.isna(score) else float(score),
+                         None if pd.isna(vector) else str(vector), "" if pd.isna(description) else str(description)))
+        else:
+            vendor, product = state.aliases.lookup(pkg) or ("unknown_vendor", pkg)
+            rows.append((vendor, product, 0.0, None, ""))
+    return pd.DataFrame(rows, columns=["cpe_vendor", "cpe_product", "cvss_base_score", "cvss_vector", "description"])
+
+
+class ScanService:
+    """Holds the current Artifacts, reloads them when they change, and answers scans."""
+
+    def __init__(self, processed_dir, use_cache=True, batch_wait=0.005):
+        self.processed_dir = Path(processed_dir)
+        self.use_cache = use_cache
+        self.batcher = InferenceBatcher(batch_wait)
+        self._reload_lock = threading.Lock()
+        self._seen = None
+        self._stop = threading.Event()
+        self.state = Artifacts(self.processed_dir, 1, use_cache)
+
+    def reload(self, force=False):
+        """Swap in new artifacts if the fingerprint changed (and, unless forced, held still since the last check)."""
+        with self._reload_lock:
+            fingerprint = artifact_fingerprint(self.processed_dir)
+            if fingerprint == self.state.fingerprint:
+                self._seen = None
+                return False
+            if not force and fingerprint != self._seen:
+                self._seen = fingerprint     # still being written? look again next interval
+                return False
+            try:
+                state = Artifacts(self.processed_dir, self.state.generation + 1, self.use_cache)
+            except Exception as e:  # keep serving the previous artifacts
+                print(f"⚠️ Reload failed, still serving generation {self.state.generation}: {e}")
+                return False
+            previous, self.state = self.state, state
+            self._seen = None
+            # Requests still on the previous snapshot finish without its disk cache
+            previous.close()
+            print(f"🔄 Loaded generation {state.generation} ({state.fingerprint[:16]})")
+            return True
+
+    def watch(self, interval):
+        def loop():
+            while not self._stop.wait(interval):
+                self.reload()
+        threading.Thread(target=loop, name="artifact-watcher", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self.state.close()
+
+    def scan(self, payload):
+        start = time.perf_counter()
+        state = self.state      # one snapshot for the whole request
+        match = payload.get("match", "contains")
+        if match not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode '{match}' (expected one of {', '.join(MATCH_MODES)})")
+        req_df = payload_dependencies(payload)
+        # Concurrent requests match in parallel; the cache serializes only its own SQLite / LRU access
+        mapped = map_dependencies(req_df, cpe_index=state.cpe_index, match=match,
+                                  match_versions=bool(payload.get("match_versions")),
+                                  python_only=bool(payload.get("python_only")), cache=state.cache)
+        report = mapped.reindex(columns=REPORT_COLUMNS)
+        matched = report[report["cve_id"].notna()]
+
+        groups = matched.groupby(["req_package", "req_version"], sort=False)
+        worst, cves = groups["cvss_base_score"].max(), groups["cve_id"].nunique()
+        dependencies = []
+        for pkg, ver in req_df.itertuples(index=False, name=None):
+            count, score = int(cves.get((pkg, ver), 0)), worst.get((pkg, ver), np.nan)
+            dependencies.append({"package": pkg, "version": ver, "cves": count,
+                                 "max_score": None if pd.isna(score) else float(score),
+                                 "severity": severity_labels([score])[0] if count else "NONE"})
+        if state.model is not None and payload.get("predict", True) and len(req_df):
+            # The model scores the matched CVE's CVSS vector metrics too, as it was trained to
+            features = prediction_features(state, mapped.reindex(columns=REPORT_COLUMNS + ["cvss_vector"]), req_df)
+            labels = self.batcher.predict(state.model, features)
+            for dep, label in zip(dependencies, labels):
+                dep["predicted_severity"] = str(label)
+
+        answer = {"generation": state.generation, "dependencies": dependencies}
+        if payload.get("matches", True):
+            answer["matches"] = _json_records(matched)
+        answer["elapsed_ms"] = round((time.perf_counter() - start) * 1e3, 2)
+        return answer
+
+
+# ---------------- HTTP ----------------
+class ScanHandler(BaseHTTPRequestHandler):
+    server_version = "cve-risk-scan/1"
+    disable_nagle_algorithm = True   # headers and body go out as two writes; don't hold the second for an ACK
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            service = self.server.service
+            self._send(200, {"status": "ok", **service.state.describe(),
+                             "batches": service.batcher.batches, "predict_calls": service.batcher.calls})
+        else:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        # Every request gets an answer: a bad payload is a 400, anything else a 500 (logged)
+        try:
+            status, body = self._post()
+        except (ValueError, KeyError, TypeError) as e:
+            status, body = 400, {"error": str(e)}
+        except Exception as e:
+            traceback.print_exc()
+            status, body = 500, {"error": f"{type(e).__name__}: {e}"}
+        self._send(status, body)
+
+    def _post(self):
+        path = self.path.rstrip("/")
+        if path == "/reload":
+            return 200, {"reloaded": self.server.service.reload(force=True),
+                         "generation": self.server.service.state.generation}
+        if path != "/scan":
+            return 404, {"error": f"Unknown path {self.path}"}
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            return 413, {"error": f"Payload over {MAX_BODY} bytes"}
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if not isinstance(payload, dict):
+            raise ValueError("Payload must be a JSON object")
+        return 200, self.server.service.scan(payload)
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+
+class ScanServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128    # CI fans out many hooks at once; the default backlog is 5
+
+
+def make_server(service, host="127.0.0.1", port=DEFAULT_PORT, verbose=False):
+    server = ScanServer((host, port), ScanHandler)
+    server.service, server.verbose = service, verbose
+    return server
+
+
+# ---------------- Main ----------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm HTTP/JSON dependency scan service and its client.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="run the service")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument("--processed", default=str(BASE_DIR / "data" / "processed"),
+                       help="directory with the ingested CPE index and model/")
+    serve.add_argument("--reload-interval", type=float, default=2.0, help="seconds between artifact checks")
+    serve.add_argument("--batch-wait", type=float, default=5.0, help="ms a prediction waits for others to batch with")
+    serve.add_argument("--no-cache", action="store_true", help="do not use data/processed/lookup_cache.sqlite")
+    serve.add_argument("--verbose", action="store_true", help="log every request")
+    scan = commands.add_parser("scan", help="scan manifests through a running service")
+    scan.add_argument("manifests", nargs="+", help="requirements.txt, pip freeze output, poetry.lock or Pipfile.lock")
+    scan.add_argument("--url", default=DEFAULT_URL)
+    scan.add_argument("--fail-on", choices=FAIL_LEVELS, help="exit 1 if a dependency has a CVE this severe")
+    scan.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args(argv)
+
+    if args.command == "scan":
+        return scan_manifests(args.manifests, args.url, args.fail_on, args.timeout)
+
+    print("📦 Loading scan artifacts...")
+    service = ScanService(args.processed, use_cache=not args.no_cache, batch_wait=args.batch_wait / 1e3)
+    state = service.state.describe()
+    print(f"✅ {state['products']:,} products, {state['cve_entries']:,} CVE entries, "
+          f"model {'loaded' if state['model'] else 'not available'}")
+    service.watch(args.reload_interval)
+    server = make_server(service, args.host, args.port, args.verbose)
+    print(f"🚀 Serving on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
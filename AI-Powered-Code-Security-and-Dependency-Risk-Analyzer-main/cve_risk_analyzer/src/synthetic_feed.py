@@ -0,0 +1,313 @@
+# src/synthetic_feed.py
+"""
+Synthetic NVD feed generator
+----------------------------
+Writes NVD 2.0 ("vulnerabilities") and legacy 1.1 ("CVE_Items") feeds that
+look enough like the real downloads to exercise ingestion end to end:
+
+- skewed CPE fan-out: most CVEs list a handful of cpeMatch entries, a few
+  list dozens (think kernel or browser CVEs with one entry per release)
+- exact version pins and versionStart*/versionEnd* ranges
+- "running on" configurations: an AND of the vulnerable application and a
+  non-vulnerable platform, as separate nodes (2.0) or nested `children` (1.1
+  and some 2.0 items)
+- CVSS v3.1 / v3.0 / v2 metrics, weaknesses, references
+- a small share of rejected CVEs
+
+Output is fully determined by (n_cves, feed_format, seed), so the same
+command always produces byte-identical files.
+
+    python -m src.synthetic_feed --scale 100k --format 2.0 --out data/raw/nvdcve-2.0-synthetic.json
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+
+from src.compressed_io import open_for_write
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+FORMATS = ["2.0", "1.1"]
+
+# Real-world products that the dependency mappers look for, plus a long tail
+# of synthetic ones. Popularity is skewed towards the front of the list.
+KNOWN_PRODUCTS = [
+    ("palletsprojects", "flask", "python"), ("djangoproject", "django", "python"),
+    ("python", "pillow", "python"), ("python-requests", "requests", "python"),
+    ("pyyaml", "pyyaml", "python"), ("numpy", "numpy", "python"),
+    ("palletsprojects", "jinja", "python"), ("sqlalchemy", "sqlalchemy", "python"),
+    ("urllib3_project", "urllib3", "python"), ("tornadoweb", "tornado", "python"),
+    ("apache", "http_server", "*"), ("openssl", "openssl", "*"),
+    ("linux", "linux_kernel", "*"), ("google", "chrome", "*"),
+    ("mozilla", "firefox", "*"), ("microsoft", "windows_10", "*"),
+    ("nodejs", "node.js", "*"), ("oracle", "mysql", "*"),
+]
+N_SYNTHETIC_PRODUCTS = 5000
+PLATFORMS = [("o", "microsoft", "windows"), ("o", "linux", "linux_kernel"),
+             ("o", "apple", "macos"), ("o", "debian", "debian_linux"),
+             ("h", "cisco", "ios_xe")]
+# (share of CVEs, (min, max) cpeMatch entries)
+FAN_OUT = [(0.55, (1, 3)), (0.30, (4, 10)), (0.12, (11, 40)), (0.03, (41, 150))]
+CWES = ["CWE-79", "CWE-89", "CWE-20", "CWE-787", "CWE-22", "CWE-352", "CWE-502", "CWE-400"]
+WORDS = ("allows remote attackers to execute arbitrary code via a crafted request "
+         "in the parser component leading to denial of service or information "
+         "disclosure when handling untrusted input through the web interface").split()
+REJECTED_SHARE = 0.01
+AND_CONFIG_SHARE = 0.15
+RANGE_SHARE = 0.35
+
+
+def _product(rng):
+    # rng.random() ** 3 puts most picks near the front of the catalog
+    i = int((len(KNOWN_PRODUCTS) + N_SYNTHETIC_PRODUCTS) * rng.random() ** 3)
+    if i < len(KNOWN_PRODUCTS):
+        return KNOWN_PRODUCTS[i]
+    i -= len(KNOWN_PRODUCTS)
+    return f"vendor{i % 1500}", f"product{i}", rng.choice(["*", "*", "*", "python", "node.js"])
+
+
+def _version(rng):
+    return f"{rng.randint(0, 12)}.{rng.randint(0, 20)}.{rng.randint(0, 30)}"
+
+
+def _cpe(part, vendor, product, version, target_sw="*"):
+    return f"cpe:2.3:{part}:{vendor}:{product}:{version}:*:*:*:*:{target_sw}:*:*"
+
+
+def _matches(rng, n):
+    """n CPE match entries (field names shared by 2.0 and 1.1) for one vendor/product."""
+    vendor, product, target_sw = _product(rng)
+    entries = []
+    if rng.random() < RANGE_SHARE:
+        lo, hi = sorted([_version(rng), _version(rng)], key=lambda v: tuple(map(int, v.split("."))))
+        entry = {"vulnerable": True, "uri": _cpe("a", vendor, product, "*", target_sw)}
+        if rng.random() < 0.5:
+            entry["versionStartIncluding"] = lo
+        entry["versionEndExcluding" if rng.random() < 0.7 else "versionEndIncluding"] = hi
+        entries.append(entry)
+        n -= 1
+    versions = sorted({_version(rng) for _ in range(n)})
+    entries.extend({"vulnerable": True, "uri": _cpe("a", vendor, product, v, target_sw)} for v in versions)
+    return entries
+
+
+def _platform(rng):
+    part, vendor, product = rng.choice(PLATFORMS)
+    return {"vulnerable": False, "uri": _cpe(part, vendor, product, "-")}
+
+
+def _fan_out(rng):
+    r = rng.random()
+    for share, (lo, hi) in FAN_OUT:
+        if r < share:
+            return rng.randint(lo, hi)
+        r -= share
+    return FAN_OUT[-1][1][1]
+
+
+def _cvss(rng):
+    score = round(rng.uniform(1.0, 10.0), 1)
+    av, ac = rng.choice("NALP"), rng.choice("LH")
+    pr, ui = rng.choice("NLH"), rng.choice("NR")
+    c, i, a = rng.choice("NLH"), rng.choice("NLH"), rng.choice("NLH")
+    version = rng.choices(["3.1", "3.0", "2.0"], weights=[0.7, 0.1, 0.2])[0]
+    if version == "2.0":
+        vector = f"AV:{av if av != 'P' else 'L'}/AC:{ac}/Au:N/C:{'NPC'['NLH'.index(c)]}/I:{'NPC'['NLH'.index(i)]}/A:{'NPC'['NLH'.index(a)]}"
+    else:
+        vector = f"CVSS:{version}/AV:{av}/AC:{ac}/PR:{pr}/UI:{ui}/S:U/C:{c}/I:{i}/A:{a}"
+    return version, score, vector
+
+
+def _severity(score):
+    return "CRITICAL" if score >= 9 else "HIGH" if score >= 7 else "MEDIUM" if score >= 4 else "LOW"
+
+
+def _description(rng, product):
+    return f"A vulnerability in {product} " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(12, 60))) + "."
+
+
+def _timestamps(rng, year, i, n_cves):
+    day = 1 + (i * 364) // max(n_cves, 1)
+    month, dom = min(12, 1 + (day - 1) // 31), 1 + (day - 1) % 28
+    published = (year, month, dom, rng.randint(0, 23), rng.randint(0, 59))
+    modified = (year + rng.choice([0, 0, 1]), month, min(28, dom + rng.randint(0, 10)),
+                rng.randint(0, 23), rng.randint(0, 59))
+    return published, max(published, modified)
+
+
+def _draw_cve(rng, i, n_cves, year):
+    """Format-independent content of one synthetic CVE."""
+    published, modified = _timestamps(rng, year, i, n_cves)
+    rejected = rng.random() < REJECTED_SHARE
+    groups = []
+    if not rejected:
+        remaining = _fan_out(rng)
+        while remaining > 0:
+            n = min(remaining, rng.randint(1, 12))
+            groups.append((_matches(rng, n), _platform(rng) if rng.random() < AND_CONFIG_SHARE else None))
+            remaining -= n
+    product = groups[0][0][0]["uri"].split(":")[4] if groups else "an unspecified product"
+    return {
+        "id": f"CVE-{year}-{i + 1:07d}" if n_cves >= 100_000 else f"CVE-{year}-{i + 1:05d}",
+        "published": published,
+        "modified": modified,
+        "rejected": rejected,
+        "description": _description(rng, product),
+        "cvss": _cvss(rng),
+        "cwe": rng.choice(CWES),
+        "groups": groups,      # [(application matches, platform match or None)]
+        "nested": rng.random() < 0.5,
+    }
+
+
+# ---------------- NVD 2.0 ----------------
+def _ts_2_0(t):
+    return f"{t[0]:04d}-{t[1]:02d}-{t[2]:02d}T{t[3]:02d}:{t[4]:02d}:00.000"
+
+
+def _match_2_0(entry, match_id):
+    out = {"vulnerable": entry["vulnerable"], "criteria": entry["uri"], "matchCriteriaId": match_id}
+    out.update({k: v for k, v in entry.items() if k.startswith("version")})
+    return out
+
+
+def _item_2_0(cve):
+    ids = iter(range(1, 1_000_000))
+    match_id = lambda: f"{cve['id']}-{next(ids):04d}"
+    configurations = []
+    for apps, platform in cve["groups"]:
+        app_node = {"operator": "OR", "negate": False, "cpeMatch": [_match_2_0(m, match_id()) for m in apps]}
+        if platform is None:
+            configurations.append({"nodes": [app_node]})
+        elif cve["nested"]:
+            # Older 2.0 records keep the 1.1 shape: the platform as a child node
+            platform_node = {"operator": "OR", "negate": False, "cpeMatch": [_match_2_0(platform, match_id())]}
+            configurations.append({"nodes": [{"operator": "AND", "negate": False,
+                                              "children": [app_node, platform_node]}]})
+        else:
+            platform_node = {"operator": "OR", "negate": False, "cpeMatch": [_match_2_0(platform, match_id())]}
+            configurations.append({"operator": "AND", "nodes": [app_node, platform_node]})
+
+    version, score, vector = cve["cvss"]
+    if version == "2.0":
+        metrics = {"cvssMetricV2": [{"source": "nvd@nist.gov", "type": "Primary", "baseSeverity": _severity(score),
+                                     "cvssData": {"version": "2.0", "vectorString": vector, "baseScore": score}}]}
+    else:
+        key = "cvssMetricV31" if version == "3.1" else "cvssMetricV30"
+        metrics = {key: [{"source": "nvd@nist.gov", "type": "Primary", "cvssData": {
+            "version": version, "vectorString": vector, "baseScore": score, "baseSeverity": _severity(score)}}]}
+
+    item = {
+        "id": cve["id"],
+        "sourceIdentifier": "cve@mitre.org",
+        "published": _ts_2_0(cve["published"]),
+        "lastModified": _ts_2_0(cve["modified"]),
+        "vulnStatus": "Rejected" if cve["rejected"] else "Analyzed",
+        "descriptions": [{"lang": "en", "value": ("Rejected reason: duplicate of another CVE."
+                                                  if cve["rejected"] else cve["description"])}],
+    }
+    if not cve["rejected"]:
+        item["metrics"] = metrics
+        item["weaknesses"] = [{"source": "nvd@nist.gov", "type": "Primary",
+                               "description": [{"lang": "en", "value": cve["cwe"]}]}]
+        item["configurations"] = configurations
+        item["references"] = [{"url": f"https://example.org/advisories/{cve['id']}", "source": "cve@mitre.org"}]
+    return {"cve": item}
+
+
+# ---------------- NVD 1.1 (legacy) ----------------
+def _ts_1_1(t):
+    return f"{t[0]:04d}-{t[1]:02d}-{t[2]:02d}T{t[3]:02d}:{t[4]:02d}Z"
+
+
+def _match_1_1(entry):
+    out = {"vulnerable": entry["vulnerable"], "cpe23Uri": entry["uri"], "cpe_name": []}
+    out.update({k: v for k, v in entry.items() if k.startswith("version")})
+    return out
+
+
+def _item_1_1(cve):
+    nodes = []
+    for apps, platform in cve["groups"]:
+        app_node = {"operator": "OR", "children": [], "cpe_match": [_match_1_1(m) for m in apps]}
+        if platform is None:
+            nodes.append(app_node)
+        else:
+            platform_node = {"operator": "OR", "children": [], "cpe_match": [_match_1_1(platform)]}
+            nodes.append({"operator": "AND", "children": [app_node, platform_node], "cpe_match": []})
+
+    version, score, vector = cve["cvss"]
+    if version == "2.0":
+        impact = {"baseMetricV2": {"cvssV2": {"version": "2.0", "vectorString": vector, "baseScore": score},
+                                   "severity": _severity(score)}}
+    else:
+        impact = {"baseMetricV3": {"cvssV3": {"version": version, "vectorString": vector, "baseScore": score,
+                                              "baseSeverity": _severity(score)}}}
+
+    description = ("** REJECT ** DO NOT USE THIS CANDIDATE NUMBER."
+                   if cve["rejected"] else cve["description"])
+    return {
+        "cve": {
+            "data_type": "CVE", "data_format": "MITRE", "data_version": "4.0",
+            "CVE_data_meta": {"ID": cve["id"], "ASSIGNER": "cve@mitre.org"},
+            "problemtype": {"problemtype_data": [{"description": [{"lang": "en", "value": cve["cwe"]}]}]},
+            "references": {"reference_data": [{"url": f"https://example.org/advisories/{cve['id']}"}]},
+            "description": {"description_data": [{"lang": "en", "value": description}]},
+        },
+        "configurations": {"CVE_data_version": "4.0", "nodes": nodes},
+        "impact": {} if cve["rejected"] else impact,
+        "publishedDate": _ts_1_1(cve["published"]),
+        "lastModifiedDate": _ts_1_1(cve["modified"]),
+    }
+
+
+# ---------------- Feed writer ----------------
+def generate_items(n_cves, feed_format="2.0", seed=0, year=2025):
+    """Yield n_cves deterministic feed items in the given format."""
+    if feed_format not in FORMATS:
+        raise ValueError(f"Unknown feed format '{feed_format}' (expected one of {', '.join(FORMATS)})")
+    rng = random.Random(seed)
+    to_item = _item_2_0 if feed_format == "2.0" else _item_1_1
+    for i in range(n_cves):
+        yield to_item(_draw_cve(rng, i, n_cves, year))
+
+
+def write_feed(path, n_cves, feed_format="2.0", seed=0, year=2025):
+    """Stream a synthetic feed to path (compressed for .gz/.bz2/.xz/.zst); returns the path."""
+    path = Path(path)
+    with open_for_write(path) as fh:
+        if feed_format == "2.0":
+            fh.write('{"resultsPerPage": %d, "startIndex": 0, "totalResults": %d, "format": "NVD_CVE", '
+                     '"version": "2.0", "timestamp": "%d-12-31T00:00:00.000", "vulnerabilities": ['
+                     % (n_cves, n_cves, year))
+        else:
+            fh.write('{"CVE_data_type": "CVE", "CVE_data_format": "MITRE", "CVE_data_version": "4.0", '
+                     '"CVE_data_numberOfCVEs": "%d", "CVE_data_timestamp": "%d-12-31T00:00Z", "CVE_Items": ['
+                     % (n_cves, year))
+        for i, item in enumerate(generate_items(n_cves, feed_format, seed, year)):
+            if i:
+                fh.write(",\n")
+            fh.write(json.dumps(item, separators=(",", ":")))
+        fh.write("]}\n")
+    return path
+
+
+def parse_scale(value):
+    """'10k' / '100k' / '1m' or a plain integer."""
+    return SCALES.get(str(value).lower()) or int(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic NVD feed.")
+    parser.add_argument("--scale", default="10k", help=f"number of CVEs: {', '.join(SCALES)} or an integer")
+    parser.add_argument("--format", default="2.0", choices=FORMATS, help="NVD feed format")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--out", required=True, help="output path (.json, or .json.gz/.bz2/.xz/.zst)")
+    args = parser.parse_args()
+
+    n_cves = parse_scale(args.scale)
+    out = write_feed(args.out, n_cves, args.format, args.seed, args.year)
+    print(f"✅ Wrote {n_cves:,} synthetic CVEs ({args.format}) to {out} "
+          f"({out.stat().st_size / 1e6:.1f} MB)")
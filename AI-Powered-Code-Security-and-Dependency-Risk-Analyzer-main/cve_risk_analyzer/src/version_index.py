@@ -0,0 +1,166 @@
+# src/version_index.py
+"""
+Version interval index
+----------------------
+Answers "is <vendor>:<product> <version> affected, and by which CVEs?" in
+O(log n) per query instead of scanning every CPE row.
+
+For each (vendor, product) all interval boundaries are sorted once. The
+boundaries cut the version line into regions: the open gap before each
+boundary, the boundary point itself, and the gap after the last one. Each
+region stores the CVEs whose interval covers it, so a query is one bisect.
+
+Exact pins (cpe_version = "2.0.1") are zero-width intervals; "*" / "-" with
+versionStart*/versionEnd* bounds are ranges; "*" without bounds covers every
+version. Versions that PEP 440 cannot parse only match by exact string.
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+
+from packaging.version import InvalidVersion, Version
+
+from src.cve_store import load_flat
+
+ANY_VERSION = {"", "*", "-"}
+
+
+@lru_cache(maxsize=65536)
+def parse_version(version):
+    try:
+        return Version(version)
+    except (InvalidVersion, TypeError):
+        return None
+
+
+class _ProductIntervals:
+    __slots__ = ("boundaries", "regions", "exact", "unbounded")
+
+    def __init__(self, intervals, exact):
+        # intervals: list of (cve_id, lo, lo_closed, hi, hi_closed); lo/hi None = unbounded
+        points = sorted({v for _, lo, _, hi, _ in intervals for v in (lo, hi) if v is not None})
+        self.boundaries = points
+        n_regions = 2 * len(points) + 1
+        starts, ends = [[] for _ in range(n_regions)], [[] for _ in range(n_regions)]
+        for cve_id, lo, lo_closed, hi, hi_closed in intervals:
+            first = 0 if lo is None else 2 * bisect_left(points, lo) + (1 if lo_closed else 2)
+            last = n_regions - 1 if hi is None else 2 * bisect_left(points, hi) + (1 if hi_closed else 0)
+            if first <= last:
+                starts[first].append(cve_id)
+                ends[last].append(cve_id)
+
+        # Sweep once over the regions, reusing the previous tuple while nothing changes
+        active = Counter()
+        regions, current = [], ()
+        for r in range(n_regions):
+            if starts[r]:
+                active.update(starts[r])
+                current = tuple(sorted(active))
+            regions.append(current)
+            if ends[r]:
+                active.subtract(ends[r])
+                active = +active
+                current = tuple(sorted(active))
+        self.regions = regions
+        self.exact = exact   # unparseable version string -> CVE ids
+        # Only an interval open at both ends covers the whole version line: a CVE with
+        # "< 1.0" and ">= 5.0" ranges is in both outermost regions, but not in between
+        self.unbounded = tuple(sorted({cve_id for cve_id, lo, _, hi, _ in intervals if lo is None and hi is None}))
+
+    def lookup(self, version):
+        parsed = parse_version(version)
+        if parsed is None:
+            return tuple(self.exact.get(version, ())) + self.unbounded
+        i = bisect_left(self.boundaries, parsed)
+        if i < len(self.boundaries) and self.boundaries[i] == parsed:
+            return self.regions[2 * i + 1]
+        return self.regions[2 * i]
+
+
+class VersionIntervalIndex:
+    """Per-(vendor, product) sorted version intervals built from the CVE x CPE rows."""
+
+    def __init__(self):
+        self._products = {}
+        self._vendors_by_product = {}
+
+    @classmethod
+    def from_frame(cls, df):
+        """Build from a frame with cve_id, cpe_vendor/product/version, the range columns and vulnerable."""
+        index = cls()
+        grouped = {}
+        for row in df.itertuples(index=False):
+            if row.vulnerable is False or not row.cpe_product:
+                continue
+            key = (str(row.cpe_vendor).lower(), str(row.cpe_product).lower())
+            intervals, exact = grouped.setdefault(key, ([], {}))
+            interval = _row_interval(row)
+            if interval is None:
+                exact.setdefault(str(row.cpe_version), []).append(row.cve_id)
+            else:
+                intervals.append((row.cve_id,) + interval)
+
+        for key, (intervals, exact) in grouped.items():
+            index._products[key] = _ProductIntervals(intervals, exact)
+            index._vendors_by_product.setdefault(key[1], []).append(key[0])
+        return index
+
+    def __contains__(self, key):
+        return key in self._products
+
+    def __len__(self):
+        return len(self._products)
+
+    def vendors_for(self, product):
+        return self._vendors_by_product.get(product.lower(), [])
+
+    def affected(self, vendor, product, version):
+        """Sorted CVE ids affecting vendor:product at this version (empty if unknown)."""
+        intervals = self._products.get((vendor.lower(), product.lower()))
+        if intervals is None:
+            return []
+        return sorted(set(intervals.lookup(str(version))))
+
+    def is_affected(self, vendor, product, version):
+        return bool(self.affected(vendor, product, version))
+
+
+def _is_set(value):
+    return isinstance(value, str) and value != ""
+
+
+def _row_interval(row):
+    """(lo, lo_closed, hi, hi_closed) for a row, or None when it only matches an exact string."""
+    if str(row.cpe_version) not in ANY_VERSION:
+        pinned = parse_version(str(row.cpe_version))
+        return None if pinned is None else (pinned, True, pinned, True)
+
+    lo, lo_closed, hi, hi_closed = None, False, None, False
+    if _is_set(row.version_start_including):
+        lo, lo_closed = parse_version(row.version_start_including), True
+    elif _is_set(row.version_start_excluding):
+        lo = parse_version(row.version_start_excluding)
+    if _is_set(row.version_end_including):
+        hi, hi_closed = parse_version(row.version_end_including), True
+    elif _is_set(row.version_end_excluding):
+        hi = parse_version(row.version_end_excluding)
+    # An unparseable bound is treated as open-ended, so the range errs on the side of matching
+    return lo, lo_closed, hi, hi_closed
+
+
+INDEX_COLUMNS = ["cve_id", "cpe_vendor", "cpe_product", "cpe_version",
+                 "version_start_including", "version_start_excluding",
+                 "version_end_including", "version_end_excluding", "vulnerable"]
+
+
+def version_index_from_rows(df):
+    """Build the index from any frame of CVE x CPE rows; INDEX_COLUMNS missing from it count as null."""
+    df = df.reindex(columns=INDEX_COLUMNS).astype(object)
+    df = df.where(df.notna(), None)
+    return VersionIntervalIndex.from_frame(df)
+
+
+def load_version_index(processed_dir):
+    """Build the index from the processed dataset (flat or normalized layout)."""
+    return version_index_from_rows(load_flat(processed_dir, columns=INDEX_COLUMNS))
@@ -0,0 +1,24 @@
+# tests/nvd_feeds.py
+"""Tiny NVD 2.0 feeds for tests: cve() builds one item, write_feed() a feed file of them."""
+
+import json
+
+FLASK = "cpe:2.3:a:palletsprojects:flask:{}:*:*:*:*:*:*:*"
+
+
+def cve(cve_id, modified, score, versions=("2.0.1",), rejected=False, criteria=None):
+    """One CVE item; criteria (a list of cpeMatch dicts) replaces the flask CPEs of `versions`."""
+    matches = criteria if criteria is not None else [
+        {"vulnerable": True, "criteria": FLASK.format(v)} for v in versions]
+    item = {"id": cve_id, "published": "2024-01-01", "lastModified": modified,
+            "descriptions": [{"lang": "en", "value": f"{cve_id} at {modified}"}],
+            "metrics": {"cvssMetricV31": [{"cvssData": {"baseScore": score, "vectorString": "CVSS:3.1/AV:N"}}]},
+            "configurations": [{"nodes": [{"cpeMatch": matches}]}]}
+    if rejected:
+        item["vulnStatus"] = "Rejected"
+    return {"cve": item}
+
+
+def write_feed(raw_dir, name, items):
+    raw_dir.mkdir(parents=True, exist_ok=True)
+    (raw_dir / name).write_text(json.dumps({"format": "NVD_CVE", "vulnerabilities": items}), encoding="utf-8")
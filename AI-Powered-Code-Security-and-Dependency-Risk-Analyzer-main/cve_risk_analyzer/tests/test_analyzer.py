@@ -0,0 +1,55 @@
+# tests/test_analyzer.py
+"""analyze_dependencies over the CPE index: pinned versions match exact CPEs and version ranges."""
+
+import pytest
+
+from src import cpe_mapper
+from src.analyzer import analyze_dependencies
+from src.cpe_index import open_cpe_index
+from src.nvd_ingest import ingest_all
+from tests.nvd_feeds import FLASK, cve, write_feed
+
+
+def flask_range(**bounds):
+    return [{"vulnerable": True, "criteria": FLASK.format("*"), **bounds}]
+
+
+FEED = [
+    cve("CVE-2024-1000", "2024-01-02", 9.8),                                        # flask 2.0.1 only
+    cve("CVE-2024-1001", "2024-01-02", 7.5, criteria=flask_range(versionStartIncluding="2.0.0",
+                                                                versionEndExcluding="2.2.5")),
+    cve("CVE-2024-1002", "2024-01-02", 5.0, criteria=flask_range(versionEndIncluding="1.0")),
+    cve("CVE-2024-1003", "2024-01-02", 4.0, criteria=flask_range(versionStartExcluding="2.0.1")),
+    cve("CVE-2024-1004", "2024-01-02", 3.0, criteria=flask_range()),                 # every version
+    cve("CVE-2024-1005", "2024-01-02", 6.0, criteria=[                               # not vulnerable itself
+        {"vulnerable": False, "criteria": FLASK.format("*")}]),
+]
+
+
+@pytest.fixture(scope="module")
+def cpe_index(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("analyzer")
+    write_feed(tmp_path / "raw", "nvdcve-2.0-2024.json", FEED)
+    ingest_all(raw_dir=tmp_path / "raw", processed_dir=tmp_path / "processed")
+    saved = cpe_mapper._alias_table
+    cpe_mapper.use_alias_table(cpe_mapper.load_alias_table(tmp_path / "processed"))
+    yield open_cpe_index(tmp_path / "processed")
+    cpe_mapper.use_alias_table(saved)
+
+
+def found(cpe_index, version):
+    return sorted(analyze_dependencies([("flask", version)], cpe_index=cpe_index)["cve_id"])
+
+
+@pytest.mark.parametrize("version, expected", [
+    ("2.0.1", ["CVE-2024-1000", "CVE-2024-1001", "CVE-2024-1004"]),
+    ("2.0.2", ["CVE-2024-1001", "CVE-2024-1003", "CVE-2024-1004"]),
+    ("2.2.5", ["CVE-2024-1003", "CVE-2024-1004"]),
+    ("1.0", ["CVE-2024-1002", "CVE-2024-1004"]),
+])
+def test_pinned_version_matches_ranges(cpe_index, version, expected):
+    assert found(cpe_index, version) == expected
+
+
+def test_unpinned_dependency_matches_every_cpe_of_the_product(cpe_index):
+    assert found(cpe_index, "") == [f"CVE-2024-{n}" for n in range(1000, 1006)]
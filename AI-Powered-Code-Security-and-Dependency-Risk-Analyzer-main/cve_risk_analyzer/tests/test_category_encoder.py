@@ -0,0 +1,62 @@
+# tests/test_category_encoder.py
+"""CategoryEncoder gives LabelEncoder's codes for known labels and the unknown id for everything else."""
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.category_encoder import UNKNOWN, CategoryEncoder, load_encoder
+
+TRAIN = ["microsoft", "apache", "google", "apache", "oracle"]
+
+
+@pytest.fixture
+def encoder():
+    return CategoryEncoder.fit(TRAIN)
+
+
+def test_codes_match_label_encoder(encoder):
+    preprocessing = pytest.importorskip("sklearn.preprocessing")
+    labels = preprocessing.LabelEncoder().fit(TRAIN)
+    assert list(encoder.classes_) == list(labels.classes_)
+    assert encoder.transform(TRAIN).tolist() == labels.transform(TRAIN).tolist()
+
+
+@pytest.mark.parametrize("values, codes", [
+    (["google", "never-seen", "apache"], [1, UNKNOWN, 0]),
+    (["never-seen", "also-new"], [UNKNOWN, UNKNOWN]),
+    ([None, np.nan, pd.NA, "oracle"], [UNKNOWN, UNKNOWN, UNKNOWN, 3]),
+    ([None, None], [UNKNOWN, UNKNOWN]),
+    (["Apache", " apache", 1], [UNKNOWN, UNKNOWN, UNKNOWN]),      # no case folding, stripping or casting
+    ([], []),
+])
+def test_unseen_and_missing_values(encoder, values, codes):
+    encoded = encoder.transform(values)
+    assert encoded.dtype == np.int64 and encoded.tolist() == codes
+
+
+def test_custom_unknown_bucket_and_categorical_input():
+    encoder = CategoryEncoder.fit(pd.Series(TRAIN, dtype="category"), unknown=len(set(TRAIN)))
+    values = pd.Series(["oracle", "new", None, "apache"], dtype="category")
+    assert encoder.transform(values).tolist() == [3, 4, 4, 0]
+
+
+def test_inverse_transform(encoder):
+    assert encoder.inverse_transform([0, 3, UNKNOWN, 99]).tolist() == ["apache", "oracle", "UNKNOWN", "UNKNOWN"]
+
+
+def test_classes_must_be_unique():
+    with pytest.raises(ValueError, match="unique"):
+        CategoryEncoder(["a", "a"])
+
+
+def test_load_encoder_accepts_both_pickles(tmp_path, encoder):
+    joblib.dump(encoder, tmp_path / "encoder.pkl")
+    assert load_encoder(tmp_path / "encoder.pkl").transform(["oracle", "x"]).tolist() == [3, UNKNOWN]
+
+    preprocessing = pytest.importorskip("sklearn.preprocessing")
+    joblib.dump(preprocessing.LabelEncoder().fit(TRAIN), tmp_path / "label_encoder.pkl")
+    loaded = load_encoder(tmp_path / "label_encoder.pkl", unknown=-2)
+    assert isinstance(loaded, CategoryEncoder)
+    assert loaded.transform(["oracle", "x"]).tolist() == [3, -2]
@@ -0,0 +1,86 @@
+# tests/test_compressed_io.py
+"""ThreadedReader reads ahead while the caller parses, within its bound, and passes reader errors on."""
+
+import gzip
+import io
+import threading
+import time
+
+import pytest
+
+from src.compressed_io import ThreadedReader, open_feed
+
+CHUNK = 1024
+
+
+class SlowRaw(io.RawIOBase):
+    """A raw stream of `chunks` chunks that takes `delay` seconds per read (like a decompressor)."""
+
+    def __init__(self, chunks, delay=0.0, fail_at=None):
+        super().__init__()
+        self.chunks, self.delay, self.fail_at = chunks, delay, fail_at
+        self.reads = 0
+        self.read_started = [threading.Event() for _ in range(chunks + 2)]
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        self.read_started[min(self.reads, len(self.read_started) - 1)].set()
+        self.reads += 1
+        if self.reads == self.fail_at:
+            raise OSError("corrupt stream")
+        time.sleep(self.delay)
+        return bytes([self.reads % 256]) * CHUNK if self.reads <= self.chunks else b""
+
+
+def test_reads_ahead_while_the_caller_is_busy():
+    raw = SlowRaw(chunks=4)
+    reader = ThreadedReader(raw, chunk_size=CHUNK, max_chunks=2)
+    assert reader.read(CHUNK) == b"\x01" * CHUNK
+    # The caller has not asked for more, yet the next chunks are already being read
+    assert raw.read_started[2].wait(timeout=5)
+    assert reader.read(10 * CHUNK) == b"\x02" * CHUNK
+    reader.close()
+
+
+def test_read_ahead_is_bounded():
+    raw = SlowRaw(chunks=50)
+    reader = ThreadedReader(raw, chunk_size=CHUNK, max_chunks=3)
+    assert raw.read_started[3].wait(timeout=5)
+    time.sleep(0.2)
+    assert raw.reads == 3 + 1       # a full queue, plus the chunk waiting to be put
+    reader.close()                  # does not hang on the full queue
+
+
+def test_slow_reader_overlaps_a_slow_parser():
+    # 20 chunks, 20 ms to read and 20 ms to parse each: ~0.8 s inline, ~0.4 s overlapped
+    def parse(stream):
+        start = time.perf_counter()
+        while stream.read(CHUNK):
+            time.sleep(0.02)
+        return time.perf_counter() - start
+
+    inline = parse(SlowRaw(chunks=20, delay=0.02))
+    threaded = parse(ThreadedReader(SlowRaw(chunks=20, delay=0.02), chunk_size=CHUNK))
+    assert threaded < 0.75 * inline, f"threaded {threaded:.2f}s vs inline {inline:.2f}s"
+
+
+def test_reader_errors_reach_the_caller():
+    reader = ThreadedReader(SlowRaw(chunks=5, fail_at=3), chunk_size=CHUNK)
+    assert reader.read(CHUNK) and reader.read(CHUNK)
+    with pytest.raises(OSError, match="corrupt stream"):
+        reader.read(CHUNK)
+    assert reader.read(CHUNK) == b""
+    reader.close()
+
+
+@pytest.mark.parametrize("threaded", [True, False])
+def test_open_feed_reads_the_whole_gzip_feed(tmp_path, threaded):
+    data = b"".join(b'{"id": %d}\n' % i for i in range(50_000))
+    path = tmp_path / "feed.json.gz"
+    path.write_bytes(gzip.compress(data))
+    with open_feed(path, "rb", threaded=threaded, chunk_size=4096, max_chunks=2) as fh:
+        assert fh.read() == data
+    with open_feed(path, "rt", threaded=threaded) as fh:
+        assert fh.readline() == '{"id": 0}\n'
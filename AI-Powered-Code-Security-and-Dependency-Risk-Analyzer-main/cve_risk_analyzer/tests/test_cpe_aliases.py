@@ -0,0 +1,78 @@
+# tests/test_cpe_aliases.py
+"""AliasTable ranking (rank, vendor affinity, CVE count), overrides, and non-ASCII names."""
+
+import pytest
+
+from src.cpe_aliases import AliasTable
+from src.cpe_index import open_cpe_index
+from src.nvd_ingest import ingest_all
+from tests.nvd_feeds import cve, write_feed
+
+CATALOG = [  # vendor, product, CVEs
+    ("openldap", "ldap", 1),
+    ("python-ldap", "python-ldap", 40),     # "ldap" only as a rank 1 alias
+    ("debian", "pillow", 50),
+    ("pillow", "pillow", 1),                # vendor named like the package
+    ("alpha", "requests", 3),
+    ("beta", "requests", 10),               # most CVEs
+    ("jose_project", "jose", 2),            # python-jose only as a rank 2 alias
+    ("müller", "café-lib", 1),
+]
+
+
+@pytest.fixture
+def table():
+    vendors, products, counts = zip(*CATALOG)
+    return AliasTable.build(vendors, products, counts)
+
+
+@pytest.mark.parametrize("package, expected", [
+    ("ldap", ("openldap", "ldap")),                 # rank 0 beats a stripped python- prefix
+    ("python-ldap", ("python-ldap", "python-ldap")),
+    ("Pillow", ("pillow", "pillow")),               # vendor affinity beats CVE count
+    ("requests", ("beta", "requests")),             # then the most CVEs
+    ("python-jose", ("jose_project", "jose")),
+    ("python_jose", ("jose_project", "jose")),      # PEP 503 variants are one alias
+    ("Café_Lib", ("müller", "café-lib")),
+    ("no-such-package", None),
+])
+def test_lookup_ranking(table, package, expected):
+    assert table.lookup(package) == expected
+
+
+def test_collisions_count_claimants(table):
+    collisions = table.collisions().set_index("alias")
+    assert collisions.loc["pillow", "cpe_vendor"] == "pillow"
+    assert collisions.loc["pillow", "candidates"] == 2
+    assert collisions.loc["requests", "cpe_vendor"] == "beta"
+    assert "café-lib" not in collisions.index
+
+
+def test_overrides_win_and_change_the_fingerprint(table):
+    overridden = AliasTable(table.names, table.vendors, table.products, table.candidates,
+                            overrides={"requests": ("psf", "requests")})
+    assert overridden.lookup("Requests") == ("psf", "requests")
+    assert overridden.fingerprint != table.fingerprint
+
+
+def test_save_load_round_trip(table, tmp_path):
+    table.save(tmp_path / "aliases")
+    loaded = AliasTable.load(tmp_path / "aliases")
+    for package, *_ in CATALOG:
+        assert loaded.lookup(package) == table.lookup(package)
+    assert loaded.collisions().equals(table.collisions())
+
+
+def test_non_ascii_keys_in_the_index(tmp_path):
+    feed = [cve("CVE-2024-0001", "2024-01-02", 5.0, criteria=[
+        {"vulnerable": True, "criteria": "cpe:2.3:a:müller:café-lib:1.0:*:*:*:*:*:*:*"}])]
+    write_feed(tmp_path / "raw", "nvdcve-2.0-2024.json", feed)
+    ingest_all(raw_dir=tmp_path / "raw", processed_dir=tmp_path / "processed")
+
+    index = open_cpe_index(tmp_path / "processed")
+    assert index.vendors() == ["müller"]
+    assert index.products() == ["café-lib"]
+    rows = index.frame(index.postings(index.key_id("müller", "café-lib")), record_columns=["cve_id"])
+    assert rows[["cpe_vendor", "cpe_product"]].values.tolist() == [["müller", "café-lib"]]
+    assert index.aliases().lookup("cafe-lib") is None
+    assert index.aliases().lookup("Café-Lib") == ("müller", "café-lib")
@@ -0,0 +1,30 @@
+# tests/test_cpe_index.py
+"""The CPE index does not depend on how ingestion batched the rows, even mid-CVE."""
+
+import numpy as np
+import pytest
+
+from src.cpe_index import open_cpe_index
+from src.nvd_ingest import normalize_items, open_dataset_writer
+from tests.nvd_feeds import cve
+
+# CVE-2024-0002 spans more rows than a batch, so some batches start no record
+ROWS = list(normalize_items([
+    cve("CVE-2024-0001", "2024-01-02", 5.0),
+    cve("CVE-2024-0002", "2024-01-02", 7.5, [f"2.0.{v}" for v in range(7)]),
+    cve("CVE-2024-0003", "2024-01-02", 9.8, ["2.1.0", "2.1.1"]),
+]))
+
+
+@pytest.mark.parametrize("row_group_size", [1, 2, 3, len(ROWS)])
+def test_records_survive_any_batching(tmp_path, row_group_size):
+    with open_dataset_writer(tmp_path, row_group_size=row_group_size) as writer:
+        writer.write_rows(ROWS)
+
+    index = open_cpe_index(tmp_path)
+    positions = index.postings(index.key_id("palletsprojects", "flask"))
+    records = index.record_frame(index.records(positions), ["cve_id", "description"])
+    assert records["cve_id"].tolist() == ["CVE-2024-0001", "CVE-2024-0002", "CVE-2024-0003"]
+    assert records["description"].tolist() == [f"{c} at 2024-01-02" for c in records["cve_id"]]
+    assert records["cvss_base_score"].tolist() == [5.0, 7.5, 9.8]
+    assert np.bincount(index.post_record[positions]).tolist() == [1, 7, 2]
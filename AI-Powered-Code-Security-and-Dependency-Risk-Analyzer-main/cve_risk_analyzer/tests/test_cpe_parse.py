@@ -0,0 +1,39 @@
+# tests/test_cpe_parse.py
+"""split_cpe_column() splits on unescaped colons only, and agrees with parse_cpe()."""
+
+import pyarrow as pa
+import pytest
+
+from src.cpe_parse import CPE_ATTRIBUTES, parse_cpe, split_cpe_column
+
+CASES = [  # uri, expected (vendor, product, version, target_sw)
+    ("cpe:2.3:a:palletsprojects:flask:2.0.1:*:*:*:*:python:*:*", ("palletsprojects", "flask", "2.0.1", "python")),
+    (r"cpe:2.3:a:acme:a\:b:1.0:*:*:*:*:*:*:*", ("acme", r"a\:b", "1.0", "*")),             # escaped colon
+    (r"cpe:2.3:a:acme:dir\\:1.0:*:*:*:*:*:*:*", ("acme", "dir\\\\", "1.0", "*")),           # escaped backslash
+    (r"cpe:2.3:a:acme:x\\\:y:2:*:*:*:*:*:*:*", ("acme", r"x\\\:y", "2", "*")),             # both, back to back
+    (r"cpe:2.3:a:acme:tool:1.0\:rc1:*:*:*:*:*:*:*", ("acme", "tool", r"1.0\:rc1", "*")),
+    (r"cpe:2.3:a:acme:c\+\+:*:*:*:*:*:*:*:*", ("acme", r"c\+\+", "*", "*")),               # other escapes kept
+    ("cpe:2.3:a:acme", ("acme", "", "", "")),                                                # truncated
+    ("", ("", "", "", "")),
+]
+
+
+@pytest.mark.parametrize("uri, expected", CASES)
+def test_split_cpe_column(uri, expected):
+    table = split_cpe_column(pa.array([uri]), ["vendor", "product", "version", "target_sw"])
+    assert tuple(table[name][0].as_py() for name in table.column_names) == expected
+
+
+def test_column_matches_scalar_parser():
+    uris = [uri for uri, _ in CASES] + [None]
+    table = split_cpe_column(uris)
+    assert table.column_names == CPE_ATTRIBUTES
+    for i, uri in enumerate(uris):
+        assert {name: table[name][i].as_py() for name in CPE_ATTRIBUTES} == parse_cpe(uri)
+
+
+def test_attributes_are_dictionary_encoded():
+    table = split_cpe_column(pa.chunked_array([[CASES[0][0]] * 3, [CASES[1][0]]]), ["vendor", "product"])
+    assert pa.types.is_dictionary(table["vendor"].type)
+    assert table["vendor"].to_pylist() == ["palletsprojects"] * 3 + ["acme"]
+    assert len(table["product"].chunk(0).dictionary) == 2
@@ -0,0 +1,123 @@
+# tests/test_cve_store.py
+"""Both dataset layouts read back as the same flat rows; the CPE catalog counts each CVE occurrence once."""
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.cve_store import (ROW_SCHEMA, CpeCatalog, has_normalized, iter_flat_batches, load_cpe_catalog, load_flat,
+                           load_flat_table)
+from src.nvd_ingest import ingest_all, normalize_items, open_dataset_writer, rows_to_table
+from tests.nvd_feeds import FLASK, cve, write_feed
+
+ITEMS = [
+    cve("CVE-2024-0001", "2024-01-02", 5.0, ["2.0.1", "2.0.2", "2.0.3"]),
+    cve("CVE-2024-0002", "2024-01-02", 7.5, criteria=[
+        {"vulnerable": True, "criteria": FLASK.format("*"), "versionStartIncluding": "2.0",
+         "versionEndExcluding": "2.2.5"},
+        {"vulnerable": False, "criteria": "cpe:2.3:o:linux:linux_kernel:*:*:*:*:*:*:*:*"}]),
+    cve("CVE-2024-0003", "2024-01-02", 9.8, criteria=[
+        {"vulnerable": True, "criteria": r"cpe:2.3:a:acme:a\:b:1.0:*:*:*:*:*:*:*"}]),
+    cve("CVE-2024-0001", "2024-02-01", 6.0),       # a second copy of a CVE is its own occurrence
+]
+ROWS = list(normalize_items(ITEMS))
+
+
+def write(processed_dir, layout, row_group_size=2):
+    processed_dir.mkdir(parents=True)
+    with open_dataset_writer(processed_dir, layout, row_group_size=row_group_size) as writer:
+        writer.write_rows(ROWS)
+    return processed_dir
+
+
+@pytest.fixture(scope="module")
+def layouts(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp("layouts")
+    return {layout: write(tmp_path / layout, layout) for layout in ("flat", "normalized")}
+
+
+def test_normalized_round_trips_through_load_flat(layouts):
+    assert has_normalized(layouts["normalized"]) and not has_normalized(layouts["flat"])
+    expected = rows_to_table(ROWS).to_pylist()
+    for processed_dir in layouts.values():
+        assert load_flat_table(processed_dir).to_pylist() == expected
+        frame = load_flat(processed_dir)
+        assert list(frame.columns) == ROW_SCHEMA.names
+        assert frame.astype(object).where(frame.notna(), None).to_dict("records") == expected
+
+
+def test_load_flat_column_subset(layouts):
+    columns = ["cpe_product", "cve_id", "version_end_excluding", "cvss_base_score"]
+    frames = [load_flat(d, columns) for d in layouts.values()]
+    assert list(frames[1].columns) == columns
+    assert frames[0].astype(object).equals(frames[1].astype(object))
+    assert isinstance(frames[1]["cve_id"].dtype, pd.CategoricalDtype)    # shared strings
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 100])
+def test_iter_flat_batches_matches_load_flat(layouts, batch_size):
+    expected = rows_to_table(ROWS).to_pylist()
+    for processed_dir in layouts.values():
+        batches = list(iter_flat_batches(processed_dir, batch_size))
+        assert all(batch.schema.equals(ROW_SCHEMA) for batch in batches)
+        assert [row for batch in batches for row in batch.to_pylist()] == expected
+
+
+# ---------------- CPE catalog ----------------
+def published(item, date):
+    item["cve"]["published"] = date
+    return item
+
+
+YEARLY = [
+    published(cve("CVE-2023-0001", "2023-05-01", 5.0, ["2.0.1", "2.0.2"]), "2023-03-01"),
+    published(cve("CVE-2024-0001", "2024-01-02", 7.0), "2024-01-01"),
+    published(cve("CVE-2024-0002", "2024-01-02", 4.0, criteria=[    # one CPE, two ranges: one CVE
+        {"vulnerable": True, "criteria": FLASK.format("*"), "versionEndExcluding": "1.0"},
+        {"vulnerable": True, "criteria": FLASK.format("*"), "versionStartIncluding": "2.0"}]), "2024-01-01"),
+]
+MODIFIED = [
+    published(cve("CVE-2024-0001", "2024-03-01", 9.1, ["2.0.2"]), "2024-01-01"),     # newer copy
+    published(cve("CVE-2024-0003", "2024-03-01", 6.0, ["2.0.2"]), "2024-02-15"),
+]
+# (version, cve_count, max_cvss_score, first_published, last_published) of the flask CPEs
+CATALOG = [
+    ("*", 1, 4.0, "2024-01-01", "2024-01-01"),
+    ("2.0.1", 1, 5.0, "2023-03-01", "2023-03-01"),
+    ("2.0.2", 3, 9.1, "2023-03-01", "2024-02-15"),
+]
+
+
+def catalog_rows(processed_dir):
+    catalog = load_cpe_catalog(processed_dir)
+    assert (catalog["cpe_product"] == "flask").all()
+    return [tuple(row) for row in catalog.drop(columns=["cpe_vendor", "cpe_product"]).itertuples(index=False)]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_catalog_counts_each_cve_once_across_overlapping_feeds(tmp_path, workers):
+    write_feed(tmp_path / "raw", "nvdcve-2.0-2024.json", YEARLY)
+    write_feed(tmp_path / "raw", "nvdcve-2.0-modified.json", MODIFIED)
+    ingest_all(workers=workers, row_group_size=2, raw_dir=tmp_path / "raw", processed_dir=tmp_path / "processed")
+    assert catalog_rows(tmp_path / "processed") == CATALOG
+
+
+def test_incremental_catalog_matches_full(tmp_path):
+    write_feed(tmp_path / "raw", "nvdcve-2.0-2024.json", YEARLY)
+    ingest_all(raw_dir=tmp_path / "raw", processed_dir=tmp_path / "processed")
+    write_feed(tmp_path / "raw", "nvdcve-2.0-modified.json", MODIFIED)
+    ingest_all(incremental=True, raw_dir=tmp_path / "raw", processed_dir=tmp_path / "processed")
+    assert catalog_rows(tmp_path / "processed") == CATALOG
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 3])
+def test_catalog_does_not_depend_on_batching(batch_size):
+    table = rows_to_table(ROWS)
+    whole, batched = CpeCatalog(), CpeCatalog()
+    whole.update(table)
+    for batch in table.to_batches(max_chunksize=batch_size):
+        batched.update(pa.Table.from_batches([batch]))
+    assert batched.to_frame().equals(whole.to_frame())
+    # The two copies of CVE-2024-0001 are two occurrences; its three 2.0.x CPEs one each
+    counts = whole.to_frame().set_index(["cpe_product", "cpe_version"])["cve_count"]
+    assert counts[("flask", "2.0.1")] == 2 and counts[("flask", "2.0.2")] == 1
@@ -0,0 +1,21 @@
+# tests/test_import_time.py
+"""Which heavy modules the CLI's scan paths import (timings: benchmarks/bench_import_time.py)."""
+
+import pytest
+
+from benchmarks.bench_import_time import DATASET_MODULES, MODEL_MODULES, forbidden_loaded, profile_commands
+
+
+@pytest.fixture(scope="module")
+def profiles():
+    # Only the module sets are checked, so one run per command is enough
+    return profile_commands(runs=1, names=["scan --url", "scan"])
+
+
+def test_scan_url_loads_no_dataset_or_model_modules(profiles):
+    assert forbidden_loaded(profiles, "scan --url", DATASET_MODULES + MODEL_MODULES) == []
+
+
+def test_local_scan_loads_no_model_modules(profiles):
+    assert forbidden_loaded(profiles, "scan", MODEL_MODULES) == []
+    assert set(DATASET_MODULES) <= profiles["scan"][1]   # sanity: the profile saw the real imports
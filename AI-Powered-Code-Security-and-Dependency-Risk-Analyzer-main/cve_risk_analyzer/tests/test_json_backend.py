@@ -0,0 +1,49 @@
+# tests/test_json_backend.py
+""""auto" keeps streaming with ijson, C backend or not; orjson streams only when asked for."""
+
+import io
+
+import pytest
+
+from src import json_backend
+
+DOC = b'{"format": "NVD_CVE", "vulnerabilities": [{"id": 1}, {"id": 2.5}], "default": {"a": 1}}'
+
+
+@pytest.fixture(params=["yajl2_c", "python"])
+def ijson_backend(request, monkeypatch):
+    if json_backend.ijson is None:
+        pytest.skip("ijson is not installed")
+    monkeypatch.setattr(json_backend.ijson, "backend", request.param)
+    return request.param
+
+
+def test_auto_streams_with_ijson_even_without_c_backend(ijson_backend):
+    assert json_backend.resolve_backend("auto", streaming=True) == "ijson"
+
+
+def test_auto_whole_document_load_prefers_orjson(monkeypatch):
+    monkeypatch.setattr(json_backend, "orjson", object())
+    assert json_backend.resolve_backend("auto", streaming=False) == "orjson"
+    monkeypatch.setattr(json_backend, "orjson", None)
+    assert json_backend.resolve_backend("auto", streaming=False) == "json"
+
+
+def test_auto_without_ijson_falls_back_to_whole_document(monkeypatch):
+    monkeypatch.setattr(json_backend, "ijson", None)
+    monkeypatch.setattr(json_backend, "orjson", None)
+    assert json_backend.resolve_backend("auto", streaming=True) == "json"
+
+
+def test_explicit_backend_is_kept_or_rejected(monkeypatch):
+    if json_backend.orjson is not None:
+        assert json_backend.resolve_backend("orjson", streaming=True) == "orjson"
+    monkeypatch.setattr(json_backend, "orjson", None)
+    with pytest.raises(ValueError, match="not available"):
+        json_backend.resolve_backend("orjson")
+
+
+@pytest.mark.parametrize("backend", ["auto"] + json_backend.available_backends())
+def test_backends_decode_the_same_items(backend):
+    assert list(json_backend.iter_items(io.BytesIO(DOC), "vulnerabilities.item", backend)) == [{"id": 1}, {"id": 2.5}]
+    assert list(json_backend.iter_kv_items(io.BytesIO(DOC), "default", backend)) == [("a", 1)]
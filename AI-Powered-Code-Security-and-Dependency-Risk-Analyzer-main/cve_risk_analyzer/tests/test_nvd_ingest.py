@@ -0,0 +1,107 @@
+# tests/test_nvd_ingest.py
+"""Full (serial and --workers) and incremental ingest build the same dataset from overlapping feeds."""
+
+import shutil
+
+import pyarrow.parquet as pq
+import pytest
+
+from src.cve_store import NORMALIZED_DIR
+from src.nvd_ingest import ingest_all, normalize_items, open_dataset_writer, rows_to_table
+from tests.nvd_feeds import cve, write_feed
+
+YEARLY = [
+    cve("CVE-2024-0001", "2024-01-02", 8.0, ["2.0.1", "2.0.2"]),
+    cve("CVE-2024-0002", "2024-01-02", 5.0),
+    cve("CVE-2024-0003", "2024-01-02", 7.0),
+    cve("CVE-2024-0004", "2024-03-01", 6.0),
+]
+MODIFIED = [
+    cve("CVE-2024-0001", "2024-02-01", 9.9),                   # updated
+    cve("CVE-2024-0003", "2024-02-01", 7.0, rejected=True),    # rejected
+    cve("CVE-2024-0004", "2024-02-01", 1.0),                   # older than the yearly copy
+    cve("CVE-2024-0005", "2024-02-01", 4.0),                   # new
+]
+
+
+def dataset(processed_dir):
+    table = pq.read_table(processed_dir / "cve_cpe.parquet").to_pandas()
+    return table.sort_values(["cve_id", "cpe_version"]).reset_index(drop=True)
+
+
+def ingest(tmp_path, name, feeds, **opts):
+    raw_dir, processed_dir = tmp_path / name / "raw", tmp_path / name / "processed"
+    for feed, items in feeds.items():
+        write_feed(raw_dir, feed, items)
+    ingest_all(raw_dir=raw_dir, processed_dir=processed_dir, **opts)
+    return raw_dir, processed_dir
+
+
+@pytest.fixture
+def full(tmp_path):
+    _, processed_dir = ingest(tmp_path, "full", {"nvdcve-2.0-2024.json": YEARLY,
+                                                 "nvdcve-2.0-modified.json": MODIFIED})
+    return dataset(processed_dir)
+
+
+def test_full_ingest_keeps_the_newest_copy(full):
+    scores = full.groupby("cve_id")["cvss_base_score"].agg(set).to_dict()
+    assert scores == {"CVE-2024-0001": {9.9}, "CVE-2024-0002": {5.0}, "CVE-2024-0004": {6.0},
+                      "CVE-2024-0005": {4.0}}
+    assert (full["cve_id"] == "CVE-2024-0001").sum() == 1    # the update dropped a CPE too
+
+
+def test_parallel_full_ingest_matches_serial(tmp_path, full):
+    _, processed_dir = ingest(tmp_path, "parallel", {"nvdcve-2.0-2024.json": YEARLY,
+                                                     "nvdcve-2.0-modified.json": MODIFIED}, workers=2)
+    assert dataset(processed_dir).equals(full)
+
+
+def test_incremental_after_full_matches_full(tmp_path, full):
+    raw_dir, processed_dir = ingest(tmp_path, "delta", {"nvdcve-2.0-2024.json": YEARLY})
+    write_feed(raw_dir, "nvdcve-2.0-modified.json", MODIFIED)
+    ingest_all(incremental=True, raw_dir=raw_dir, processed_dir=processed_dir)
+    assert dataset(processed_dir).equals(full)
+
+    # Re-running over the same feeds changes nothing
+    ingest_all(incremental=True, raw_dir=raw_dir, processed_dir=processed_dir)
+    assert dataset(processed_dir).equals(full)
+
+
+def test_incremental_after_full_of_the_same_feeds_is_a_no_op(tmp_path, full):
+    raw_dir, processed_dir = ingest(tmp_path, "same", {"nvdcve-2.0-2024.json": YEARLY,
+                                                       "nvdcve-2.0-modified.json": MODIFIED})
+    shutil.copy(processed_dir / "cve_cpe.parquet", tmp_path / "before.parquet")
+    ingest_all(incremental=True, raw_dir=raw_dir, processed_dir=processed_dir)
+    assert dataset(processed_dir).equals(full)
+    assert pq.read_table(tmp_path / "before.parquet").equals(pq.read_table(processed_dir / "cve_cpe.parquet"))
+
+
+# ---------------- Chunked writer ----------------
+ROWS = list(normalize_items(cve(f"CVE-2024-{i:04d}", "2024-01-02", i % 10, [f"2.0.{v}" for v in range(i % 4 + 1)])
+                            for i in range(1, 30)))
+OUTPUTS = ["cve_cpe.csv", "unique_cpes.csv"]
+TABLES = ["cve_cpe.parquet"] + [f"{NORMALIZED_DIR}/{n}.parquet" for n in ("cves", "cve_cpe", "cpes")]
+
+
+def write_dataset(processed_dir, write, row_group_size):
+    processed_dir.mkdir(parents=True)
+    with open_dataset_writer(processed_dir, "both", row_group_size=row_group_size) as writer:
+        write(writer)
+    return processed_dir
+
+
+@pytest.mark.parametrize("row_group_size", [1, 4, 7])
+def test_chunked_writer_matches_a_single_write(tmp_path, row_group_size):
+    one = write_dataset(tmp_path / "one", lambda w: w.write_rows(ROWS), len(ROWS))
+    chunked = write_dataset(tmp_path / "chunked", lambda w: w.write_rows(ROWS), row_group_size)
+    # Rows and whole tables through one writer (the merge and upsert paths mix both)
+    mixed = write_dataset(tmp_path / "mixed", lambda w: (w.write_rows(ROWS[:5]), w.write_table(rows_to_table(ROWS[5:]))),
+                          row_group_size)
+
+    assert pq.ParquetFile(chunked / "cve_cpe.parquet").num_row_groups == -(-len(ROWS) // row_group_size)
+    for processed_dir in (chunked, mixed):
+        for name in OUTPUTS:
+            assert (processed_dir / name).read_bytes() == (one / name).read_bytes(), name
+        for name in TABLES:    # dictionary columns get one dictionary per batch: compare values
+            assert pq.read_table(processed_dir / name).to_pylist() == pq.read_table(one / name).to_pylist(), name
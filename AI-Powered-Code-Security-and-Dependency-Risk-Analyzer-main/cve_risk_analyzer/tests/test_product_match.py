@@ -0,0 +1,27 @@
+# tests/test_product_match.py
+"""Canonical requirement names (PEP 503, "-" separators) still find "_" and "." CPE products."""
+
+import pytest
+
+from src.product_match import match_products
+from src.requirements_parser import canonicalize_name
+
+PRODUCTS = ["typing_extensions", "ruamel.yaml", "zope.interface", "job_recruitment", "flask", "flask_admin"]
+
+
+@pytest.mark.parametrize("mode", ["contains", "exact"])
+@pytest.mark.parametrize("name, product", [
+    ("typing_extensions", "typing_extensions"),
+    ("ruamel.yaml", "ruamel.yaml"),
+    ("zope.interface", "zope.interface"),
+    ("Job_Recruitment", "job_recruitment"),
+])
+def test_separator_products_match(mode, name, product):
+    pkg = canonicalize_name(name)
+    assert product in match_products([pkg], PRODUCTS, mode)[pkg]
+
+
+def test_contains_is_still_a_substring_match():
+    assert match_products(["flask"], PRODUCTS)["flask"] == ["flask", "flask_admin"]
+    assert match_products(["flask-admin"], PRODUCTS)["flask-admin"] == ["flask_admin"]
+    assert match_products([""], PRODUCTS)[""] == PRODUCTS
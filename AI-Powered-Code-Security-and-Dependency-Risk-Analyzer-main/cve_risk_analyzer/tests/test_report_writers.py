@@ -0,0 +1,75 @@
+# tests/test_report_writers.py
+"""Streamed reports hold the same rows as one collected frame; CSV is byte-identical to DataFrame.to_csv."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from src.report_writers import open_report_writer
+
+COLUMNS = ["dependency", "cve_id", "severity", "score", "description"]
+FRAMES = [
+    pd.DataFrame({"dependency": ["flask==2.0.1"] * 2, "cve_id": ["CVE-2024-0001", "CVE-2024-0002"],
+                  "severity": ["HIGH", "LOW"], "score": [7.5, 9.0],
+                  "description": ['quotes "here", and commas', "line one\nline two"]}),
+    pd.DataFrame({"dependency": ["django"], "cve_id": ["CVE-2024-0003"], "severity": [None],
+                  "score": [np.nan], "description": ["ünïcode – ✓"]}),
+    pd.DataFrame({"cve_id": ["CVE-2024-0004"], "dependency": ["requests==2.31.0"],   # other column order,
+                  "score": [5.0], "extra": ["dropped"]}),                           # a missing and an extra column
+]
+RECORDS = [{"dependency": "six", "cve_id": "CVE-2024-0005", "severity": "MEDIUM", "score": 4.3,
+            "description": "trailing space "}]
+
+
+def stream(path, batch_size, fmt=None):
+    with open_report_writer(path, COLUMNS, fmt, batch_size=batch_size, flush_seconds=3600) as writer:
+        writer.write_frame(FRAMES[0])
+        writer.write(RECORDS[0])
+        writer.write_frame(FRAMES[1])
+        writer.write_frame(FRAMES[2].iloc[:0])      # empty frames are skipped
+        writer.write_frame(FRAMES[2])
+    return writer
+
+
+def collected():
+    frames = [FRAMES[0], pd.DataFrame(RECORDS), FRAMES[1], FRAMES[2]]
+    return pd.concat(frames, ignore_index=True).reindex(columns=COLUMNS)
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 3, 100])
+def test_csv_is_byte_identical_to_to_csv(tmp_path, batch_size):
+    writer = stream(tmp_path / "report.csv", batch_size)
+    collected().to_csv(tmp_path / "expected.csv", index=False)
+    assert (tmp_path / "report.csv").read_bytes() == (tmp_path / "expected.csv").read_bytes()
+    assert writer.rows_written == 5
+
+
+def test_empty_csv_has_the_header(tmp_path):
+    with open_report_writer(tmp_path / "empty.csv", COLUMNS):
+        pass
+    pd.DataFrame(columns=COLUMNS).to_csv(tmp_path / "expected.csv", index=False)
+    assert (tmp_path / "empty.csv").read_bytes() == (tmp_path / "expected.csv").read_bytes()
+
+
+@pytest.mark.parametrize("batch_size", [1, 100])
+def test_jsonl_and_parquet_hold_the_same_rows(tmp_path, batch_size):
+    expected = collected()
+    stream(tmp_path / "report.ndjson", batch_size)
+    lines = [json.loads(line) for line in (tmp_path / "report.ndjson").read_text(encoding="utf-8").splitlines()]
+    assert lines == json.loads(expected.to_json(orient="records", force_ascii=False))
+
+    stream(tmp_path / "report.parquet", batch_size)
+    table = pq.read_table(tmp_path / "report.parquet")
+    assert table.column_names == COLUMNS and str(table.schema.field("score").type) == "double"
+    pd.testing.assert_frame_equal(table.to_pandas().astype(object).where(table.to_pandas().notna(), None),
+                                  expected.astype(object).where(expected.notna(), None))
+
+
+def test_unknown_format(tmp_path):
+    with pytest.raises(ValueError, match="Cannot tell the report format"):
+        open_report_writer(tmp_path / "report.txt", COLUMNS)
+    with pytest.raises(ValueError, match="Unknown report format"):
+        open_report_writer(tmp_path / "report.csv", COLUMNS, "xml")
@@ -0,0 +1,131 @@
+# tests/test_requirements_parser.py
+"""requirements.txt, poetry.lock and Pipfile.lock edge cases the shared parser must get right."""
+
+import json
+
+import pytest
+
+from src import json_backend
+from src.requirements_parser import (Dependency, dependency_frame, iter_dependencies, iter_pipfile_lock,
+                                     iter_poetry_lock, iter_requirements, pinned_version)
+
+REQUIREMENTS = """\
+# a comment line
+Flask==2.0.1  # pinned inline comment
+Django_Rest.Framework>=3.14,<4
+requests[socks, Security]==2.31.0 ; python_version < "3.8"
+cryptography==41.0.0 \\
+    --hash=sha256:aaaa \\
+    --hash=sha256:bbbb
+urllib3==2.0.7 --hash=sha256:cccc
+arrow===1.2.3+local
+numpy==1.26.*
+-e git+https://github.com/acme/Tool_Kit.git@main#egg=Tool_Kit
+--editable=git+https://github.com/acme/other.git#subdirectory=x&egg=other.pkg
+-e .
+-r base.txt
+--index-url https://pypi.example/simple
+pkg_url @ https://example.com/pkg_url-1.0.zip#sha256=dddd
+not a requirement line !
+tail==1.0 \\
+"""
+
+
+def test_requirements_edge_cases():
+    deps = {d.name: d for d in iter_requirements(REQUIREMENTS.splitlines(keepends=True))}
+    assert list(deps) == ["flask", "django-rest-framework", "requests", "cryptography", "urllib3", "arrow",
+                          "numpy", "tool-kit", "other-pkg", "pkg-url", "tail"]
+    assert deps["flask"] == Dependency("flask", "2.0.1", "==2.0.1", "", "")
+    assert deps["django-rest-framework"] == Dependency("django-rest-framework", "", ">=3.14,<4", "", "")
+    assert deps["requests"] == Dependency("requests", "2.31.0", "==2.31.0", "security,socks", 'python_version < "3.8"')
+    assert deps["cryptography"].version == "41.0.0"       # "\" continuation with --hash lines
+    assert deps["urllib3"].version == "2.0.7"             # inline --hash
+    assert deps["arrow"].version == "1.2.3+local"         # === pin
+    assert deps["numpy"] == Dependency("numpy", "", "==1.26.*", "", "")    # wildcard: not a pin
+    assert deps["tool-kit"] == Dependency("tool-kit", "", "", "", "")      # -e ...#egg=
+    assert deps["pkg-url"].specifier == "@https://example.com/pkg_url-1.0.zip#sha256=dddd"
+    assert deps["tail"].version == "1.0"                  # continuation at end of file
+
+
+def test_crlf_lines():
+    assert [d.name for d in iter_requirements(["flask==2.0.1 \\\r\n", "  --hash=sha256:a\r\n", "six\r\n"])] == [
+        "flask", "six"]
+
+
+@pytest.mark.parametrize("specifier, version", [
+    ("==1.0", "1.0"), ("===1.0", "1.0"), (" == 1.0 ", "1.0"), ("==1.*", ""), ("==1.0,!=1.1", ""),
+    (">=1.0", ""), ("~=1.0", ""), ("", ""), ("@git+https://x/y.git", ""),
+])
+def test_pinned_version(specifier, version):
+    assert pinned_version(specifier) == version
+
+
+POETRY_LOCK = """\
+# This file is automatically @generated by Poetry
+[[package]]
+name = "Flask"
+version = "2.0.1"
+description = "A \\"micro\\" framework"
+optional = false
+
+[package.dependencies]
+Werkzeug = ">=2.0"
+name = "not-a-package"
+
+[package.extras]
+dotenv = ["python-dotenv"]
+
+[[package]]
+name = "typing_extensions"
+version = "4.8.0"
+
+[[package]]
+name = "no-version"
+
+[metadata]
+lock-version = "2.0"
+"""
+
+
+def test_poetry_lock():
+    assert [(d.name, d.version, d.specifier) for d in iter_poetry_lock(POETRY_LOCK.splitlines())] == [
+        ("flask", "2.0.1", "==2.0.1"), ("typing-extensions", "4.8.0", "==4.8.0"), ("no-version", "", "")]
+
+
+PIPFILE_LOCK = {
+    "_meta": {"hash": {"sha256": "x"}, "sources": []},
+    "default": {
+        "flask": {"hashes": ["sha256:a"], "version": "==2.0.1"},
+        "Requests": {"extras": ["socks", "security"], "version": "==2.31.0", "markers": "python_version >= '3.7'"},
+        "tool_kit": {"git": "https://github.com/acme/tool_kit.git", "ref": "abc123"},
+        "numpy": {"version": "==1.26.*"},
+        "anything": {"version": "*"},
+    },
+    "develop": {"pytest": {"version": "==7.4.0"}},
+}
+
+
+@pytest.mark.parametrize("backend", json_backend.available_backends())
+def test_pipfile_lock(tmp_path, backend):
+    path = tmp_path / "Pipfile.lock"
+    path.write_text(json.dumps(PIPFILE_LOCK))
+    assert list(iter_pipfile_lock(path, backend=backend)) == [
+        Dependency("flask", "2.0.1", "==2.0.1", "", ""),
+        Dependency("requests", "2.31.0", "==2.31.0", "security,socks", "python_version >= '3.7'"),
+        Dependency("tool-kit", "", "@git+https://github.com/acme/tool_kit.git@abc123", "", ""),
+        Dependency("numpy", "", "==1.26.*", "", ""),
+        Dependency("anything", "", "*", "", ""),
+        Dependency("pytest", "7.4.0", "==7.4.0", "", ""),
+    ]
+
+
+def test_format_detection_and_frame(tmp_path):
+    (tmp_path / "poetry.lock").write_text(POETRY_LOCK)
+    (tmp_path / "Pipfile.lock").write_text(json.dumps(PIPFILE_LOCK))
+    (tmp_path / "requirements-dev.txt").write_text(REQUIREMENTS)
+    assert [d.name for d in iter_dependencies(tmp_path / "poetry.lock")][0] == "flask"
+    assert [d.name for d in iter_dependencies(tmp_path / "Pipfile.lock")][-1] == "pytest"
+    frame = dependency_frame(tmp_path / "requirements-dev.txt")
+    assert list(frame.columns) == ["package", "version"] and len(frame) == 11
+    with pytest.raises(ValueError, match="Unknown manifest format"):
+        list(iter_dependencies(tmp_path / "poetry.lock", "conda"))
@@ -0,0 +1,96 @@
+# tests/test_result_cache.py
+"""ResultCache levels (miss, memory, disk), LRU eviction and invalidation by dataset fingerprint."""
+
+import pandas as pd
+import pytest
+
+from src.nvd_ingest import ingest_all
+from src.result_cache import CACHE_FILE, ResultCache, cached_lookup, dataset_fingerprint, prune_cache
+from tests.nvd_feeds import cve, write_feed
+
+FRAME = pd.DataFrame({"dependency": ["flask==2.0.1"], "cve_id": ["CVE-2024-0001"], "score": [9.8]})
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(tmp_path / CACHE_FILE, "fp-1")
+
+
+def test_miss_then_memory_then_disk(tmp_path, cache):
+    assert cache.get("analyzer", "flask", "2.0.1", "index") is None
+    cache.put_many("analyzer", "index", {("flask", "2.0.1"): FRAME})
+    assert cache.get("analyzer", "flask", "2.0.1", "index") is FRAME
+    assert (cache.misses, cache.memory_hits, cache.disk_hits) == (1, 1, 0)
+
+    other_process = ResultCache(tmp_path / CACHE_FILE, "fp-1")
+    pd.testing.assert_frame_equal(other_process.get("analyzer", "flask", "2.0.1", "index"), FRAME)
+    other_process.get("analyzer", "flask", "2.0.1", "index")
+    assert (other_process.misses, other_process.memory_hits, other_process.disk_hits) == (0, 1, 1)
+
+
+@pytest.mark.parametrize("key", [
+    ("mapper", "flask", "2.0.1", "index"),      # another scope
+    ("analyzer", "flask", "2.0.2", "index"),    # another version
+    ("analyzer", "flask", "2.0.1", "scan"),     # another mode
+])
+def test_every_key_part_counts(cache, key):
+    cache.put_many("analyzer", "index", {("flask", "2.0.1"): FRAME})
+    assert cache.get(*key) is None
+
+
+def test_new_fingerprint_invalidates(tmp_path, cache):
+    cache.put_many("analyzer", "index", {("flask", "2.0.1"): FRAME})
+    assert ResultCache(tmp_path / CACHE_FILE, "fp-2").get("analyzer", "flask", "2.0.1", "index") is None
+
+
+def test_lru_eviction_falls_back_to_disk(tmp_path):
+    cache = ResultCache(tmp_path / CACHE_FILE, "fp-1", maxsize=2)
+    cache.put_many("analyzer", "index", {("pkg", str(v)): FRAME for v in range(3)})
+    assert cache.stats()["memory_entries"] == 2
+    assert cache.get("analyzer", "pkg", "0", "index") is not None
+    assert cache.disk_hits == 1
+
+
+def test_closed_cache_keeps_the_memory_level(cache):
+    cache.put_many("analyzer", "index", {("flask", "2.0.1"): FRAME})
+    cache.close()
+    cache.put_many("analyzer", "index", {("flask", "2.0.2"): FRAME})
+    assert cache.get("analyzer", "flask", "2.0.2", "index") is FRAME
+    cache._lru.clear()
+    assert cache.get("analyzer", "flask", "2.0.1", "index") is None
+
+
+def test_cached_lookup_resolves_only_misses(cache):
+    calls = []
+
+    def resolve(missing):
+        calls.append(list(missing))
+        return pd.DataFrame({"dependency": [f"{p}=={v}" for p, v in missing if p != "clean"],
+                             "cve_id": [f"CVE-{p}" for p, v in missing if p != "clean"]})
+
+    deps = [("flask", "2.0.1"), ("clean", "1.0"), ("flask", "2.0.1"), ("django", "4.0")]
+    first = cached_lookup(cache, "analyzer", "index", deps, resolve, ["dependency"])
+    assert first["cve_id"].tolist() == ["CVE-flask", "CVE-flask", "CVE-django"]
+    assert calls == [[("flask", "2.0.1"), ("clean", "1.0"), ("django", "4.0")]]
+
+    again = cached_lookup(cache, "analyzer", "index", deps + [("requests", "2.0")], resolve, ["dependency"])
+    assert calls[1:] == [[("requests", "2.0")]]    # the clean pin was cached as an empty frame
+    assert again["cve_id"].tolist() == ["CVE-flask", "CVE-flask", "CVE-django", "CVE-requests"]
+
+
+def test_reingest_changes_the_fingerprint_and_prunes(tmp_path):
+    raw_dir, processed_dir = tmp_path / "raw", tmp_path / "processed"
+    write_feed(raw_dir, "nvdcve-2.0-2024.json", [cve("CVE-2024-0001", "2024-01-02", 5.0)])
+    ingest_all(raw_dir=raw_dir, processed_dir=processed_dir)
+    before = ResultCache.for_dataset(processed_dir)
+    assert before.fingerprint == dataset_fingerprint(processed_dir)
+    before.put_many("analyzer", "index", {("flask", "2.0.1"): FRAME})
+    before.close()
+
+    write_feed(raw_dir, "nvdcve-2.0-2024.json", [cve("CVE-2024-0001", "2024-02-01", 9.8)])
+    ingest_all(raw_dir=raw_dir, processed_dir=processed_dir)
+    after = ResultCache.for_dataset(processed_dir)
+    assert after.fingerprint != before.fingerprint
+    assert after.get("analyzer", "flask", "2.0.1", "index") is None
+    assert after._db.execute("SELECT COUNT(*) FROM results").fetchone() == (0,)    # pruned by the ingest
+    assert prune_cache(processed_dir) == 0
@@ -0,0 +1,89 @@
+# tests/test_scan_service.py
+"""The scan service answers every request, keeps its matcher warm and closes replaced caches."""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+from src.dependency_mapper import REPORT_COLUMNS, map_dependencies
+from src.nvd_ingest import ingest_all
+from src.scan_service import ScanService, make_server, prediction_features
+from tests.nvd_feeds import cve, write_feed
+
+
+@pytest.fixture
+def service(tmp_path):
+    write_feed(tmp_path / "raw", "nvdcve-2.0-2024.json", [cve("CVE-2024-0001", "2024-01-02", 9.8)])
+    ingest_all(raw_dir=tmp_path / "raw", processed_dir=tmp_path / "processed")
+    service = ScanService(tmp_path / "processed", batch_wait=0)
+    yield service
+    service.stop()
+
+
+@pytest.fixture
+def url(service):
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def post(url, payload):
+    """(status, decoded body) of a POST /scan."""
+    request = urllib.request.Request(url + "/scan", data=json.dumps(payload).encode("utf-8"))
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_scan_finds_the_cve(url):
+    status, answer = post(url, {"dependencies": [{"package": "flask", "version": "2.0.1"}], "predict": False})
+    assert status == 200
+    assert answer["dependencies"][0]["cves"] == 1
+
+
+def test_invalid_regex_is_a_bad_request(url):
+    status, answer = post(url, {"dependencies": [{"package": "(("}], "match": "regex"})
+    assert status == 400
+    assert "regular expression" in answer["error"]
+
+
+def test_unexpected_errors_still_get_an_answer(url, service, monkeypatch):
+    def broken(payload):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(service, "scan", broken)
+    status, answer = post(url, {"dependencies": []})
+    assert status == 500
+    assert "boom" in answer["error"]
+
+
+def test_matcher_is_built_once_per_generation(service):
+    state = service.state
+    assert state.cpe_index.matcher() is state.matcher
+    assert state.cpe_index.products() is state.cpe_index.products()
+
+
+def test_reload_closes_the_replaced_cache(service, tmp_path):
+    previous = service.state
+    write_feed(tmp_path / "raw", "nvdcve-2.0-modified.json", [cve("CVE-2024-0002", "2024-02-01", 5.0)])
+    ingest_all(raw_dir=tmp_path / "raw", processed_dir=tmp_path / "processed")
+    assert service.reload(force=True)
+    assert previous.cache._db is None and service.state.cache._db is not None
+    # A request still holding the old snapshot finishes without its disk level
+    assert previous.cache.get("dependency_mapper", "flask", "", "mode") is None
+
+
+def test_prediction_features_carry_the_cvss_vector(service):
+    req_df = pd.DataFrame([("flask", "2.0.1"), ("nosuchpkg", "")], columns=["package", "version"])
+    mapped = map_dependencies(req_df, cpe_index=service.state.cpe_index)
+    features = prediction_features(service.state, mapped.reindex(columns=REPORT_COLUMNS + ["cvss_vector"]), req_df)
+    assert features["cvss_vector"].iloc[0] == "CVSS:3.1/AV:N"
+    assert pd.isna(features["cvss_vector"].iloc[1])      # unmatched: the metrics encode as unknown
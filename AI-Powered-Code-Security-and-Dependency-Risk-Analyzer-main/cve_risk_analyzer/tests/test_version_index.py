@@ -0,0 +1,97 @@
+# tests/test_version_index.py
+"""_ProductIntervals answers like a direct check of every interval, boundaries included."""
+
+import itertools
+import random
+
+import pandas as pd
+import pytest
+
+from src.version_index import _ProductIntervals, parse_version, version_index_from_rows
+
+V = parse_version
+INTERVALS = [  # cve_id, lo, lo_closed, hi, hi_closed
+    ("CVE-closed", V("1.0"), True, V("2.0"), True),
+    ("CVE-half-open", V("1.0"), True, V("2.0"), False),
+    ("CVE-open", V("1.0"), False, V("2.0"), False),
+    ("CVE-from", V("1.5"), True, None, False),
+    ("CVE-after", V("1.5"), False, None, False),
+    ("CVE-upto", None, False, V("1.0"), True),
+    ("CVE-below", None, False, V("1.0"), False),
+    ("CVE-pin", V("2.0"), True, V("2.0"), True),
+    ("CVE-empty", V("3.0"), True, V("3.0"), False),
+    ("CVE-all", None, False, None, False),
+]
+
+
+def covers(version, lo, lo_closed, hi, hi_closed):
+    v = V(version)
+    above = lo is None or (v >= lo if lo_closed else v > lo)
+    below = hi is None or (v <= hi if hi_closed else v < hi)
+    return above and below
+
+
+def expected(intervals, version):
+    return sorted({cve_id for cve_id, *bounds in intervals if covers(version, *bounds)})
+
+
+@pytest.mark.parametrize("version, cves", [
+    ("0.9", ["CVE-all", "CVE-below", "CVE-upto"]),
+    ("1.0", ["CVE-all", "CVE-closed", "CVE-half-open", "CVE-upto"]),
+    ("1.0.0", ["CVE-all", "CVE-closed", "CVE-half-open", "CVE-upto"]),    # same version as 1.0
+    ("1.2", ["CVE-all", "CVE-closed", "CVE-half-open", "CVE-open"]),
+    ("1.5", ["CVE-all", "CVE-closed", "CVE-from", "CVE-half-open", "CVE-open"]),
+    ("2.0", ["CVE-after", "CVE-all", "CVE-closed", "CVE-from", "CVE-pin"]),
+    ("2.0.1", ["CVE-after", "CVE-all", "CVE-from"]),
+    ("3.0", ["CVE-after", "CVE-all", "CVE-from"]),                        # [3.0, 3.0) is empty
+])
+def test_boundaries(version, cves):
+    assert sorted(set(_ProductIntervals(INTERVALS, {}).lookup(version))) == cves
+
+
+def test_matches_a_direct_check_on_random_intervals():
+    rng = random.Random(0)
+    points = [f"1.{i}" for i in range(8)]
+    queries = ["0.1"] + points + [f"1.{i}.5" for i in range(8)] + ["9"]
+    for _ in range(200):
+        intervals = []
+        for n in range(rng.randint(1, 6)):
+            lo, hi = sorted(rng.sample(points, 2)) if rng.random() < 0.8 else [rng.choice(points)] * 2
+            intervals.append((f"CVE-{n}", None if rng.random() < 0.2 else V(lo), rng.random() < 0.5,
+                              None if rng.random() < 0.2 else V(hi), rng.random() < 0.5))
+        product = _ProductIntervals(intervals, {})
+        for version in queries:
+            assert sorted(set(product.lookup(version))) == expected(intervals, version), (intervals, version)
+
+
+def test_unparseable_versions_match_exact_strings_and_unbounded_ranges():
+    intervals = [("CVE-all", None, False, None, False),
+                 ("CVE-split", None, False, V("1.0"), False), ("CVE-split", V("5.0"), True, None, False)]
+    product = _ProductIntervals(intervals, {"nightly-build": ["CVE-exact"]})
+    assert sorted(set(product.lookup("nightly-build"))) == ["CVE-all", "CVE-exact"]
+    assert sorted(set(product.lookup("other-build"))) == ["CVE-all"]
+
+
+def test_index_from_rows():
+    rows = pd.DataFrame([
+        ("CVE-1", "Acme", "Widget", "*", "1.0", None, None, "2.0", True),
+        ("CVE-2", "acme", "widget", "1.5", None, None, None, None, True),
+        ("CVE-3", "acme", "widget", "*", None, None, None, None, False),      # not vulnerable
+        ("CVE-4", "acme", "widget", "rc-1", None, None, None, None, True),    # exact string only
+    ], columns=["cve_id", "cpe_vendor", "cpe_product", "cpe_version", "version_start_including",
+                "version_start_excluding", "version_end_including", "version_end_excluding", "vulnerable"])
+    index = version_index_from_rows(rows)
+    assert ("acme", "widget") in index and index.vendors_for("WIDGET") == ["acme"]
+    assert index.affected("ACME", "widget", "1.5") == ["CVE-1", "CVE-2"]
+    assert index.affected("acme", "widget", "2.0") == []
+    assert index.affected("acme", "widget", "rc-1") == ["CVE-4"]
+    assert index.affected("other", "widget", "1.5") == []
+
+
+def test_every_region_pair_of_one_interval():
+    # Each bound style against a query below, on and above each bound
+    for lo_closed, hi_closed in itertools.product([True, False], repeat=2):
+        interval = [("CVE", V("1.0"), lo_closed, V("2.0"), hi_closed)]
+        product = _ProductIntervals(interval, {})
+        for version in ["0.5", "1.0", "1.5", "2.0", "2.5"]:
+            assert sorted(set(product.lookup(version))) == expected(interval, version)